@@ -2,9 +2,12 @@
 # encoding: utf-8
 
 import logging
+import multiprocessing
 import os
 import random
 import sys
+from collections import deque
+from contextlib import ExitStack
 
 import configargparse
 import numpy as np
@@ -13,8 +16,31 @@ from aspen.executors.processing_applier import ProcessingApplier
 from aspen.executors.sound_generator import SoundGenerator
 from aspen.executors.stimulus_transformer import StimulusTransformer
 from aspen.executors.visualizer import Visualizer
-from aspen.utils.io_utils import add_prefix_suffix
+from aspen.utils.io_utils import (
+    BackgroundWriter,
+    PrefetchReader,
+    WavBlockReader,
+    WavBlockWriter,
+    add_prefix_suffix,
+    read_wavlist,
+)
+from aspen.utils.profile_utils import (
+    UTTERANCE_STAGE,
+    disable_profiler,
+    enable_profiler,
+    get_profiler,
+    profile_call,
+    profile_iter,
+    profile_stage,
+    set_profile_key,
+)
 from aspen.utils.scaling_astype import scaling_astype
+from aspen.utils.sweep_utils import (
+    expand_sweep,
+    parse_sweep,
+    sweep_cmd_args,
+    sweep_suffix,
+)
 
 
 def get_parser():
@@ -36,6 +62,13 @@ def get_parser():
         help="Path of listed wav file. "
         "If not specified, the signal is generated from scratch.",
     )
+    parser.add_argument(
+        "--wav-cache-dir",
+        default=None,
+        type=str,
+        help="Directory to cache the decoded signals of wavlist. "
+        "From the second time, the cached signals are memory-mapped instead of decoding the wav files.",
+    )
     parser.add_argument(
         "--rspecifier",
         default=None,
@@ -68,6 +101,15 @@ def get_parser():
     parser.add_argument(
         "--suffix", default=None, type=str, help="Suffix of output file or key"
     )
+    parser.add_argument(
+        "--sweep",
+        default=None,
+        type=str,
+        help="YAML mapping from an option name to the list of its values "
+        "(e.g. {gap-method: [replace, silent], target-snr: [0, -10]}). "
+        "The stimuli of all conditions (i.e. the product of all values) are generated in one process "
+        "and the condition is appended to the suffix.",
+    )
     parser.add_argument(
         "--play",
         action="store_true",
@@ -77,20 +119,378 @@ def get_parser():
     parser.add_argument(
         "--samp-freq", default=16000, type=int, help="Sampling frequency"
     )
+    parser.add_argument(
+        "--dtype",
+        default="float64",
+        type=str,
+        choices=["float32", "float64"],
+        help="Data type of signals in the sounds, stimulus and postprocessings",
+    )
 
     # other settings
     parser.add_argument(
         "--seed",
         default=None,
         type=int,
-        help="Random seed. Default to current time.",
+        help="Random seed. Default to current time. "
+        "The generator is re-seeded by `seed + index` for each input "
+        "so that the output does not depend on --nj.",
+    )
+    parser.add_argument(
+        "--nj",
+        default=1,
+        type=int,
+        help="Number of worker processes. "
+        "If greater than 1, the inputs are processed in parallel "
+        "and written in the input order by the main process.",
+    )
+    parser.add_argument(
+        "--block-size",
+        default=None,
+        type=int,
+        help="Number of samples of each block. "
+        "If specified, each file in wavlist is streamed to wav file block by block with bounded memory. "
+        "The stimulus and postprocessings must support the block processing.",
+    )
+    parser.add_argument(
+        "--num-prefetch",
+        default=2,
+        type=int,
+        help="Number of inputs read ahead by a background thread while the stimulus is generated. "
+        "If 0, each input is read when it is required.",
+    )
+    parser.add_argument(
+        "--write-queue-mb",
+        default=128.0,
+        type=float,
+        help="Maximum size [MB] of the outputs waiting to be written by a background thread. "
+        "If 0, each output is written before the next input is processed.",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        type=str,
+        help="Path of JSON-lines file to which the wall-clock and CPU time of each stage "
+        "and pipeline component is written for each utterance. "
+        "The summary table with the real-time factor is shown at the end.",
+    )
+    parser.add_argument(
+        "--memory-profile",
+        action="store_true",
+        help="The flag to record the peak RSS and the allocation of each stage and pipeline component "
+        "by tracemalloc in addition to the time (see --profile). "
+        "The top allocating stages are shown at the end. Note that tracemalloc slows down the generation.",
+    )
+    parser.add_argument(
+        "--fft-workers",
+        default=1,
+        type=int,
+        help="Number of threads of each FFT (-1 means all CPUs). "
+        "Keep --nj times --fft-workers within the number of CPU cores.",
+    )
+    parser.add_argument(
+        "--fft-plan-cache",
+        action="store_true",
+        help="The flag to compute the FFTs by FFTW (requires pyfftw) with the cache of the plans "
+        "which are reused for the repeated shapes across inputs",
     )
     parser.add_argument("--verbose", "-V", default=0, type=int, help="Verbose option")
 
     return parser
 
 
-def main(cmd_args):
+def build_executors(args):
+    """Instantiate the executors of stimulus, sounds, postprocessings and visualization
+
+    Args:
+        args: (config)argparse arguments
+
+    Returns:
+        Tuple of StimulusTransformer, SoundGenerator, ProcessingApplier and Visualizer
+    """
+    stimulus = StimulusTransformer(args)
+    sounds = SoundGenerator(args)
+    postprocessings = ProcessingApplier(args)
+    visualize = Visualizer(args)
+    return stimulus, sounds, postprocessings, visualize
+
+
+def seed_utterance(args, index):
+    """Seed the random generators for the `index`-th input if --seed is specified"""
+    if args.seed is not None:
+        random.seed(args.seed + index)
+        np.random.seed(args.seed + index)
+
+
+def generate_utterance(args, executors, key, sr, orgmat):
+    """Generate the stimulus from one input and visualize it
+
+    Args:
+        args: (config)argparse arguments
+        executors: Return value of `build_executors`
+        key: Key of the input. None when the signal is generated from scratch.
+        sr: Sampling frequency of the input
+        orgmat: Input signal
+
+    Returns:
+        Output key and the pair of sampling frequency and int16 signal to be written
+    """
+    stimulus, sounds, postprocessings, visualize = executors
+    outkey = add_prefix_suffix(key, args.prefix, args.suffix)
+    set_profile_key(outkey)
+    with profile_stage(UTTERANCE_STAGE) as record:
+        x = []
+        if key is not None:
+            logging.info("loaded file key = " + key)
+            logging.info(
+                "length of loaded file = {} [s]".format(orgmat.shape[0] / args.samp_freq)
+            )
+            # the stimulus never modifies its inputs, so the input is shared without the copy
+            # (e.g. with the other conditions of sweep and the visualization)
+            x.append(orgmat)
+            if args.samp_freq != sr:
+                logging.warning(
+                    "Overwrite sampling frequency from {} to {}".format(args.samp_freq, sr)
+                )
+                args.samp_freq = sr
+        with profile_stage("sounds"):
+            x.extend(sounds())
+        with profile_stage("scaling_astype/input"):
+            for i in range(len(x)):
+                # processing as `args.dtype` (the signal itself if it has already the data type)
+                x[i] = scaling_astype(x[i], out_dtype=args.dtype)
+        with profile_stage("stimulus"):
+            y = stimulus(x)
+        logging.info("length of write file = {} [s]".format(y.shape[0] / args.samp_freq))
+        with profile_stage("postprocess"):
+            # the output of stimulus is processed in-place unless it is (a view of) an input (e.g. identity)
+            y = postprocessings(y, inplace=not any(np.may_share_memory(y, each_x) for each_x in x))
+        with profile_stage("visualize"):
+            visualize(outkey, y, orgmat)
+        with profile_stage("scaling_astype/output"):
+            out = scaling_astype(y, out_dtype="int16")
+        # duration of the input (or the output when the signal is generated from scratch)
+        record["audio_sec"] = (y if key is None else orgmat).shape[0] / args.samp_freq
+    if args.wspecifier is None:
+        outkey = os.path.join(args.outdir, outkey + ".wav")
+    return outkey, (args.samp_freq, out)
+
+
+def generate_utterance_blocks(args, executors, key, reader):
+    """Generate the stimulus from one input block by block
+
+    Args:
+        args: (config)argparse arguments
+        executors: Return value of `build_executors`
+        key: Key of the input
+        reader: WavBlockReader of the input
+    """
+    stimulus, sounds, postprocessings, _ = executors
+    logging.info("loaded file key = " + key)
+    logging.info("length of loaded file = {} [s]".format(reader.length / reader.samp_freq))
+    if args.samp_freq != reader.samp_freq:
+        logging.warning(
+            "Overwrite sampling frequency from {} to {}".format(args.samp_freq, reader.samp_freq)
+        )
+        args.samp_freq = reader.samp_freq
+    # the generated sounds are held in memory and only the input is streamed
+    x = [scaling_astype(s, out_dtype=args.dtype) for s in sounds()]
+    stimulus.reset(reader.length, x)
+    postprocessings.reset(stimulus.output_length(reader.length))
+    key = add_prefix_suffix(key, args.prefix, args.suffix)
+    set_profile_key(key)
+    clipped = False
+    with profile_stage(UTTERANCE_STAGE) as record, WavBlockWriter(
+        os.path.join(args.outdir, key + ".wav"), args.samp_freq
+    ) as writer:
+        record["audio_sec"] = reader.length / args.samp_freq
+        for pass_index in range(stimulus.num_passes):
+            for block, last in reader.blocks(args.block_size):
+                # measured for each block
+                with profile_stage("stimulus"):
+                    y = stimulus.process_block(block, pass_index, last)
+                with profile_stage("postprocess"):
+                    y = postprocessings.process_block(y, last and pass_index == stimulus.num_passes - 1)
+                if y.shape[0] == 0:
+                    continue
+                # declip needs the maximum of whole signal, so the saturated samples are clipped instead
+                if np.any(np.abs(y) > 1.0):
+                    clipped = True
+                    y = np.clip(y, -1.0, 1.0)
+                with profile_stage("scaling_astype/output"):
+                    y = scaling_astype(y, out_dtype="int16")
+                with profile_stage("write"):
+                    writer.write(y)
+    if clipped:
+        logging.warning("The saturated samples of {} are clipped".format(key))
+
+
+def generate_conditions(conditions, executors, index, key, sr, orgmat):
+    """Generate the stimuli of all conditions from one input
+
+    Args:
+        conditions: List of (config)argparse arguments of each condition
+        executors: List of return value of `build_executors` for each condition
+        index: Index of the input
+        key: Key of the input. None when the signal is generated from scratch.
+        sr: Sampling frequency of the input
+        orgmat: Input signal
+
+    Returns:
+        List of the return value of `generate_utterance` for each condition
+    """
+    outputs = []
+    for args, each_executors in zip(conditions, executors):
+        # every condition is fed by the same random sequence
+        seed_utterance(args, index)
+        outputs.append(generate_utterance(args, each_executors, key, sr, orgmat))
+    return outputs
+
+
+def generate_blocks(conditions, wavlist):
+    """Generate the stimuli from the files in `wavlist` block by block in the main process"""
+    executors = [build_executors(args) for args in conditions]
+    for args, each_executors in zip(conditions, executors):
+        stimulus, _, postprocessings, _ = each_executors
+        if not stimulus.supports_block() or not postprocessings.supports_block():
+            raise ValueError(
+                "--block-size requires the stimulus and postprocessings which support block processing"
+            )
+        if len(args.visualization_pipeline) > 0:
+            raise ValueError("--block-size does not support visualization")
+    for index, (key, path) in enumerate(read_wavlist(conditions[0].wavlist)):
+        with WavBlockReader(path, dtype=conditions[0].dtype) as reader:
+            for args, each_executors in zip(conditions, executors):
+                seed_utterance(args, index)
+                generate_utterance_blocks(args, each_executors, key, reader)
+
+
+def iter_serial(conditions, reader):
+    """Generate the stimuli from `reader` one by one in the main process"""
+    executors = [build_executors(args) for args in conditions]
+    for index, (key, (sr, orgmat)) in enumerate(reader):
+        yield generate_conditions(conditions, executors, index, key, sr, orgmat)
+
+
+# the state of each worker process of --nj
+_worker_conditions = None
+_worker_executors = None
+
+
+def _init_worker(conditions):
+    global _worker_conditions, _worker_executors
+    from aspen.utils.fft_utils import pop_fft_stats, set_fft_backend
+
+    _worker_conditions = conditions
+    set_fft_backend(conditions[0].fft_workers, conditions[0].fft_plan_cache)
+    if conditions[0].profile is not None or conditions[0].memory_profile:
+        # the records (and the FFT stats) are sent to the main process with the outputs
+        enable_profiler(memory=conditions[0].memory_profile)
+        pop_fft_stats()
+    _worker_executors = [build_executors(args) for args in conditions]
+
+
+def _run_worker(index, key, sr, orgmat):
+    from aspen.utils.fft_utils import pop_fft_stats
+
+    outputs = generate_conditions(
+        _worker_conditions, _worker_executors, index, key, sr, orgmat
+    )
+    profiler = get_profiler()
+    if profiler is None:
+        return outputs, [], {}
+    return outputs, profiler.pop_records(), pop_fft_stats()
+
+
+def _get_worker_outputs(result):
+    from aspen.utils.fft_utils import add_fft_stats
+
+    outputs, records, fft_stats = result.get()
+    if len(records) > 0:
+        get_profiler().add_records(records)
+    add_fft_stats(fft_stats)
+    return outputs
+
+
+def iter_parallel(conditions, reader, nj):
+    """Generate the stimuli from `reader` by `nj` worker processes
+
+    The inputs are read by the main process and dispatched to the workers.
+    The outputs are yielded in the input order so that the main process can be the single writer.
+    At most `2 * nj` inputs are in flight to bound the memory usage.
+    """
+    pending = deque()
+    with multiprocessing.Pool(
+        nj, initializer=_init_worker, initargs=(conditions,)
+    ) as pool:
+        for index, (key, (sr, orgmat)) in enumerate(reader):
+            pending.append(pool.apply_async(_run_worker, (index, key, sr, orgmat)))
+            if len(pending) >= 2 * nj:
+                yield _get_worker_outputs(pending.popleft())
+        while len(pending) > 0:
+            yield _get_worker_outputs(pending.popleft())
+
+
+def generate_files(args, conditions):
+    """Generate the stimuli of all conditions from the inputs and write them
+
+    Args:
+        args: (config)argparse arguments
+        conditions: List of (config)argparse arguments of each condition
+    """
+    reader_kwargs = {"segments": args.segments}
+    kaldi_reader = False
+    if args.wavlist is not None:
+        from aspen.utils.io_utils import WavReader as ReadHelper
+
+        args.rspecifier = args.wavlist
+        reader_kwargs["cache_dir"] = args.wav_cache_dir
+        reader_kwargs["dtype"] = args.dtype
+        reader_kwargs["num_prefetch"] = args.num_prefetch
+    elif args.rspecifier is not None:
+        from kaldiio import ReadHelper
+
+        kaldi_reader = True
+    else:
+        from aspen.utils.io_utils import WavReader as ReadHelper
+
+    if args.play:
+        from aspen.utils.io_utils import NumpyPlayer as WriteHelper
+    elif args.wspecifier is None:
+        from aspen.utils.io_utils import WavWriter as WriteHelper
+    else:
+        from kaldiio import WriteHelper
+
+    with ExitStack() as stack:
+        writer = stack.enter_context(
+            WriteHelper(args.wspecifier, write_function=args.write_function)
+        )
+        if get_profiler() is not None:
+            writer = profile_call(writer, "write")
+        if not args.play and args.write_queue_mb > 0:
+            # closed (i.e. all outputs are written) before the writer
+            writer = stack.enter_context(
+                BackgroundWriter(writer, int(args.write_queue_mb * 2**20))
+            )
+        reader = stack.enter_context(ReadHelper(args.rspecifier, **reader_kwargs))
+        if kaldi_reader:
+            # WavReader measures the decoding of each file by itself
+            if get_profiler() is not None:
+                reader = profile_iter(reader, "read")
+            # kaldiio reads the archive sequentially, so the whole reader is moved to a background thread
+            if args.num_prefetch > 0:
+                reader = PrefetchReader(reader, args.num_prefetch)
+        if args.nj == 1:
+            outputs = iter_serial(conditions, reader)
+        else:
+            outputs = iter_parallel(conditions, reader, args.nj)
+        # each input is decoded once and fed to every condition
+        for each_outputs in outputs:
+            for outkey, value in each_outputs:
+                writer(outkey, value)
+
+
+def parse_args(cmd_args):
     parser = get_parser()
     StimulusTransformer.add_arguments(parser)
     SoundGenerator.add_arguments(parser)
@@ -107,7 +507,31 @@ def main(cmd_args):
     parser.add_argument(
         "--help", "-h", action="help", help="show this help message and exit"
     )
-    args = parser.parse_args(cmd_args)
+    return parser.parse_args(cmd_args)
+
+
+def expand_conditions(args, cmd_args):
+    """Expand --sweep to the arguments of each condition
+
+    Each condition is parsed again with the swept values appended to the command-line arguments,
+    so that the values are type-checked and the arguments of the swept module are added.
+    """
+    if args.sweep is None:
+        return [args]
+    conditions = []
+    for condition in expand_sweep(parse_sweep(args.sweep)):
+        cond_args = parse_args(list(cmd_args) + sweep_cmd_args(condition))
+        cond_args.sweep = None
+        cond_args.suffix = add_prefix_suffix(
+            args.suffix, None, sweep_suffix(condition)
+        )
+        logging.info("sweep condition = {}".format(condition))
+        conditions.append(cond_args)
+    return conditions
+
+
+def main(cmd_args):
+    args = parse_args(cmd_args)
 
     if args.verbose > 0:
         logging.basicConfig(
@@ -124,75 +548,60 @@ def main(cmd_args):
     logging.info("python path = " + os.environ.get("PYTHONPATH", "(None)"))
 
     if args.seed is not None:
-        random.seed(args.seed)
-        np.random.seed(args.seed)
         logging.info("random seed = %d" % args.seed)
 
-    if args.outdir is None and args.wspecifier != "ark:-":
-        raise ValueError("--outdir argument must be specified.")
-    elif args.outdir is not None:
-        os.makedirs(args.outdir, exist_ok=True)
-        logging.info("outdir = " + args.outdir)
-    else:  # the case of wspecifier
-        pass
-
-    stimulus = StimulusTransformer(args)
-    sounds = SoundGenerator(args)
-    postprocessings = ProcessingApplier(args)
-    visualize = Visualizer(args)
+    if args.nj < 1:
+        raise ValueError("--nj must be greater than 0, but got {}".format(args.nj))
+    if args.num_prefetch < 0:
+        raise ValueError(
+            "--num-prefetch must not be negative, but got {}".format(args.num_prefetch)
+        )
+    if args.fft_workers == 0:
+        raise ValueError("--fft-workers must not be 0")
+    if args.write_queue_mb < 0:
+        raise ValueError(
+            "--write-queue-mb must not be negative, but got {}".format(args.write_queue_mb)
+        )
 
-    if args.wavlist is not None:
-        from aspen.utils.io_utils import WavReader as ReadHelper
+    conditions = expand_conditions(args, cmd_args)
+    for cond_args in conditions:
+        if cond_args.outdir is None and cond_args.wspecifier != "ark:-":
+            raise ValueError("--outdir argument must be specified.")
+        elif cond_args.outdir is not None:
+            os.makedirs(cond_args.outdir, exist_ok=True)
+            logging.info("outdir = " + cond_args.outdir)
+        else:  # the case of wspecifier
+            pass
 
-        args.rspecifier = args.wavlist
-    elif args.rspecifier is not None:
-        from kaldiio import ReadHelper
-    else:
-        from aspen.utils.io_utils import WavReader as ReadHelper
+    if args.block_size is not None:
+        if args.block_size < 1:
+            raise ValueError(
+                "--block-size must be greater than 0, but got {}".format(args.block_size)
+            )
+        if args.wavlist is None or args.wspecifier is not None or args.play or args.nj != 1:
+            raise ValueError(
+                "--block-size supports only --wavlist input and wav file output with --nj 1"
+            )
 
-    if args.play:
-        from aspen.utils.io_utils import NumpyPlayer as WriteHelper
-    elif args.wspecifier is None:
-        from aspen.utils.io_utils import WavWriter as WriteHelper
-    else:
-        from kaldiio import WriteHelper
+    # scipy is imported when the stimulus is actually generated
+    from aspen.utils.fft_utils import fft_stats_summary, pop_fft_stats, set_fft_backend
 
-    with WriteHelper(args.wspecifier, write_function=args.write_function) as writer:
-        with ReadHelper(args.rspecifier, segments=args.segments) as reader:
-            for key, (sr, orgmat) in reader:
-                x = []
-                if key is not None:
-                    logging.info("loaded file key = " + key)
-                    logging.info(
-                        "length of loaded file = {} [s]".format(
-                            orgmat.shape[0] / args.samp_freq
-                        )
-                    )
-                    cloned = orgmat.copy()
-                    x.append(cloned)
-                    if args.samp_freq != sr:
-                        logging.warning(
-                            "Overwrite sampling frequency from {} to {}".format(
-                                args.samp_freq, sr
-                            )
-                        )
-                        args.samp_freq = sr
-                x.extend(sounds())
-                for i in range(len(x)):
-                    # processing as
-                    x[i] = scaling_astype(x[i], out_dtype=np.float64)
-                y = stimulus(x)
-                logging.info(
-                    "length of write file = {} [s]".format(y.shape[0] / args.samp_freq)
-                )
-                y = postprocessings(y)
-                key = add_prefix_suffix(key, args.prefix, args.suffix)
-                if args.wspecifier is None:
-                    outkey = os.path.join(args.outdir, key + ".wav")
-                else:
-                    outkey = key
-                writer(outkey, (args.samp_freq, scaling_astype(y, out_dtype="int16")))
-                visualize(key, y, orgmat)
+    set_fft_backend(args.fft_workers, args.fft_plan_cache)
+    profile = args.profile is not None or args.memory_profile
+    if profile:
+        profiler = enable_profiler(args.profile, memory=args.memory_profile)
+        pop_fft_stats()
+    try:
+        if args.block_size is not None:
+            generate_blocks(conditions, args.wavlist)
+        else:
+            generate_files(args, conditions)
+    finally:
+        if profile:
+            # stderr since the outputs may be written to stdout (e.g. ark:-)
+            sys.stderr.write(profiler.summary() + "\n")
+            sys.stderr.write(fft_stats_summary() + "\n")
+            disable_profiler()
 
     logging.info("Done.")
 
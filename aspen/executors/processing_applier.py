@@ -5,7 +5,10 @@ from logging import getLogger
 
 import numpy as np
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
+from aspen.processings.declip import Declip
 from aspen.utils.dynamic_classimport import dynamic_classimport
+from aspen.utils.profile_utils import profile_stage
 
 logger = getLogger(__name__)
 
@@ -50,8 +53,52 @@ class ProcessingApplier(object):
     def show_pipeline(self):
         return self.postprocess
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, inplace: bool = False) -> np.ndarray:
+        """Apply the postprocessings
+
+        Args:
+            x: Input signal
+            inplace: The flag whether the caller owns `x` and it may be overwritten.
+                Otherwise (e.g. the input signal itself returned by identity stimulus),
+                it is processed in-place only after a processing has allocated the new array.
+
+        Returns:
+            Output signal
+        """
+        owned = inplace
         for proc in self.postprocess:
-            # apply_along_axis is applicable for either single or multi channel signal
-            x = np.apply_along_axis(proc, 0, x)
+            with profile_stage("postprocess/" + type(proc).__name__):
+                if x.ndim == 1 or proc.multichannel:
+                    # multi-channel signal is processed at once by the processing which supports it
+                    y = proc(x, out=x if owned else None)
+                    owned = owned or y is not x
+                    x = y
+                else:
+                    # apply_along_axis is applicable for multi channel signal
+                    x = np.apply_along_axis(proc, 0, x)
+                    owned = True
+        return x
+
+    def supports_block(self) -> bool:
+        return all(
+            isinstance(proc, AbsBlockInterface) and proc.num_passes == 1
+            for proc in self._block_postprocess()
+        )
+
+    def reset(self, length: int):
+        for proc in self._block_postprocess():
+            if not isinstance(proc, AbsBlockInterface) or proc.num_passes != 1:
+                raise ValueError(
+                    "{} does not support block processing".format(type(proc).__name__)
+                )
+            proc.reset(length)
+            length = proc.block_output_length(length)
+
+    def process_block(self, x: np.ndarray, last: bool) -> np.ndarray:
+        for proc in self._block_postprocess():
+            x = proc.process_block(x, 0, last)
         return x
+
+    def _block_postprocess(self):
+        # declip needs the maximum of whole signal, so the saturated samples are clipped by the caller instead
+        return [proc for proc in self.postprocess if not isinstance(proc, Declip)]
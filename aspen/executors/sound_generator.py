@@ -6,7 +6,9 @@ from typing import List
 
 import numpy as np
 
+from aspen.utils.cli_utils import strtobool
 from aspen.utils.dynamic_classimport import dynamic_classimport
+from aspen.utils.profile_utils import profile_stage
 
 logger = getLogger(__name__)
 
@@ -28,6 +30,9 @@ class SoundGenerator(object):
             sounds_class = dynamic_classimport(sounds, "aspen.sounds")
             sound_kwargs = sounds_class.load_class_kwargs(args)
             self.gen_sounds.append(sounds_class(**sound_kwargs))
+        self.sound_cache = getattr(args, "sound_cache", True)
+        # signals of the deterministic sounds (see `AbsSoundInterface.deterministic`) for each index of the pipeline
+        self._cache = {}
 
     @staticmethod
     def add_arguments(parser):
@@ -40,6 +45,27 @@ class SoundGenerator(object):
             nargs="*",
             help="Stack of sound type that is used by stimulus transformation",
         )
+        group.add_argument(
+            "--sound-cache",
+            default=True,
+            type=strtobool,
+            help="Generate the deterministic sounds (e.g. tones) once and share them across utterances "
+            "as read-only arrays. The stochastic sounds (e.g. noises) are generated for every utterance",
+        )
+        group.add_argument(
+            "--noise-bank-dir",
+            default=None,
+            type=str,
+            help="Directory of the noise banks. If specified, a long noise of each configuration of "
+            "colored_noise and filtered_noise is generated once into the memory-mapped file of the directory "
+            "and the noise of each utterance is its slice at a random offset (reproducible by --seed)",
+        )
+        group.add_argument(
+            "--noise-bank-duration",
+            default=300000,
+            type=float,
+            help="Duration of each noise bank in millisecond",
+        )
         return parser
 
     @staticmethod
@@ -54,6 +80,17 @@ class SoundGenerator(object):
 
     def __call__(self) -> List[np.ndarray]:
         x = []
-        for gen_sound in self.gen_sounds:
-            x.extend(gen_sound())
+        for i, gen_sound in enumerate(self.gen_sounds):
+            if i in self._cache:
+                x.extend(signal.view() for signal in self._cache[i])
+                continue
+            with profile_stage("sounds/" + type(gen_sound).__name__):
+                signals = gen_sound()
+            if self.sound_cache and gen_sound.deterministic:
+                for signal in signals:
+                    signal.flags.writeable = False
+                self._cache[i] = list(signals)
+                logger.info("Cached the signals of {} for the following utterances".format(type(gen_sound).__name__))
+                signals = [signal.view() for signal in signals]
+            x.extend(signals)
         return x
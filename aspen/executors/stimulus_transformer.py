@@ -6,6 +6,7 @@ from typing import List
 
 import numpy as np
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
 from aspen.utils.cli_utils import strtobool
 from aspen.utils.dynamic_classimport import dynamic_classimport
 
@@ -79,3 +80,50 @@ class StimulusTransformer(object):
                 pass
 
         return y
+
+    def supports_block(self) -> bool:
+        return isinstance(self.stimulus, AbsBlockInterface)
+
+    @property
+    def num_passes(self) -> int:
+        return self.stimulus.num_passes
+
+    def output_length(self, length: int) -> int:
+        return length if self.equalize else self.stimulus.block_output_length(length)
+
+    def reset(self, length: int, sounds: List[np.ndarray]):
+        if not self.supports_block():
+            raise ValueError(
+                "{} does not support block processing".format(type(self.stimulus).__name__)
+            )
+        self.stimulus.reset(length, sounds)
+        self.sounds = sounds
+        self.position = 0
+        out_t = self.stimulus.block_output_length(length)
+        self.skip = 0
+        self.pad = 0
+        if self.equalize:
+            if length != out_t:
+                logger.warning(
+                    "Equalize the duration between input={} and output={}".format(
+                        length, out_t
+                    )
+                )
+            # same as `__call__`, remove the first samples or copy the first value
+            self.skip = max(out_t - length, 0)
+            self.pad = max(length - out_t, 0)
+
+    def process_block(self, x: np.ndarray, pass_index: int, last: bool) -> np.ndarray:
+        # the generated sounds are sliced at the same position as the block
+        start = self.position
+        self.position = 0 if last else start + x.shape[0]
+        inputs = [x] + [sound[start : start + x.shape[0]] for sound in self.sounds]
+        y = self.stimulus.process_block(inputs, pass_index, last)
+        if self.skip > 0:
+            skip = min(self.skip, y.shape[0])
+            self.skip -= skip
+            y = y[skip:]
+        if self.pad > 0 and y.shape[0] > 0:
+            y = np.concatenate([np.repeat(y[:1], self.pad, axis=0), y])
+            self.pad = 0
+        return y
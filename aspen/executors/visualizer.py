@@ -4,18 +4,13 @@
 import os
 from logging import getLogger
 
-import matplotlib.gridspec as gridspec
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.backends.backend_pdf import PdfPages
 
 from aspen.utils.cli_utils import strtobool
 from aspen.utils.dynamic_classimport import dynamic_classimport
 
 logger = getLogger(__name__)
 
-plt.style.use("ggplot")
-
 EPSILON = np.finfo(np.float64).eps
 
 VISUALIZATIONS = ["waveform", "spectrogram", "spectrum", "mps"]
@@ -42,6 +37,12 @@ class Visualizer(object):
             self.widths.append(plotsize[0])
             self.heights.append(plotsize[1])
         self.samp_freq = args.samp_freq
+        if len(self.visualizations) > 0:
+            # matplotlib is imported only when visualization is required
+            # because it takes a long time to import
+            import matplotlib.pyplot as plt
+
+            plt.style.use("ggplot")
 
     @staticmethod
     def add_arguments(parser):
@@ -105,6 +106,10 @@ class Visualizer(object):
         else:
             os.makedirs(self.outdir, exist_ok=True)
 
+        import matplotlib.gridspec as gridspec
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_pdf import PdfPages
+
         if not self.vis_original:
             orgsample = None
 
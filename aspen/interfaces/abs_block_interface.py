@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Abstract block processing interface"""
+
+from abc import ABC, abstractmethod
+from typing import Sequence, Union
+
+import numpy as np
+
+
+class AbsBlockInterface(ABC):
+    """Optional interface to process a long signal block by block.
+
+    Stimuli and processings which implement this interface can be applied to a signal which is streamed
+    from a file by fixed-size blocks, carrying the state between blocks.
+    The concatenation of the outputs of all blocks (over all passes) must be equal to the output of `__call__`
+    for the whole signal.
+
+    Attributes:
+        num_passes: Number of times the input signal is streamed from the beginning.
+            e.g. a stimulus which requires the statistics of whole signal analyzes it in the first pass.
+    """
+
+    num_passes = 1
+
+    def block_output_length(self, length: int) -> int:
+        """Return the length of the whole output signal
+
+        Args:
+            length: Length of the whole input signal
+
+        Returns:
+            Length of the whole output signal
+        """
+        return length
+
+    def reset(self, length: int, sounds: Sequence[np.ndarray] = ()) -> None:
+        """Reset the state before the first block of a new signal.
+
+        Args:
+            length: Length of the whole input signal
+            sounds: Generated signals held in memory which are given to the stimulus
+                in addition to the streamed signal. Not used by processings.
+        """
+        pass
+
+    @abstractmethod
+    def process_block(
+        self, x: Union[np.ndarray, Sequence[np.ndarray]], pass_index: int, last: bool
+    ) -> np.ndarray:
+        """Transform a block of input signal.
+
+        Args:
+            x: Block of input signal. In the case of stimulus, sequence of the blocks of
+                the streamed signal and each generated sound which are at the same position (i.e. [input, *sounds]).
+            pass_index: Index of the pass (0 <= pass_index < num_passes)
+            last: The flag whether the block is the last one in the pass
+
+        Returns:
+            Block of output signal. The length may differ from the input block (including empty).
+        """
+        raise NotImplementedError
@@ -3,19 +3,38 @@
 """Abstract processing interface"""
 
 from abc import ABC, abstractmethod
+from typing import Optional
 
 import numpy as np
 
 
 class AbsProcessingInterface(ABC):
+    """Interface of processings
+
+    Ownership of arrays:
+        The input signal is owned by the caller and is never modified unless it is also given as `out`.
+        The return value is the input signal itself (when nothing is changed), `out` or a newly allocated array,
+        and the caller owns the newly allocated one.
+        The caller can pass the array it owns as both `x` and `out` to process the signal in-place.
+
+    Attributes:
+        multichannel: The flag whether the processing accepts a multi-channel signal of shape (time, channel)
+            and processes each channel independently in one call.
+            Otherwise, the processing is applied to each channel one by one.
+    """
+
+    multichannel = False
+
     @abstractmethod
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Transform input multiple signals.
 
         Args:
             x: Signals (`np.ndarray`).
+            out: Output buffer which has the same shape and data type as `x` (may be `x` itself).
+                Defaults to None (= the output is allocated if necessary).
 
         Returns:
-            Output signal.
+            Output signal. `out` if specified.
         """
         raise NotImplementedError
@@ -11,6 +11,18 @@ NUM_SIGNALS = 1
 
 
 class AbsSoundInterface(ABC):
+    """Interface of sounds
+
+    Attributes:
+        deterministic: The flag whether the sound generates the same signals for every call (e.g. tones).
+            Defaults to False, so a sound must opt in to be shared.
+            The signals of the deterministic sounds are generated once and shared across utterances
+            as read-only arrays by `SoundGenerator`,
+            while the stochastic sounds (e.g. noises) are generated for every utterance.
+    """
+
+    deterministic = False
+
     def __init__(self):
         self.num_signals = NUM_SIGNALS
 
@@ -18,12 +30,15 @@ class AbsSoundInterface(ABC):
         """Generate a specified number of signals.
 
         Returns:
-            Generate signals.
+            Generate signals. If the class has `dtype` attribute, the signals are converted to it.
                 Output well be sequence-like object such as list, tuple and so on.
         """
+        # the signal is calculated in float64 (e.g. phase of long tone) and then converted to `dtype`
+        dtype = getattr(self, "dtype", None)
         x = []
         for i in range(self.num_signals):
-            x.append(self._generate_each(i))
+            each_x = self._generate_each(i)
+            x.append(each_x if dtype is None else each_x.astype(dtype, copy=False))
         return x
 
     @abstractmethod
@@ -9,6 +9,16 @@ import numpy as np
 
 
 class AbsStimulusInterface(ABC):
+    """Interface of stimuli
+
+    Ownership of arrays:
+        The input signals are owned by the caller and are never modified
+        (e.g. the same input is shared by the conditions of sweep, or is memory-mapped read-only from the cache).
+        The return value is a newly allocated array which the caller owns,
+        or one of the input signals itself if the stimulus does not transform it (e.g. `identity`).
+        A stimulus may work in-place on the arrays it allocates, but not on the inputs.
+    """
+
     @abstractmethod
     def __call__(self, x: Sequence[np.ndarray]) -> np.ndarray:
         """Transform input multiple signals.
@@ -2,6 +2,8 @@
 # encoding: utf-8
 """Amplitude maximize"""
 
+from typing import Optional
+
 import numpy as np
 
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
@@ -11,11 +13,15 @@ from aspen.interfaces.abs_processing_interface import AbsProcessingInterface
 class AmplitudeMaximize(AbsCommonInterface, AbsProcessingInterface):
     """Maximize the amplitude.
 
+    Each channel of multi-channel signal is maximized independently.
+
     Args:
         amplitude_maximize_maximum_num: Maximization value.
             Upper limit of signal amplitude is set to this value. Defaults to 1.0.
     """
 
+    multichannel = True
+
     def __init__(self, amplitude_maximize_maximum_num: float = 1.0):
         self.maximum_num = amplitude_maximize_maximum_num
 
@@ -30,11 +36,12 @@ class AmplitudeMaximize(AbsCommonInterface, AbsProcessingInterface):
         )
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply amplitude maximize
 
         Args:
             x: Input signal
+            out: Output buffer (may be `x` itself). Defaults to None.
 
         Returns:
             Output signal
@@ -43,22 +50,33 @@ class AmplitudeMaximize(AbsCommonInterface, AbsProcessingInterface):
             raise ValueError(
                 "maximum_num must be positive, but got {}".format(self.maximum_num)
             )
-        xabs = np.abs(x)
-        if np.any(xabs == self.maximum_num) and not np.any(xabs > self.maximum_num):
-            return x
+        # the maximum of absolute value of each channel without the temporary array of np.abs(x)
+        peak = np.maximum(x.max(axis=0), -x.min(axis=0))
+        maximized = peak == self.maximum_num
+        if np.all(maximized):
+            if out is None:
+                return x
+            out[...] = x
+            return out
         else:
-            return x / xabs.max() * self.maximum_num
+            # the channels which have been already maximized are divided and multiplied by 1 (i.e. unchanged)
+            y = np.divide(x, np.where(maximized, 1, peak), out=out)
+            y *= np.where(maximized, 1, self.maximum_num).astype(y.dtype)
+            return y
 
 
-def amplitude_maximize(x: np.ndarray, maximum_num: float = 1.0) -> np.ndarray:
+def amplitude_maximize(
+    x: np.ndarray, maximum_num: float = 1.0, out: Optional[np.ndarray] = None
+) -> np.ndarray:
     """Maximize the amplitude.
 
     Args:
         x: Input signal
         maximum_num: Maximization value.
             Upper limit of signal amplitude is set to this value. Defaults to 1.0.
+        out: Output buffer (may be `x` itself). Defaults to None.
 
     Returns:
         Output signal
     """
-    return AmplitudeMaximize(maximum_num)(x)
+    return AmplitudeMaximize(maximum_num)(x, out=out)
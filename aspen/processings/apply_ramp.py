@@ -3,16 +3,18 @@
 """Apply ramp function"""
 
 from logging import getLogger
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_processing_interface import AbsProcessingInterface
 
 logger = getLogger(__name__)
 
 
-class ApplyRamp(AbsCommonInterface, AbsProcessingInterface):
+class ApplyRamp(AbsCommonInterface, AbsProcessingInterface, AbsBlockInterface):
     """Apply ramp function to a given signal.
 
     Args:
@@ -27,6 +29,8 @@ class ApplyRamp(AbsCommonInterface, AbsProcessingInterface):
         samp_freq: Sampling frequency. Defaults to 16000.
     """
 
+    multichannel = True
+
     def __init__(
         self,
         apply_ramp_duration: float = 0.0,
@@ -63,21 +67,70 @@ class ApplyRamp(AbsCommonInterface, AbsProcessingInterface):
         )
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply ramp
 
         Args:
             x: Input signal
+            out: Output buffer (may be `x` itself). Defaults to None.
 
         Returns:
             Output signal
         """
-
+        w_raise, w_fall = self._ramps(x.shape[0])
+        if w_raise is None and w_fall is None:
+            if out is None:
+                return x
+            out[...] = x
+            return out
+
+        # the ramp is multiplied to the copy of input, or to `out` (may be `x` itself) in-place
+        if out is None:
+            y = x.copy()
+        else:
+            if out is not x:
+                out[...] = x
+            y = out
+
+        # broadcast to all channels of multi-channel signal
+        if w_raise is not None:
+            y[: w_raise.shape[0]] *= w_raise.reshape((-1,) + (1,) * (x.ndim - 1))
+        if w_fall is not None:
+            y[-w_fall.shape[0] :] *= w_fall.reshape((-1,) + (1,) * (x.ndim - 1))
+        return y
+
+    def reset(self, length: int, sounds: Sequence[np.ndarray] = ()) -> None:
+        self._w_raise, self._w_fall = self._ramps(length)
+        self._length = length
+        # position of the head of next block in the whole signal
+        self._position = 0
+
+    def process_block(self, x: np.ndarray, pass_index: int, last: bool) -> np.ndarray:
+        start = self._position
+        end = start + x.shape[0]
+        self._position = end
+        # the block is copied only if it overlaps the ramps
+        y = x
+        if self._w_raise is not None and start < self._w_raise.shape[0]:
+            y = x.copy()
+            stop = min(end, self._w_raise.shape[0])
+            y[: stop - start] *= self._w_raise[start:stop].reshape((-1,) + (1,) * (x.ndim - 1))
+        if self._w_fall is not None and end > self._length - self._w_fall.shape[0]:
+            if y is x:
+                y = x.copy()
+            fall_start = self._length - self._w_fall.shape[0]
+            begin = max(start, fall_start)
+            y[begin - start :] *= self._w_fall[begin - fall_start : end - fall_start].reshape(
+                (-1,) + (1,) * (x.ndim - 1)
+            )
+        return y
+
+    def _ramps(self, t: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Return the rising and falling ramps for the signal of `t` samples (None if not applied)"""
         duration = int(self.duration * self.samp_freq / 1000)
-        t = x.shape[0]
         if duration == 0:
             logger.warning("duration=0 means no ramp application")
-            return x
+            return None, None
 
         if self.wfunction == "linear":
             w_raise = np.linspace(0, 1, duration)
@@ -96,7 +149,7 @@ class ApplyRamp(AbsCommonInterface, AbsProcessingInterface):
                         t, duration
                     )
                 )
-            x[:duration] = x[:duration] * w_raise
+            return w_raise, None
         elif self.position == "offset":
             if t < duration:
                 raise ValueError(
@@ -104,7 +157,7 @@ class ApplyRamp(AbsCommonInterface, AbsProcessingInterface):
                         t, duration
                     )
                 )
-            x[-duration:] = x[-duration:] * w_fall
+            return None, w_fall
         elif self.position == "both":
             if t < duration * 2:
                 raise ValueError(
@@ -112,12 +165,9 @@ class ApplyRamp(AbsCommonInterface, AbsProcessingInterface):
                         t, duration * 2
                     )
                 )
-            x[:duration] = x[:duration] * w_raise
-            x[-duration:] = x[-duration:] * w_fall
+            return w_raise, w_fall
         else:
             raise ValueError("Invalid position")
-        return x
-
 
 def apply_ramp(
     x: np.ndarray,
@@ -125,6 +175,7 @@ def apply_ramp(
     wfunction: str = "hann",
     position: str = "both",
     samp_freq: int = 16000,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """Apply ramp function to a given signal.
 
@@ -138,8 +189,9 @@ def apply_ramp(
         position: Position of application for ramp function.
             `onset`, `offset` and `both` are able to be applied. Defaults to "both".
         samp_freq: Sampling frequency. Defaults to 16000.
+        out: Output buffer (may be `x` itself). Defaults to None.
 
     Returns:
         Output signal
     """
-    return ApplyRamp(duration, wfunction, position, samp_freq)(x)
+    return ApplyRamp(duration, wfunction, position, samp_freq)(x, out=out)
@@ -2,6 +2,8 @@
 # encoding: utf-8
 """Declip"""
 
+from typing import Optional
+
 import numpy as np
 
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
@@ -11,11 +13,15 @@ from aspen.interfaces.abs_processing_interface import AbsProcessingInterface
 class Declip(AbsCommonInterface, AbsProcessingInterface):
     """Declip a signal if saturated.
 
+    Each channel of multi-channel signal is declipped independently.
+
     Args:
         declip_thres: The threshold whether the signal is saturated or not.
             Defaults to 1.0.
     """
 
+    multichannel = True
+
     def __init__(self, declip_thres: float = 1.0):
         self.thres = declip_thres
 
@@ -30,11 +36,12 @@ class Declip(AbsCommonInterface, AbsProcessingInterface):
         )
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply declip
 
         Args:
             x: Input signal
+            out: Output buffer (may be `x` itself). Defaults to None.
 
         Returns:
             Output signal
@@ -43,22 +50,31 @@ class Declip(AbsCommonInterface, AbsProcessingInterface):
             raise ValueError(
                 "thres must be greater than 0, but got {}".format(self.thres)
             )
-        xabs = np.abs(x)
-        if np.any(xabs > self.thres):
-            return x / xabs.max() * self.thres
-        else:
+        # the maximum of absolute value of each channel without the temporary array of np.abs(x)
+        peak = np.maximum(x.max(axis=0), -x.min(axis=0)) if x.shape[0] > 0 else 0
+        clipped = peak > self.thres
+        if np.any(clipped):
+            # the channels which are not saturated are divided and multiplied by 1 (i.e. unchanged)
+            y = np.divide(x, np.where(clipped, peak, 1), out=out)
+            y *= np.where(clipped, self.thres, 1).astype(y.dtype)
+            return y
+        elif out is None:
             return x
+        else:
+            out[...] = x
+            return out
 
 
-def declip(x: np.ndarray, thres: float = 1.0) -> np.ndarray:
+def declip(x: np.ndarray, thres: float = 1.0, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Declip a signal if saturated.
 
     Args:
         x: Input signal
         thres: The threshold whether the signal is saturated or not.
             Defaults to 1.0.
+        out: Output buffer (may be `x` itself). Defaults to None.
 
     Returns:
         Output signal
     """
-    return Declip(thres)(x)
+    return Declip(thres)(x, out=out)
@@ -2,12 +2,22 @@
 # encoding: utf-8
 """Extract envelope"""
 
+from typing import Optional, Sequence, Union
+
 import numpy as np
-from scipy import signal
 
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_processing_interface import AbsProcessingInterface
 from aspen.processings.filter_signal import filter_signal
+from aspen.utils.cli_utils import strtobool
+from aspen.utils.fft_utils import hilbert
+from aspen.utils.filter_utils import parse_filter_spec
+from aspen.utils.multirate import (
+    decimate,
+    decimation_factors,
+    interpolate,
+    multirate_margin,
+)
 
 
 class ExtractEnvelope(AbsCommonInterface, AbsProcessingInterface):
@@ -25,8 +35,19 @@ class ExtractEnvelope(AbsCommonInterface, AbsProcessingInterface):
         extract_envelope_lpf_fir_window: Window function for low-pass filter.
             Use only when `lpf-impulse-response=fir`. Defaults to "hann".
         samp_freq: Sampling frequency. Defaults to 16000.
+        extract_envelope_multirate: The flag to apply the low-pass filter at the low rate.
+            The rectified (or Hilbert-transformed) signal is decimated in stages, low-pass filtered
+            and interpolated back, which approximates the low-pass filter at the original rate.
+            Only the FIR filter is applied at the low rate, and the IIR filter is applied at the original rate
+            since the edges of forward-backward filtering depend on the rate. Defaults to False.
+        extract_envelope_lpf_filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width [Hz]
+            of low-pass filter splitted by the underscore symbol (e.g. 1_60_16).
+            If specified, the minimum order which meets the specification is used instead of the filter order.
+            Defaults to None.
     """
 
+    multichannel = True
+
     def __init__(
         self,
         extract_envelope_method: str = "rect",
@@ -35,6 +56,8 @@ class ExtractEnvelope(AbsCommonInterface, AbsProcessingInterface):
         extract_envelope_lpf_filter_order: int = 512,
         extract_envelope_lpf_fir_window: str = "hann",
         samp_freq: int = 16000,
+        extract_envelope_multirate: bool = False,
+        extract_envelope_lpf_filter_spec: Optional[str] = None,
     ):
         self.method = extract_envelope_method
         self.lpf_freq = extract_envelope_lpf_freq
@@ -42,6 +65,11 @@ class ExtractEnvelope(AbsCommonInterface, AbsProcessingInterface):
         self.lpf_filter_order = extract_envelope_lpf_filter_order
         self.lpf_fir_window = extract_envelope_lpf_fir_window
         self.samp_freq = samp_freq
+        self.multirate = extract_envelope_multirate
+        self.lpf_filter_spec = parse_filter_spec(extract_envelope_lpf_filter_spec)
+        if self.lpf_filter_spec is not None:
+            # the order is given by the specification
+            self.lpf_filter_order = None
 
     @staticmethod
     def add_arguments(parser):
@@ -78,24 +106,48 @@ class ExtractEnvelope(AbsCommonInterface, AbsProcessingInterface):
             type=str,
             help="Window function for low-pass filter. Use only when lpf-impulse-response=fir",
         )
+        group.add_argument(
+            "--extract-envelope-multirate",
+            default=False,
+            type=strtobool,
+            help="Apply the low-pass filter at the low rate with the polyphase decimation and interpolation "
+            "(only when lpf-impulse-response=fir)",
+        )
+        group.add_argument(
+            "--extract-envelope-lpf-filter-spec",
+            default=None,
+            type=str,
+            help="Passband ripple [dB], stopband attenuation [dB] and transition width [Hz] of low-pass filter "
+            "splitted by the underscore symbol (e.g. 1_60_16) instead of the filter order",
+        )
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply envelope extracting
 
         Args:
             x: Input signal
+            out: Output buffer (may be `x` itself). Defaults to None.
 
         Returns:
             Output signal
         """
         if self.method == "hilbert":
-            half = np.abs(signal.hilbert(x))
+            half = np.abs(hilbert(x, axis=0)).astype(x.dtype, copy=False)
         elif self.method == "rect":
-            half = np.where(x < 0, 0, x)
+            if out is None:
+                half = np.where(x < 0, 0, x)
+            else:
+                # half-wave rectification in `out`, which is also the output buffer of low-pass filter
+                if out is not x:
+                    out[...] = x
+                np.copyto(out, 0, where=out < 0)
+                half = out
         else:
             raise ValueError("Invalid extract_envelope method %s" % self.method)
 
+        if self.multirate and self.lpf_impulse_response == "fir":
+            return self._multirate_lowpass(half, out=out)
         env = filter_signal(
             half,
             "lowpass",
@@ -104,9 +156,59 @@ class ExtractEnvelope(AbsCommonInterface, AbsProcessingInterface):
             self.lpf_filter_order,
             self.lpf_fir_window,
             self.samp_freq,
+            out=out,
+            filter_spec=self.lpf_filter_spec,
         )
         return env
 
+    def _multirate_lowpass(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply the FIR low-pass filter at the low rate
+
+        The signal is padded with the zeros of the margin covered by the anti-aliasing filters at both sides,
+        as the FIR filter at the original rate regards the outside of the signal as the zeros.
+
+        Args:
+            x: Rectified (or Hilbert-transformed) signal
+            out: Output buffer (may be `x` itself). Defaults to None.
+
+        Returns:
+            Envelope
+        """
+        filter_order = self.lpf_filter_order
+        if self.lpf_filter_spec is not None:
+            # the components are kept up to the stopband
+            band_edge = self.lpf_freq + self.lpf_filter_spec[2] / 2
+        else:
+            if filter_order is None:
+                filter_order = 512
+            # the components are kept up to the end of the transition band of the window (about 4 bins)
+            band_edge = self.lpf_freq + 4 * self.samp_freq / filter_order
+        factors = decimation_factors(self.samp_freq, band_edge)
+        factor = int(np.prod(factors))
+        if self.lpf_filter_spec is None:
+            # the same transition width in Hz with the fewer taps
+            filter_order = max(int(round(filter_order / factor)), 2)
+        t = x.shape[0]
+        margin = multirate_margin(factors, self.samp_freq, band_edge)
+        y = np.pad(x, [(margin, margin)] + [(0, 0)] * (x.ndim - 1))
+        y = decimate(y, factors, self.samp_freq, band_edge)
+        y = filter_signal(
+            y,
+            "lowpass",
+            self.lpf_freq,
+            self.lpf_impulse_response,
+            filter_order,
+            self.lpf_fir_window,
+            self.samp_freq / factor,
+            out=y,
+            filter_spec=self.lpf_filter_spec,
+        )
+        y = interpolate(y, factors, self.samp_freq, band_edge, t + 2 * margin)[margin : margin + t]
+        if out is None:
+            return y
+        out[...] = y
+        return out
+
 
 def extract_envelope(
     x: np.ndarray,
@@ -116,6 +218,9 @@ def extract_envelope(
     lpf_filter_order: int = 512,
     lpf_fir_window: str = "hann",
     samp_freq: int = 16000,
+    out: Optional[np.ndarray] = None,
+    multirate: bool = False,
+    filter_spec: Union[str, Sequence[float], None] = None,
 ) -> np.ndarray:
     """Extract the envelope from a signal
 
@@ -132,6 +237,10 @@ def extract_envelope(
         lpf_fir_window: Window function for low-pass filter.
             Use only when `lpf-impulse-response=fir`. Defaults to "hann".
         samp_freq: Sampling frequency. Defaults to 16000.
+        out: Output buffer (may be `x` itself). Defaults to None.
+        multirate: The flag to apply the low-pass filter at the low rate. Defaults to False.
+        filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width [Hz]
+            of low-pass filter instead of the filter order. Defaults to None.
 
     Returns:
         Output signal
@@ -143,4 +252,6 @@ def extract_envelope(
         lpf_filter_order,
         lpf_fir_window,
         samp_freq,
-    )(x)
+        multirate,
+        filter_spec,
+    )(x, out=out)
@@ -3,18 +3,26 @@
 """Filter a signal"""
 
 from logging import getLogger
-from typing import Optional, Union
+from typing import Optional, Sequence, Union
 
 import numpy as np
 from scipy import signal
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_processing_interface import AbsProcessingInterface
+from aspen.utils.filter_utils import (
+    design_filter,
+    filter_cost,
+    fir_filter,
+    minimum_filter_order,
+    parse_filter_spec,
+)
 
 logger = getLogger(__name__)
 
 
-class FilterSignal(AbsCommonInterface, AbsProcessingInterface):
+class FilterSignal(AbsCommonInterface, AbsProcessingInterface, AbsBlockInterface):
     """Filter a signal.
 
     Args:
@@ -31,8 +39,14 @@ class FilterSignal(AbsCommonInterface, AbsProcessingInterface):
             (https://docs.scipy.org/doc/scipy/reference/signal.windows.html)
             Use only when impulse-response=fir". Defaults to "hann".
         samp_freq: Sampling frequency. Defaults to 16000.
+        filter_signal_filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width [Hz]
+            splitted by the underscore symbol (e.g. 1_60_100) instead of the filter order.
+            The minimum order which meets the specification is used (FIR filter is designed by Kaiser window).
+            Defaults to None.
     """
 
+    multichannel = True
+
     def __init__(
         self,
         filter_signal_btype: str,
@@ -41,6 +55,7 @@ class FilterSignal(AbsCommonInterface, AbsProcessingInterface):
         filter_signal_filter_order: Optional[int] = None,
         filter_signal_firwindow: str = "hann",
         samp_freq: int = 16000,
+        filter_signal_filter_spec: Union[str, Sequence[float], None] = None,
     ):
         self.btype = filter_signal_btype
         self.filter_freq = filter_signal_filter_freq
@@ -48,6 +63,11 @@ class FilterSignal(AbsCommonInterface, AbsProcessingInterface):
         self.filter_order = filter_signal_filter_order
         self.firwindow = filter_signal_firwindow
         self.samp_freq = samp_freq
+        self.filter_spec = parse_filter_spec(filter_signal_filter_spec)
+        if self.filter_spec is not None and self.filter_order is not None:
+            raise ValueError("Filter order and filter specification cannot be specified at the same time")
+        # cutoff frequency of the filter designed for the specification
+        self._spec_freq = None
 
     @staticmethod
     def add_arguments(parser):
@@ -87,21 +107,114 @@ class FilterSignal(AbsCommonInterface, AbsProcessingInterface):
             "Window function is listed in Scipy doc (https://docs.scipy.org/doc/scipy/reference/signal.windows.html). "
             "Use only when impulse-response=fir",
         )
+        group.add_argument(
+            "--filter-signal-filter-spec",
+            default=None,
+            type=str,
+            help="Passband ripple [dB], stopband attenuation [dB] and transition width [Hz] "
+            "splitted by the underscore symbol (e.g. 1_60_100) instead of the filter order. "
+            "The minimum order which meets the specification is used",
+        )
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply signal filtering
 
         Args:
             x: Input signal
+            out: Output buffer (may be `x` itself). Defaults to None.
 
         Returns:
             Output signal
         """
         # filtering preserved the phase characteristics
         t = x.shape[0]
+        coef = self._design(t)
+        if self.impulse_response == "fir":
+            # the delay (half the filter order) is compensated as if the zeros were appended to the input,
+            # with the direct or FFT convolution chosen by the cost model.
+            # filtering with the same data type as the input
+            return fir_filter(x, coef.astype(x.dtype), out=out)
+        # the group delay introduced by the filter shows nonlinearity on frequency axis.
+        # therefore apply (sos)filtfilt function (forward-backward filtering to compensate the delay)
+        # IIR filter is applied in float64 because it is numerically sensitive
+        y = signal.sosfiltfilt(coef, x, axis=0)
+        if out is None:
+            return y.astype(x.dtype, copy=False)
+        # `x` is no longer read, so `out` may be `x` itself
+        out[...] = y
+        return out
+
+    def reset(self, length: int, sounds: Sequence[np.ndarray] = ()) -> None:
+        self._coef = self._design(length)
+        if self.impulse_response == "fir":
+            # the first `delay` samples of output are dropped and `delay` zeros are fed at the end
+            # in the same way as `__call__`
+            self._delay = int(self.filter_order / 2)
+            self._skip = self._delay
+            # initialized by the first block to follow its data type
+            self._zi = None
+        else:
+            # filtfilt is non-causal, so each block is filtered with the margins of both sides.
+            # the margin is the length until the impulse response of the filter decays below the machine epsilon
+            _, p, _ = signal.sos2zpk(self._coef)
+            radius = np.max(np.abs(p))
+            padlen = 3 * (2 * len(self._coef) + 1)
+            if radius < 1:
+                decay = int(np.ceil(np.log(np.finfo(np.float64).eps) / np.log(radius)))
+            else:
+                decay = length
+            self._margin = min(decay + padlen, length)
+            self._buffer = None
+            # position of the head of buffer, next output and end of input in the whole signal
+            self._buffer_position = 0
+            self._output_position = 0
+            self._input_position = 0
+
+    def process_block(self, x: np.ndarray, pass_index: int, last: bool) -> np.ndarray:
+        if self.impulse_response == "fir":
+            b = self._coef.astype(x.dtype)
+            a = np.ones(1, dtype=x.dtype)
+            if self._zi is None:
+                self._zi = np.zeros(self.filter_order, dtype=x.dtype)
+            if x.shape[0] > 0:
+                y, self._zi = signal.lfilter(b, a, x, zi=self._zi)
+            else:
+                y = x
+            if last:
+                y_delay, self._zi = signal.lfilter(b, a, np.zeros(self._delay, dtype=x.dtype), zi=self._zi)
+                y = np.concatenate([y, y_delay])
+            skip = min(self._skip, y.shape[0])
+            self._skip -= skip
+            return y[skip:]
+
+        self._buffer = x if self._buffer is None else np.concatenate([self._buffer, x])
+        self._input_position += x.shape[0]
+        end = self._input_position if last else self._input_position - self._margin
+        if end <= self._output_position:
+            return x[:0]
+        y = signal.sosfiltfilt(self._coef, self._buffer).astype(x.dtype, copy=False)
+        y = y[self._output_position - self._buffer_position : end - self._buffer_position]
+        # keep the margin of the left side for the next block
+        head = max(end - self._margin, 0)
+        self._buffer = self._buffer[head - self._buffer_position :]
+        self._buffer_position = head
+        self._output_position = end
+        return y
+
+    def _design(self, t: int) -> np.ndarray:
+        """Design the filter
+
+        Args:
+            t: Length of input signal
+
+        Returns:
+            Coefficients of FIR filter (read-only) or second-order sections of IIR filter
+        """
         if isinstance(self.filter_freq, str):
             self.filter_freq = np.array(self.filter_freq.split("_")).astype(np.float64)
+        if self.filter_spec is not None and self._spec_freq is None:
+            self._design_for_spec()
         if self.impulse_response == "fir":
             # FIR filter taken care of the phase delay by zero padding
             # https://www.mathworks.com/help/signal/ug/practical-introduction-to-digital-filtering.html
@@ -117,37 +230,56 @@ class FilterSignal(AbsCommonInterface, AbsProcessingInterface):
                     + str(int(t / 2))
                     + ", otherwise use IIR filter"
                 )
-            delay = int(self.filter_order / 2)
-            # before filtering, append delay-dim zeros at the end of the input data to compensate for delay
-            x = np.concatenate([x, np.zeros(delay)])
-            # 1st argv of firwin is the number of taps (= the filter order + 1)
-            b = signal.firwin(
-                self.filter_order + 1,
-                self.filter_freq,
-                window=self.firwindow,
-                pass_zero=self.btype,
-                fs=self.samp_freq,
-            )
-            x = signal.lfilter(b, 1, x)
-            x = x[delay:]
-
         elif self.impulse_response == "iir":
             # butterworth filter (IIR) with SOS (Second Order Section, Biquad) type
             if self.filter_order is None:
                 self.filter_order = 2
-            sos = signal.butter(
-                self.filter_order,
-                self.filter_freq,
-                btype=self.btype,
-                fs=self.samp_freq,
-                output="sos",
-            )
-            # the group delay introduced by the filter shows nonlinearity on frequency axis.
-            # therefore apply (sos)filtfilt function (forward-backward filtering to compensate the delay)
-            x = signal.sosfiltfilt(sos, x)
         else:
             raise ValueError("Invalid impulse_response. Must be either fir or iir.")
-        return x
+        # the same filter is designed for every utterance, so the coefficients are shared by the cache
+        coef = design_filter(
+            self.btype,
+            self.filter_freq if self._spec_freq is None else self._spec_freq,
+            self.impulse_response,
+            self.filter_order,
+            self.firwindow,
+            self.samp_freq,
+        )
+        if self.impulse_response == "iir":
+            # sosfilt requires the writable sections, which are small enough to be copied
+            coef = coef.copy()
+        return coef
+
+    def _design_for_spec(self):
+        """Set the minimum filter order (and the cutoff frequency and window) which meets the specification"""
+        self.filter_order, self._spec_freq, window = minimum_filter_order(
+            self.btype, self.filter_freq, self.impulse_response, *self.filter_spec, samp_freq=self.samp_freq
+        )
+        if window is not None:
+            self.firwindow = window
+        # the saving against the default order is reported
+        default_order = 512 if self.impulse_response == "fir" else 2
+        cost = filter_cost(
+            design_filter(
+                self.btype,
+                self._spec_freq,
+                self.impulse_response,
+                self.filter_order,
+                self.firwindow,
+                self.samp_freq,
+            ),
+            self.impulse_response,
+        )
+        default_cost = filter_cost(
+            design_filter(self.btype, self.filter_freq, self.impulse_response, default_order, "hann", self.samp_freq),
+            self.impulse_response,
+        )
+        logger.info(
+            "Minimum filter order = {} for the specification {}: {} multiplications per sample "
+            "({:.0f}% of the default order {})".format(
+                self.filter_order, self.filter_spec, cost, 100 * cost / default_cost, default_order
+            )
+        )
 
 
 def filter_signal(
@@ -158,6 +290,8 @@ def filter_signal(
     filter_order: Optional[int] = None,
     firwindow: str = "hann",
     samp_freq: int = 16000,
+    out: Optional[np.ndarray] = None,
+    filter_spec: Union[str, Sequence[float], None] = None,
 ) -> np.ndarray:
     """Filter a signal.
 
@@ -176,6 +310,9 @@ def filter_signal(
             (https://docs.scipy.org/doc/scipy/reference/signal.windows.html)
             Use only when impulse-response=fir". Defaults to "hann".
         samp_freq: Sampling frequency. Defaults to 16000.
+        out: Output buffer (may be `x` itself). Defaults to None.
+        filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width [Hz]
+            instead of the filter order. Defaults to None.
 
     Returns:
         Output signal
@@ -187,4 +324,5 @@ def filter_signal(
         filter_order,
         firwindow,
         samp_freq,
-    )(x)
+        filter_spec,
+    )(x, out=out)
@@ -3,7 +3,7 @@
 """Calculate a modulation power spectrum"""
 
 from logging import getLogger
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import librosa
 import numpy as np
@@ -13,6 +13,7 @@ from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_processing_interface import AbsProcessingInterface
 from aspen.processings.normalize import normalize
 from aspen.utils.cli_utils import strtobool
+from aspen.utils.fft_utils import fft2, fft_backend
 
 logger = getLogger(__name__)
 
@@ -50,6 +51,9 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
         modulation_power_spectrum_backend: The library to calculate STFT.
             The choices are "librosa" or "scipy". Defaults to "librosa".
         samp_freq: Sampling frequency. Defaults to 16000.
+        modulation_power_spectrum_keep_raw_mps: The flag of keeping the result of 2-D discrete Fourier transform
+            for `raw_mps`. If False, each frame of 2D-FFT with window-shifting is discarded
+            after it is accumulated to the power spectrum. Defaults to True.
     """
 
     def __init__(
@@ -65,6 +69,7 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
         modulation_power_spectrum_fft2_win_shift: int = 0,
         modulation_power_spectrum_backend: str = "librosa",
         samp_freq: int = 16000,
+        modulation_power_spectrum_keep_raw_mps: bool = True,
     ):
         self.spec_samp_freq = modulation_power_spectrum_spec_samp_freq
         self.gauss_window_alpha = modulation_power_spectrum_gauss_window_alpha
@@ -77,6 +82,7 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
         self.fft2_win_shift = modulation_power_spectrum_fft2_win_shift
         self.backend = modulation_power_spectrum_backend
         self.samp_freq = samp_freq
+        self.keep_raw_mps = modulation_power_spectrum_keep_raw_mps
 
     @staticmethod
     def add_arguments(parser):
@@ -145,15 +151,19 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
 
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Calculate modulation power spectrum
 
         Args:
             x: Input signal
+            out: Not supported since the modulation power spectrum does not have the shape of the input.
+                Must be None.
 
         Returns:
             Return the modulation power spectrum.
         """
+        if out is not None:
+            raise ValueError("Modulation power spectrum does not support the output buffer")
 
         if self.upper_freq > self.samp_freq / 2:
             raise ValueError(
@@ -173,15 +183,17 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
         window = ("gaussian", win_std)
         # calculate the spectrogram with gaussian window
         if self.backend == "librosa":
-            spec = librosa.stft(
-                x,
-                n_fft=wduration,
-                hop_length=win_shift,
-                win_length=wduration,
-                window=window,
-                center=True,
-                pad_mode="constant",
-            )
+            # the FFTs of the STFT are computed by the backend of aspen
+            with fft_backend():
+                spec = librosa.stft(
+                    x,
+                    n_fft=wduration,
+                    hop_length=win_shift,
+                    win_length=wduration,
+                    window=window,
+                    center=True,
+                    pad_mode="constant",
+                )
             spec_f = librosa.fft_frequencies(sr=self.samp_freq, n_fft=wduration)
             spec_t = librosa.core.frames_to_time(
                 np.arange(spec.shape[1]), sr=self.samp_freq, hop_length=win_shift
@@ -189,17 +201,18 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
             stft_param = {"n_fft": wduration, "hop_length": win_shift, "window": window}
         elif self.backend == "scipy":
             noverlap = wduration - win_shift
-            spec_f, spec_t, spec = signal.stft(
-                x,
-                self.samp_freq,
-                window=window,
-                nperseg=wduration,
-                noverlap=noverlap,
-                detrend=False,
-                return_onesided=True,
-                boundary="zeros",
-                padded=False,
-            )
+            with fft_backend():
+                spec_f, spec_t, spec = signal.stft(
+                    x,
+                    self.samp_freq,
+                    window=window,
+                    nperseg=wduration,
+                    noverlap=noverlap,
+                    detrend=False,
+                    return_onesided=True,
+                    boundary="zeros",
+                    padded=False,
+                )
             stft_param = {"window": window, "nperseg": wduration, "noverlap": noverlap}
         else:
             raise ValueError("Invalid backend")
@@ -207,7 +220,7 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
             spec[(spec_f >= self.lower_freq) & (spec_f <= self.upper_freq), :]
         )
         # avoid to be divided by zero
-        spec = np.where(spec == 0, EPSILON, spec)
+        spec = np.where(spec == 0, spec.dtype.type(EPSILON), spec)
         spec = 20 * np.log10(spec)  # log (dB) scale
         spec_f_size = spec.shape[0]
         spec_t_size = spec.shape[1]
@@ -218,13 +231,14 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
             lower_amp = spec.max() - self.spec_db_range
             spec[spec < lower_amp] = lower_amp
         if self.spec_normalize:
-            spec = normalize(spec, "zscore")
+            # the whole spectrogram is normalized (not each frame)
+            spec = normalize(spec, "zscore", axis=None)
 
         # fft2 w/o window-shifting
         # is easy to calculate the inverse 2D-FFT so that generate modulation filtering signal
         if self.fft2_win_duration == 0:
             logger.info("2D-FFT is executed without window shifting")
-            mps = fft.fft2(spec)
+            mps = fft2(spec)
             mps_pow = np.abs(mps) ** 2
             mps_f = fft.fftfreq(
                 spec_f_size, spec_f[1] - spec_f[0]
@@ -247,7 +261,7 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
             # the multiplied coefficient (1/(sigma*sqrt(2*pi))) is required for a probability density distribution,
             # not for a window
             window = signal.windows.gaussian(wduration, win_std)
-            window = np.tile(window, [spec_f_size, 1])
+            window = np.tile(window.astype(spec.dtype), [spec_f_size, 1])
             if self.fft2_win_shift == 0:
                 self.fft2_win_shift = int((wduration - 1) // 6)
             # pad with minimum value at the beggining and end of the spectrogram
@@ -263,15 +277,16 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
             fft2_step = list(
                 range(half_wduration, spec_t_size + 1, self.fft2_win_shift)
             )
-            mps = []
-            mps_pow = np.zeros([spec_f_size, wduration])
-            for i, wcenter in enumerate(fft2_step):
-                cloned = padded_spec.copy()
+            mps = [] if self.keep_raw_mps else None
+            mps_pow = np.zeros([spec_f_size, wduration], dtype=spec.dtype)
+            for wcenter in fft2_step:
                 wonset = wcenter - half_wduration
                 woffset = wcenter + half_wduration + 1
-                cloned = cloned[:, wonset:woffset] * window
-                mps.append(fft.fft2(cloned))
-                mps_pow += np.abs(mps[i]) ** 2
+                # the windowed segment is a new array, so the padded spectrogram is not copied
+                frame = fft2(padded_spec[:, wonset:woffset] * window)
+                mps_pow += np.abs(frame) ** 2
+                if mps is not None:
+                    mps.append(frame)
 
             mps_pow /= len(fft2_step)
             mps_f = fft.fftfreq(
@@ -318,11 +333,12 @@ class ModulationPowerSpectrum(AbsCommonInterface, AbsProcessingInterface):
             raise NameError("should run class method of __call__ first.")
         return self.mps_t
 
-    def raw_mps(self) -> List:
+    def raw_mps(self) -> Optional[List]:
         """Return the listed result of 2-D discrete Fourier transform.
 
         Returns:
-            the listed result of 2-D discrete Fourier transform.
+            the listed result of 2-D discrete Fourier transform
+            (None if it is not kept with window-shifting).
         """
         if not hasattr(self, "mps"):
             raise NameError("should run class method of __call__ first.")
@@ -342,7 +358,8 @@ def modulation_power_spectrum(
     fft2_win_shift: int = 0,
     backend: str = "librosa",
     samp_freq: int = 16000,
-) -> Tuple[Dict, np.ndarray, np.ndarray, List, np.ndarray]:
+    keep_raw_mps: bool = True,
+) -> Tuple[Dict, np.ndarray, np.ndarray, Optional[List], np.ndarray]:
     """Modulation Power Spectrum.
 
     This method is heavily inspired by soundsig (https://github.com/theunissenlab/soundsig).
@@ -374,6 +391,8 @@ def modulation_power_spectrum(
         backend: The library to calculate STFT.
             The choices are "librosa" or "scipy". Defaults to "librosa".
         samp_freq: Sampling frequency. Defaults to 16000.
+        keep_raw_mps: The flag of keeping the result of 2-D discrete Fourier transform.
+            If False, None is returned instead of the listed result with window-shifting. Defaults to True.
 
     Returns:
         Return the pameters for short-time Fourier transform,
@@ -395,6 +414,7 @@ def modulation_power_spectrum(
         fft2_win_shift,
         backend,
         samp_freq,
+        keep_raw_mps,
     )
     mps_pow = mps(x)
     return (
@@ -2,6 +2,8 @@
 # encoding: utf-8
 """Normalize"""
 
+from typing import Optional
+
 import numpy as np
 
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
@@ -17,11 +19,15 @@ class Normalize(AbsCommonInterface, AbsProcessingInterface):
             standard deviation (spread or “width”) of the distribution = 1.
             Defaults to "zscore".
 
+    Each channel of multi-channel signal is normalized independently.
+
     Todo:
         Implementation of other method if necessary.
         REF(https://www.mathworks.com/help/matlab/ref/double.normalize.html)
     """
 
+    multichannel = True
+
     def __init__(self, normalize_method: str = "zscore"):
         self.method = normalize_method
 
@@ -37,23 +43,22 @@ class Normalize(AbsCommonInterface, AbsProcessingInterface):
         )
         return parser
 
-    def __call__(self, x: np.ndarray) -> np.ndarray:
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Apply normalization
 
         Args:
             x: Input signal
+            out: Output buffer (may be `x` itself). Defaults to None.
 
         Returns:
             Output signal
         """
-        if self.method == "zscore":
-            # z_score = (x - mu) / sigma [mu = mean, sigma = standard deviation]
-            return (x - x.mean()) / np.std(x)
-        else:
-            raise ValueError("Invalid method")
+        return normalize(x, self.method, out=out)
 
 
-def normalize(x: np.ndarray, method: str = "zscore") -> np.ndarray:
+def normalize(
+    x: np.ndarray, method: str = "zscore", out: Optional[np.ndarray] = None, axis: Optional[int] = 0
+) -> np.ndarray:
     """Nomarlize a signal.
 
     Args:
@@ -62,8 +67,20 @@ def normalize(x: np.ndarray, method: str = "zscore") -> np.ndarray:
             `zscore` provide the mean (centre) of the distribution = 0 and
             standard deviation (spread or “width”) of the distribution = 1.
             Defaults to "zscore".
+        out: Output buffer (may be `x` itself). Defaults to None.
+        axis: Axis along which the signal is normalized.
+            None normalizes the whole array (e.g. a spectrogram of shape (frequency, time)).
+            Defaults to 0 (= each channel of the signal of shape (time, channel)).
 
     Returns:
         Output signal.
     """
-    return Normalize(method)(x)
+    if method == "zscore":
+        # z_score = (x - mu) / sigma [mu = mean, sigma = standard deviation]
+        # sigma is calculated before `out` (may be `x`) is overwritten
+        sigma = np.std(x, axis=axis)
+        y = np.subtract(x, x.mean(axis=axis), out=out)
+        y /= sigma
+        return y
+    else:
+        raise ValueError("Invalid method")
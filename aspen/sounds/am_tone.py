@@ -34,8 +34,11 @@ class AmTone(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
     """
 
+    deterministic = True
+
     def __init__(
         self,
         am_tone_duration: Sequence[float] = [1000],
@@ -46,6 +49,7 @@ class AmTone(AbsCommonInterface, AbsSoundInterface):
         am_tone_modulator_phase: Sequence[float] = [0],
         am_tone_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
     ):
         self.duration = am_tone_duration
         self.freq = am_tone_freq
@@ -55,6 +59,7 @@ class AmTone(AbsCommonInterface, AbsSoundInterface):
         self.modulator_phase = am_tone_modulator_phase
         self.num_signals = am_tone_num_signals
         self.samp_freq = samp_freq
+        self.dtype = dtype
 
     @staticmethod
     def add_arguments(parser):
@@ -147,6 +152,7 @@ def am_tone(
     modulator_phase: Sequence[float] = [0],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
 ) -> List[np.ndarray]:
     """Generate sinusoidally amplitude modulated tone.
 
@@ -166,6 +172,7 @@ def am_tone(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
 
     Returns:
         Output signals.
@@ -179,4 +186,5 @@ def am_tone(
         modulator_phase,
         num_signals,
         samp_freq,
+        dtype,
     )()
@@ -22,19 +22,24 @@ class ClickTrainPitch(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
     """
 
+    deterministic = True
+
     def __init__(
         self,
         click_train_pitch_duration: Sequence[float] = [1000],
         click_train_pitch_interval: Sequence[float] = [1],
         click_train_pitch_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
     ):
         self.duration = click_train_pitch_duration
         self.interval = click_train_pitch_interval
         self.num_signals = click_train_pitch_num_signals
         self.samp_freq = samp_freq
+        self.dtype = dtype
 
     @staticmethod
     def add_arguments(parser):
@@ -86,6 +91,7 @@ def click_train_pitch(
     interval: Sequence[float] = [1],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
 ) -> List[np.ndarray]:
     """Generate click train pitch.
 
@@ -98,8 +104,9 @@ def click_train_pitch(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
 
     Returns:
         Output signals.
     """
-    return ClickTrainPitch(duration, interval, num_signals, samp_freq)()
+    return ClickTrainPitch(duration, interval, num_signals, samp_freq, dtype)()
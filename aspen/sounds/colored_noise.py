@@ -3,7 +3,7 @@
 """Colored noise"""
 
 from logging import getLogger
-from typing import List, Sequence
+from typing import List, Optional, Sequence
 
 import numpy as np
 
@@ -11,6 +11,8 @@ from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_sound_interface import AbsSoundInterface
 from aspen.processings.declip import declip
 from aspen.processings.normalize import normalize
+from aspen.utils.fft_utils import irfft, rfft
+from aspen.utils.noise_bank import draw_from_bank, load_noise_bank, noise_bank_name
 
 logger = getLogger(__name__)
 
@@ -39,6 +41,13 @@ class ColoredNoise(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
+        noise_bank_dir: Directory of the noise banks (see `aspen.utils.noise_bank`).
+            If specified, the independent noises of each color and duration are generated once into the bank
+            and the noise of each call is a random one of them.
+            Defaults to None (= the noise is generated for every call).
+        noise_bank_duration: The duration of each noise bank in millisecond.
+            Defaults to 300000.
     """
 
     def __init__(
@@ -47,11 +56,19 @@ class ColoredNoise(AbsCommonInterface, AbsSoundInterface):
         colored_noise_color: Sequence[str] = ["white"],
         colored_noise_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
+        noise_bank_dir: Optional[str] = None,
+        noise_bank_duration: float = 300000,
     ):
         self.duration = colored_noise_duration
         self.color = colored_noise_color
         self.num_signals = colored_noise_num_signals
         self.samp_freq = samp_freq
+        self.dtype = dtype
+        self.noise_bank_dir = noise_bank_dir
+        self.noise_bank_duration = noise_bank_duration
+        # bank of each color
+        self._banks = {}
 
     @staticmethod
     def add_arguments(parser):
@@ -102,24 +119,71 @@ class ColoredNoise(AbsCommonInterface, AbsSoundInterface):
         else:
             raise ValueError("Invalid color, got {}".format(color))
 
-        x = np.random.normal(loc=0, scale=1, size=[duration]).astype(np.float64)
-        X = np.fft.rfft(x, norm="forward")
+        if self.noise_bank_dir is None:
+            x = np.random.normal(loc=0, scale=1, size=[duration]).astype(np.float64, copy=False)
+            y = self._shape_spectrum(x, inv_freq_scale)
+        else:
+            # the slice of the read-only bank is copied
+            y = np.array(draw_from_bank(self._bank(color, inv_freq_scale, duration), duration, aligned=True))
+        # ensure unity standard deviation and zero mean value (in-place on the newly allocated signal)
+        y = declip(normalize(y, "zscore", out=y), 1.0, out=y)
+        return y
+
+    def _shape_spectrum(self, x: np.ndarray, inv_freq_scale: float) -> np.ndarray:
+        """Scale the spectrum of the white noise by the inverse of the power of frequency"""
+        duration = x.shape[0]
+        # the scaling is the gain of each bin, so the spectrum is computed without the padding to the fast length
+        X = rfft(x, duration, norm="forward")
+        del x
         # power spectrum is calculated by abs(spectrum)**2
         # however, the below scaling is implemented under spectrum scale.
         # (e.g. pink noise is generated by 1/f scale of power spectrum theoretically,
         # therefore, scaling factor in spectrum is defined by (1/(f**(1/2)))
         scaling = np.arange(1, X.shape[0] + 1) ** (inv_freq_scale / 2)
-        y = np.fft.irfft(X / scaling, norm="forward").real[:duration]
-        # ensure unity standard deviation and zero mean value
-        y = declip(normalize(y, "zscore"), 1.0)
-        return y
-
+        X /= scaling
+        del scaling
+        return irfft(X, duration, norm="forward", n=duration)
+
+    def _bank(self, color: str, inv_freq_scale: float, duration: int) -> np.ndarray:
+        """Return the noise bank of the color for the noise of `duration` samples
+
+        The spectrum of the colored noise depends on its duration (the scaling of each bin),
+        so the bank is the sequence of the independent noises of `duration` samples
+        instead of one long noise whose slices have the components below the lowest frequency of the duration.
+        """
+        if (color, duration) not in self._banks:
+            num_segments = int(self.noise_bank_duration * self.samp_freq / 1000) // duration
+            if num_segments < 1:
+                raise ValueError(
+                    "Noise bank of {} ms is shorter than the noise of {} samples".format(
+                        self.noise_bank_duration, duration
+                    )
+                )
+
+            def generate(rng, n):
+                x = np.empty(n, dtype=np.float64)
+                for i in range(num_segments):
+                    segment = rng.normal(loc=0, scale=1, size=[duration])
+                    x[i * duration : (i + 1) * duration] = self._shape_spectrum(segment, inv_freq_scale)
+                return x
+
+            length = num_segments * duration
+            self._banks[(color, duration)] = load_noise_bank(
+                self.noise_bank_dir,
+                noise_bank_name("colored_noise", color, self.samp_freq, duration, num_segments),
+                length,
+                generate,
+            )
+        return self._banks[(color, duration)]
 
 def colored_noise(
     duration: Sequence[float] = [1000],
     color: Sequence[str] = ["white"],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
+    noise_bank_dir: Optional[str] = None,
+    noise_bank_duration: float = 300000,
 ) -> List[np.ndarray]:
     """Generate colored noise.
     Colored noise is generated according to the following table.
@@ -144,8 +208,11 @@ def colored_noise(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
+        noise_bank_dir: Directory of the noise banks. Defaults to None (= without the bank).
+        noise_bank_duration: The duration of each noise bank in millisecond. Defaults to 300000.
 
     Returns:
         Output signals.
     """
-    return ColoredNoise(duration, color, num_signals, samp_freq)()
+    return ColoredNoise(duration, color, num_signals, samp_freq, dtype, noise_bank_dir, noise_bank_duration)()
@@ -10,6 +10,7 @@ import numpy as np
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_sound_interface import AbsSoundInterface
 from aspen.processings.declip import declip
+from aspen.utils.fft_utils import irfft, rfft
 
 logger = getLogger(__name__)
 
@@ -40,8 +41,11 @@ class ComplexTone(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
     """
 
+    deterministic = True
+
     def __init__(
         self,
         complex_tone_duration: Sequence[float] = [1000],
@@ -52,6 +56,7 @@ class ComplexTone(AbsCommonInterface, AbsSoundInterface):
         complex_tone_tilt_type: Sequence[str] = ["default"],
         complex_tone_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
     ):
         self.duration = complex_tone_duration
         self.fundamental_freq = complex_tone_fundamental_freq
@@ -61,6 +66,7 @@ class ComplexTone(AbsCommonInterface, AbsSoundInterface):
         self.tilt_type = complex_tone_tilt_type
         self.num_signals = complex_tone_num_signals
         self.samp_freq = samp_freq
+        self.dtype = dtype
 
     @staticmethod
     def add_arguments(parser):
@@ -152,15 +158,12 @@ class ComplexTone(AbsCommonInterface, AbsSoundInterface):
             first_harmonic_freq += fundamental_freq
 
         if tilt_type != "default":
-            X = np.fft.rfft(x, norm="forward")
+            # the tilt is the gain of each bin, so the spectrum is computed without the padding to the fast length
+            X = rfft(x, duration, norm="forward")
             if tilt_type == "up":
-                x = np.fft.irfft(X * np.arange(1, X.shape[0] + 1), norm="forward").real[
-                    :duration
-                ]
+                x = irfft(X * np.arange(1, X.shape[0] + 1), duration, norm="forward", n=duration)
             elif tilt_type == "down":
-                x = np.fft.irfft(X / np.arange(1, X.shape[0] + 1), norm="forward").real[
-                    :duration
-                ]
+                x = irfft(X / np.arange(1, X.shape[0] + 1), duration, norm="forward", n=duration)
         x = declip(x, 1.0)
         return x
 
@@ -174,6 +177,7 @@ def complex_tone(
     tilt_type: Sequence[str] = ["default"],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
 ) -> List[np.ndarray]:
     """Generate complex tone.
 
@@ -200,6 +204,7 @@ def complex_tone(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
 
     Returns:
         Output signals.
@@ -214,4 +219,5 @@ def complex_tone(
         tilt_type,
         num_signals,
         samp_freq,
+        dtype,
     )()
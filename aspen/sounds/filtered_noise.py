@@ -3,7 +3,7 @@
 """Filtered noise"""
 
 from logging import getLogger
-from typing import List, Sequence
+from typing import List, Optional, Sequence
 
 import numpy as np
 
@@ -11,6 +11,7 @@ from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_sound_interface import AbsSoundInterface
 from aspen.processings.declip import declip
 from aspen.processings.filter_signal import filter_signal
+from aspen.utils.noise_bank import draw_from_bank, load_noise_bank, noise_bank_name
 
 logger = getLogger(__name__)
 
@@ -42,6 +43,13 @@ class FilteredNoise(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
+        noise_bank_dir: Directory of the noise banks (see `aspen.utils.noise_bank`).
+            If specified, the noise of each filter is generated once into the bank
+            and the noise of each call is the slice of the bank at a random offset.
+            Defaults to None (= the noise is generated for every call).
+        noise_bank_duration: The duration of each noise bank in millisecond.
+            Defaults to 300000.
     """
 
     def __init__(
@@ -54,6 +62,9 @@ class FilteredNoise(AbsCommonInterface, AbsSoundInterface):
         filtered_noise_filter_firwin: Sequence[str] = ["hann"],
         filtered_noise_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
+        noise_bank_dir: Optional[str] = None,
+        noise_bank_duration: float = 300000,
     ):
         self.duration = filtered_noise_duration
         self.btype = filtered_noise_btype
@@ -63,6 +74,11 @@ class FilteredNoise(AbsCommonInterface, AbsSoundInterface):
         self.filter_firwin = filtered_noise_filter_firwin
         self.num_signals = filtered_noise_num_signals
         self.samp_freq = samp_freq
+        self.dtype = dtype
+        self.noise_bank_dir = noise_bank_dir
+        self.noise_bank_duration = noise_bank_duration
+        # bank of each filter
+        self._banks = {}
 
     @staticmethod
     def add_arguments(parser):
@@ -137,19 +153,35 @@ class FilteredNoise(AbsCommonInterface, AbsSoundInterface):
         filter_order = self.filter_order[idx]
         filter_firwin = self.filter_firwin[idx]
 
-        x = np.random.normal(loc=0, scale=1, size=[duration]).astype(np.float64)
-        y = filter_signal(
-            x,
-            btype,
-            filter_freq,
-            filter_impulse_response,
-            filter_order,
-            filter_firwin,
-            self.samp_freq,
-        )
-        y = declip(y, 1.0)
+        filter_params = (btype, filter_freq, filter_impulse_response, filter_order, filter_firwin)
+        if self.noise_bank_dir is None:
+            x = np.random.normal(loc=0, scale=1, size=[duration]).astype(np.float64)
+            y = filter_signal(x, *filter_params, self.samp_freq)
+        else:
+            # the slice of the read-only bank is copied
+            y = np.array(draw_from_bank(self._bank(filter_params), duration))
+        y = declip(y, 1.0, out=y)
         return y
 
+    def _bank(self, filter_params: tuple) -> np.ndarray:
+        """Return the noise bank of the filter"""
+        if filter_params not in self._banks:
+            length = int(self.noise_bank_duration * self.samp_freq / 1000)
+            # the transients at both ends of the filtered noise (one second each) are excluded from the bank
+            margin = self.samp_freq
+
+            def generate(rng, n):
+                x = rng.normal(loc=0, scale=1, size=[n + 2 * margin])
+                return filter_signal(x, *filter_params, self.samp_freq)[margin : n + margin]
+
+            self._banks[filter_params] = load_noise_bank(
+                self.noise_bank_dir,
+                noise_bank_name("filtered_noise", *filter_params, self.samp_freq, length),
+                length,
+                generate,
+            )
+        return self._banks[filter_params]
+
 
 def filtered_noise(
     duration: Sequence[float] = [1000],
@@ -160,6 +192,9 @@ def filtered_noise(
     filter_firwin: Sequence[str] = ["hann"],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
+    noise_bank_dir: Optional[str] = None,
+    noise_bank_duration: float = 300000,
 ) -> List[np.ndarray]:
     """Generate filtered noise.
 
@@ -187,6 +222,9 @@ def filtered_noise(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
+        noise_bank_dir: Directory of the noise banks. Defaults to None (= without the bank).
+        noise_bank_duration: The duration of each noise bank in millisecond. Defaults to 300000.
 
     Returns:
         Output signals.
@@ -200,4 +238,7 @@ def filtered_noise(
         filter_firwin,
         num_signals,
         samp_freq,
+        dtype,
+        noise_bank_dir,
+        noise_bank_duration,
     )()
@@ -32,6 +32,7 @@ class FmTone(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
 
     Todo:
         Other chirp method (e.g. logarithmic).
@@ -43,6 +44,8 @@ class FmTone(AbsCommonInterface, AbsSoundInterface):
                  https://www.ncbi.nlm.nih.gov/pmc/articles/PMC5112215/
     """
 
+    deterministic = True
+
     def __init__(
         self,
         fm_tone_duration: Sequence[float] = [1000],
@@ -52,6 +55,7 @@ class FmTone(AbsCommonInterface, AbsSoundInterface):
         fm_tone_freq_excursion: Sequence[float] = [25],
         fm_tone_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
     ):
         self.duration = fm_tone_duration
         self.freq = fm_tone_freq
@@ -60,6 +64,7 @@ class FmTone(AbsCommonInterface, AbsSoundInterface):
         self.freq_excursion = fm_tone_freq_excursion
         self.num_signals = fm_tone_num_signals
         self.samp_freq = samp_freq
+        self.dtype = dtype
 
     @staticmethod
     def add_arguments(parser):
@@ -139,12 +144,12 @@ class FmTone(AbsCommonInterface, AbsSoundInterface):
                 dtype=np.float64,
             )
             if method == "updown":
-                x_head = apply_ramp(x_up, 5.0, "hann", "offset", self.samp_freq)
-                x_tail = apply_ramp(x_down, 5.0, "hann", "onset", self.samp_freq)
+                x_head = apply_ramp(x_up, 5.0, "hann", "offset", self.samp_freq, out=x_up)
+                x_tail = apply_ramp(x_down, 5.0, "hann", "onset", self.samp_freq, out=x_down)
                 x = np.concatenate([x_head, x_tail])
             else:
-                x_head = apply_ramp(x_down, 5.0, "hann", "offset", self.samp_freq)
-                x_tail = apply_ramp(x_up, 5.0, "hann", "onset", self.samp_freq)
+                x_head = apply_ramp(x_down, 5.0, "hann", "offset", self.samp_freq, out=x_down)
+                x_tail = apply_ramp(x_up, 5.0, "hann", "onset", self.samp_freq, out=x_up)
                 x = np.concatenate([x_head, x_tail])
         else:
             raise ValueError("Invalid method")
@@ -180,6 +185,7 @@ def fm_tone(
     freq_excursion: Sequence[float] = [25],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
 ) -> List[np.ndarray]:
     """Generate frequency modulated tone.
 
@@ -198,6 +204,7 @@ def fm_tone(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
 
     Returns:
         Output signals.
@@ -210,4 +217,5 @@ def fm_tone(
         freq_excursion,
         num_signals,
         samp_freq,
+        dtype,
     )()
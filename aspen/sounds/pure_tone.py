@@ -27,8 +27,11 @@ class PureTone(AbsCommonInterface, AbsSoundInterface):
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
     """
 
+    deterministic = True
+
     def __init__(
         self,
         pure_tone_duration: Sequence[float] = [1000],
@@ -36,6 +39,7 @@ class PureTone(AbsCommonInterface, AbsSoundInterface):
         pure_tone_phase: Sequence[float] = [0],
         pure_tone_num_signals: int = 1,
         samp_freq: int = 16000,
+        dtype: str = "float64",
     ):
         self.num_signals = pure_tone_num_signals
         assert self.num_signals == len(
@@ -51,6 +55,7 @@ class PureTone(AbsCommonInterface, AbsSoundInterface):
         self.freq = pure_tone_freq
         self.phase = pure_tone_phase
         self.samp_freq = samp_freq
+        self.dtype = dtype
 
     @staticmethod
     def add_arguments(parser):
@@ -102,6 +107,7 @@ def pure_tone(
     phase: Sequence[float] = [0],
     num_signals: int = 1,
     samp_freq: int = 16000,
+    dtype: str = "float64",
 ) -> List[np.ndarray]:
     """Generate pure tone.
 
@@ -116,8 +122,9 @@ def pure_tone(
             If this value greater than 2, the other arguments should contain 2 types.
             Defaults to 1.
         samp_freq: Sampling frequency. Defaults to 16000.
+        dtype: Data type of output signals. Defaults to "float64".
 
     Returns:
         Output signals.
     """
-    return PureTone(duration, freq, phase, num_signals, samp_freq)()
+    return PureTone(duration, freq, phase, num_signals, samp_freq, dtype)()
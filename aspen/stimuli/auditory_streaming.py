@@ -84,8 +84,8 @@ class AuditoryStreaming(AbsCommonInterface, AbsStimulusInterface):
         if len(x) != 2:
             raise ValueError("x must have the 2 elements which is comprised by [A, b]")
         # generate A-B-A-- sequence
-        ab_i = np.zeros(int(self.ab_interval * self.samp_freq / 1000))
-        aba_i = np.zeros(int(self.aba_interval * self.samp_freq / 1000))
+        ab_i = np.zeros(int(self.ab_interval * self.samp_freq / 1000), dtype=x[0].dtype)
+        aba_i = np.zeros(int(self.aba_interval * self.samp_freq / 1000), dtype=x[0].dtype)
         y = []
         for each_x in x:
             y.append(
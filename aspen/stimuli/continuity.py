@@ -2,17 +2,18 @@
 # encoding: utf-8
 """Continuity illusion stimulus"""
 
-from typing import Sequence
+from typing import List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_stimulus_interface import AbsStimulusInterface
 from aspen.processings.apply_ramp import apply_ramp
-from aspen.utils.snr_utils import get_snr_noise
+from aspen.utils.snr_utils import get_snr_noise, rms
 
 
-class Continuity(AbsCommonInterface, AbsStimulusInterface):
+class Continuity(AbsCommonInterface, AbsStimulusInterface, AbsBlockInterface):
     """Stimulus that occurs continuity illusion.
 
     Basic stimulus for continuity illusion consists of the repetitions of target_signal and gap_signal.
@@ -80,6 +81,11 @@ class Continuity(AbsCommonInterface, AbsStimulusInterface):
         )
         return parser
 
+    @property
+    def num_passes(self) -> int:
+        # the first pass calculates the RMS of target signal to adjust the noise level
+        return 1 if self.gap_method == "silent" or self.target_snr is None else 2
+
     def __call__(self, x: Sequence[np.ndarray]) -> np.ndarray:
         """Generate stimulus for continuity illusion.
 
@@ -100,14 +106,115 @@ class Continuity(AbsCommonInterface, AbsStimulusInterface):
                 "[target, noise] in the case of 'replace' or 'overlap'."
             )
 
-        # use the clone object to estimate the SNR
+        # the output is the only copy of target signal, and the operations are applied to it in-place
         stimulus = x[0].copy()
-        stimulus_t = stimulus.shape[0]
-        snr_noise = get_snr_noise(stimulus, x[1].copy(), self.target_snr)
+        if self.gap_method == "silent":
+            snr_noise = None
+        else:
+            # only the section overlapped with the target signal is scaled (same as `get_snr_noise`)
+            snr_noise = get_snr_noise(stimulus, x[1], self.target_snr, length=stimulus.shape[0])
+        self._apply_operations(self._operations(stimulus.shape[0]), stimulus, snr_noise, 0)
+        return stimulus
 
+    def reset(self, length: int, sounds: Sequence[np.ndarray] = ()) -> None:
+        if self.gap_method != "silent" and len(sounds) != 1:
+            raise ValueError(
+                "x must contain the 2 elements which is comprised by"
+                "[target, noise] in the case of 'replace' or 'overlap'."
+            )
+        self._length = length
+        self._ops = self._operations(length)
+        # for the search of operations overlapped with a block
+        onsets = np.array([op[1] for op in self._ops], dtype=np.int64)
+        offsets = np.array([op[2] for op in self._ops], dtype=np.int64)
+        self._ops_max_offset = np.maximum.accumulate(offsets) if len(self._ops) > 0 else offsets
+        self._ops_min_onset = np.minimum.accumulate(onsets[::-1])[::-1] if len(self._ops) > 0 else onsets
+        self._position = 0
+        self._sumsq = 0.0
+        if self.num_passes == 2:
+            self._rms_noise = rms(sounds[0])
+
+    def process_block(self, x: Sequence[np.ndarray], pass_index: int, last: bool) -> np.ndarray:
+        if pass_index < self.num_passes - 1:
+            # analysis pass
+            self._sumsq += np.sum(np.square(x[0]))
+            if last:
+                self._rms_noise_at_snr = np.sqrt(self._sumsq / self._length) / (10 ** (self.target_snr / 20))
+            return x[0][:0]
+
+        stimulus = x[0].copy()
+        if self.gap_method == "silent":
+            snr_noise = None
+        elif self.target_snr is None:
+            snr_noise = x[1]
+        else:
+            snr_noise = x[1] / self._rms_noise * self._rms_noise_at_snr
+        start = self._position
+        end = start + stimulus.shape[0]
+        first = np.searchsorted(self._ops_max_offset, start, side="right")
+        stop = np.searchsorted(self._ops_min_onset, end, side="left")
+        self._apply_operations(self._ops[first:stop], stimulus, snr_noise, start)
+        self._position = end
+        return stimulus
+
+    def _operations(self, stimulus_t: int) -> List[Tuple[str, int, int, Optional[np.ndarray]]]:
+        """List the operations to generate the stimulus in order.
+
+        Args:
+            stimulus_t: Length of target signal
+
+        Returns:
+            List of (kind, onset, offset, window) applied to the section [onset, offset) of target signal.
+            `ramp` multiplies the window, `zero` fills zero and `add` adds the noise (multiplied by the window).
+        """
         target_duration = int(self.target_duration * self.samp_freq / 1000)
         gap_duration = int(self.gap_duration * self.samp_freq / 1000)
         gap_ramp_duration = int(self.gap_ramp_duration * self.samp_freq / 1000)
+        # ramp function is obtained by applying it to ones
+        w = apply_ramp(
+            np.ones(2 * gap_ramp_duration),
+            duration=self.gap_ramp_duration,
+            position="both",
+            samp_freq=self.samp_freq,
+        )
+        w_raise = w[:gap_ramp_duration]
+        w_fall = w[gap_ramp_duration:]
+        ops = []
+
+        def check_ramp(onset, offset, position):
+            # same condition as apply_ramp
+            minimum = gap_ramp_duration * 2 if position == "both" else gap_ramp_duration
+            if offset - onset < minimum:
+                raise ValueError(
+                    "input duration must be greater than ramp duration, but got input={} and ramp={}".format(
+                        offset - onset, minimum
+                    )
+                )
+
+        def ramp(onset, offset, position):
+            check_ramp(onset, offset, position)
+            if gap_ramp_duration == 0:
+                return
+            if position in ["onset", "both"]:
+                ops.append(("ramp", onset, onset + gap_ramp_duration, w_raise))
+            if position in ["offset", "both"]:
+                ops.append(("ramp", offset - gap_ramp_duration, offset, w_fall))
+
+        def gap(onset, offset, n_onset, n_offset, position):
+            # Ramp centers of noise are synchronized with
+            # those of the respective input offsets and onsets.
+            if self.gap_method != "overlap":
+                ops.append(("zero", onset, offset, None))
+            if self.gap_method == "silent":
+                return
+            check_ramp(n_onset, n_offset, position)
+            head = n_onset + gap_ramp_duration
+            tail = n_offset - gap_ramp_duration if position == "both" else n_offset
+            if gap_ramp_duration > 0:
+                ops.append(("add", n_onset, head, w_raise))
+            ops.append(("add", head, tail, None))
+            if gap_ramp_duration > 0 and position == "both":
+                ops.append(("add", tail, n_offset, w_fall))
 
         x_onset = 0
         x_offset = target_duration
@@ -124,30 +231,16 @@ class Continuity(AbsCommonInterface, AbsStimulusInterface):
                 position = "both"
             elif x_offset == stimulus_t:
                 position = "onset"
-            stimulus[x_onset:x_offset] = apply_ramp(
-                stimulus[x_onset:x_offset],
-                duration=self.gap_ramp_duration,
-                position=position,
-                samp_freq=self.samp_freq,
-            )
+            ramp(x_onset, x_offset, position)
 
             if x_onset > 0:
-                n_onset = x_prev_offset - gap_ramp_duration
-                n_offset = x_onset + gap_ramp_duration
-                noise = apply_ramp(
-                    snr_noise[n_onset:n_offset],
-                    duration=self.gap_ramp_duration,
-                    position="both",
-                    samp_freq=self.samp_freq,
+                gap(
+                    x_prev_offset,
+                    x_onset,
+                    x_prev_offset - gap_ramp_duration,
+                    x_onset + gap_ramp_duration,
+                    "both",
                 )
-                # Ramp centers of noise are synchronized with
-                # those of the respective input offsets and onsets.
-                if self.gap_method == "overlap":
-                    stimulus[n_onset:n_offset] += noise
-                else:
-                    stimulus[x_prev_offset:x_onset] = np.zeros(x_onset - x_prev_offset)
-                    if self.gap_method == "replace":
-                        stimulus[n_onset:n_offset] += noise
             # update onset
             x_prev_offset = x_offset
             # next onset & offset
@@ -162,37 +255,45 @@ class Continuity(AbsCommonInterface, AbsStimulusInterface):
             remain_t > gap_ramp_duration
             and remain_t <= gap_duration - gap_ramp_duration
         ):  # end in the middle of gap
-            n_onset = x_prev_offset - gap_ramp_duration
-            n_offset = stimulus_t
-            noise = apply_ramp(
-                snr_noise[n_onset:n_offset],
-                duration=self.gap_ramp_duration,
-                position="onset",
-                samp_freq=self.samp_freq,
-            )
-            if self.gap_method == "overlap":
-                stimulus[n_onset:n_offset] += noise
-            else:
-                stimulus[x_prev_offset:stimulus_t] = np.zeros(remain_t)
-                if self.gap_method == "replace":
-                    stimulus[n_onset:n_offset] += noise
+            gap(x_prev_offset, stimulus_t, x_prev_offset - gap_ramp_duration, stimulus_t, "onset")
         else:  # end in the middle of target
-            stimulus[x_onset:] = apply_ramp(
-                stimulus[x_onset:], duration=self.gap_ramp_duration, position="onset"
-            )
-            n_onset = x_prev_offset - gap_ramp_duration
-            n_offset = x_onset + gap_ramp_duration
-            noise = apply_ramp(
-                snr_noise[n_onset:n_offset],
-                duration=self.gap_ramp_duration,
-                position="both",
-                samp_freq=self.samp_freq,
+            ramp(x_onset, stimulus_t, "onset")
+            gap(
+                x_prev_offset,
+                x_onset,
+                x_prev_offset - gap_ramp_duration,
+                x_onset + gap_ramp_duration,
+                "both",
             )
-            if self.gap_method == "overlap":
-                stimulus[n_onset:n_offset] += noise
-            else:
-                stimulus[x_prev_offset:x_onset] = np.zeros(x_onset - x_prev_offset)
-                if self.gap_method == "replace":
-                    stimulus[n_onset:n_offset] += noise
+        return ops
 
-        return stimulus
+    @staticmethod
+    def _apply_operations(
+        ops: Sequence[Tuple[str, int, int, Optional[np.ndarray]]],
+        stimulus: np.ndarray,
+        snr_noise: Optional[np.ndarray],
+        start: int,
+    ):
+        """Apply the operations in-place to the block of target signal beginning at `start`
+
+        Args:
+            ops: Return value of `_operations`
+            stimulus: Block of target signal
+            snr_noise: Block of noise at the same position with `stimulus`
+            start: Position of the block in the whole target signal
+        """
+        end = start + stimulus.shape[0]
+        for kind, onset, offset, window in ops:
+            lo = max(onset, start)
+            hi = min(offset, end)
+            if lo >= hi:
+                continue
+            section = slice(lo - start, hi - start)
+            if kind == "ramp":
+                stimulus[section] *= window[lo - onset : hi - onset]
+            elif kind == "zero":
+                stimulus[section] = 0
+            elif window is None:
+                stimulus[section] += snr_noise[section]
+            else:
+                stimulus[section] += snr_noise[section] * window[lo - onset : hi - onset]
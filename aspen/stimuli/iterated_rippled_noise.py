@@ -70,13 +70,13 @@ class IteratedRippledNoise(AbsCommonInterface, AbsStimulusInterface):
 
         if len(x) != 1:
             raise ValueError("input length must be 1, but got {}".format(len(x)))
-        stimulus = x[0].copy()
+        t = x[0].shape[0]
         delay_sample = int(self.delay * self.samp_freq / 1000)
-        # delay-and-add process
+        # only the range which is covered by all delayed noises is calculated
+        offset = delay_sample * (self.num_iteration - 1)
+        stimulus = x[0][offset:].copy()
+        # delay-and-add process (the delayed noise is added as the view of input without the zero padding)
         for i in range(1, self.num_iteration):
             delay = i * delay_sample
-            delay_noise = np.append(np.zeros(delay), x[0][:-delay])
-            stimulus += delay_noise
-
-        stimulus = stimulus[delay_sample * (self.num_iteration - 1) :]
+            stimulus += x[0][offset - delay : t - delay]
         return stimulus
@@ -7,12 +7,13 @@ from typing import Sequence
 import librosa
 import numpy as np
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_stimulus_interface import AbsStimulusInterface
 from aspen.utils.cli_utils import strtobool
 
 
-class LocallyTimeReversedSpeech(AbsCommonInterface, AbsStimulusInterface):
+class LocallyTimeReversedSpeech(AbsCommonInterface, AbsStimulusInterface, AbsBlockInterface):
     """Generate locally time-reversed speech.
 
     Args:
@@ -75,5 +76,38 @@ class LocallyTimeReversedSpeech(AbsCommonInterface, AbsStimulusInterface):
         else:
             head = self.rng.permutation(head, 1)
             tail = self.rng.permutation(stimulus[boundary:])
-        stimulus = np.concatenate([np.hstack(head), tail])
+        # the segments are written to the output directly (without the intermediate concatenation)
+        stimulus = np.empty_like(x[0])
+        stimulus[:boundary].reshape(head.shape)[...] = head
+        stimulus[boundary:] = tail
         return stimulus
+
+    def reset(self, length: int, sounds: Sequence[np.ndarray] = ()) -> None:
+        self._reverse_duration = int(self.reverse_duration * self.samp_freq / 1000)
+        # samples which do not fill a segment are carried over to the next block
+        self._carry = None
+        if self.randomize:
+            # same permutation for all segments as `__call__`
+            self._permutation = self.rng.permutation(self._reverse_duration)
+
+    def process_block(self, x: Sequence[np.ndarray], pass_index: int, last: bool) -> np.ndarray:
+        if len(x) != 1:
+            raise ValueError("input length must be 1, but got {}".format(len(x)))
+
+        stimulus = x[0] if self._carry is None else np.concatenate([self._carry, x[0]])
+        boundary = (stimulus.shape[0] // self._reverse_duration) * self._reverse_duration
+        head = stimulus[:boundary].reshape(-1, self._reverse_duration)
+        if not self.randomize:
+            head = np.flip(head, 1)
+        else:
+            head = head[:, self._permutation]
+        self._carry = stimulus[boundary:]
+        if not last:
+            return head.reshape(-1)
+
+        if not self.randomize:
+            tail = np.flip(self._carry)
+        else:
+            tail = self.rng.permutation(self._carry)
+        self._carry = None
+        return np.concatenate([head.reshape(-1), tail])
@@ -6,12 +6,12 @@ from typing import Sequence
 
 import librosa
 import numpy as np
-import scipy.fft
 
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_stimulus_interface import AbsStimulusInterface
 from aspen.processings.modulation_power_spectrum import modulation_power_spectrum
 from aspen.utils.cli_utils import strtobool
+from aspen.utils.fft_utils import fft_backend, ifft2
 
 
 class ModulationFilteredSpeech(AbsCommonInterface, AbsStimulusInterface):
@@ -174,29 +174,30 @@ class ModulationFilteredSpeech(AbsCommonInterface, AbsStimulusInterface):
 
         # spectral LPF
         if np.all(mps_tt_stopband):
-            filter2 = mps_ff_stopband_not.astype(int)
+            filter2 = mps_ff_stopband_not.astype(stimulus.dtype)
         # temporal LPF
         elif np.all(mps_ff_stopband):
-            filter2 = mps_tt_stopband_not.astype(int)
+            filter2 = mps_tt_stopband_not.astype(stimulus.dtype)
         # notch filter or no filter
         else:
-            filter2 = (mps_tt_stopband_not * mps_ff_stopband_not).astype(int)
+            filter2 = (mps_tt_stopband_not * mps_ff_stopband_not).astype(stimulus.dtype)
 
         # filtering
         filtered_mps = mps * filter2
 
         # filtered mps to spectrogram
-        spec_filtered = np.real(scipy.fft.ifft2(filtered_mps))
+        spec_filtered = np.real(ifft2(filtered_mps))
 
         # spectrogram without the phase to signal
         spec_filtered = 10 ** (spec_filtered / 20)
-        stimulus = librosa.griffinlim(
-            spec_filtered,
-            n_iter=self.griffinlim_iter,
-            hop_length=stft_param["hop_length"],
-            win_length=stft_param["n_fft"] - 1,
-            window=stft_param["window"],
-            pad_mode="constant",
-        )
+        with fft_backend():
+            stimulus = librosa.griffinlim(
+                spec_filtered,
+                n_iter=self.griffinlim_iter,
+                hop_length=stft_param["hop_length"],
+                win_length=stft_param["n_fft"] - 1,
+                window=stft_param["window"],
+                pad_mode="constant",
+            )
 
         return stimulus
@@ -2,8 +2,10 @@
 # encoding: utf-8
 """Noise-vocoded speech"""
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
-from typing import Sequence
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -11,7 +13,11 @@ from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_stimulus_interface import AbsStimulusInterface
 from aspen.processings.extract_envelope import extract_envelope
 from aspen.processings.filter_signal import filter_signal
+from aspen.utils.cli_utils import strtobool
+from aspen.utils.filter_utils import parse_filter_spec
+from aspen.utils.filterbank import FIRFilterbank, band_filter, design_filterbank
 from aspen.utils.freqband import erb_band, octave_band
+from aspen.utils.multirate import decimate, decimation_factors, interpolate
 
 logger = getLogger(__name__)
 
@@ -47,6 +53,20 @@ class NoiseVocodedSpeech(AbsCommonInterface, AbsStimulusInterface):
             Window function is listed in Scipy doc (https://docs.scipy.org/doc/scipy/reference/signal.windows.html).",
             Defaults to "hann".
         ext_env_freq: Frequency of the lowpass filter for extracting envelope. Defaults to 16.
+        ext_env_multirate: The flag to apply the lowpass filter for extracting envelope at the low rate.
+            Defaults to False.
+        vocoder_multirate: The flag to process each band at the lowest rate which its upper frequency allows.
+            The low bands are decimated, vocoded with the proportionally fewer taps and interpolated back.
+            Use only when filter_impulse_response_method is `fir`. Defaults to False.
+        vocoder_threads: Number of threads to process the bands in parallel.
+            The output is the same as the one of a single thread. Defaults to 1.
+        filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width relative to the bandwidth
+            of each band splitted by the underscore symbol (e.g. 1_40_0.2) instead of the filter order.
+            The minimum order of each band which meets the specification is used. The transition width is limited
+            so that the transition bands are within 0 Hz to the Nyquist frequency. Defaults to None.
+        ext_env_filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width [Hz]
+            of the lowpass filter for extracting envelope splitted by the underscore symbol (e.g. 1_40_16)
+            instead of the filter order. Defaults to None.
     """
 
     def __init__(
@@ -66,6 +86,11 @@ class NoiseVocodedSpeech(AbsCommonInterface, AbsStimulusInterface):
         ext_env_filter_order: int = 512,
         ext_env_fir_window: str = "hann",
         ext_env_freq: float = 16,
+        ext_env_multirate: bool = False,
+        vocoder_multirate: bool = False,
+        vocoder_threads: int = 1,
+        filter_spec: Optional[str] = None,
+        ext_env_filter_spec: Optional[str] = None,
     ):
         self.samp_freq = samp_freq
         self.num_freqband = num_freqband
@@ -82,8 +107,16 @@ class NoiseVocodedSpeech(AbsCommonInterface, AbsStimulusInterface):
         self.ext_env_filter_order = ext_env_filter_order
         self.ext_env_fir_window = ext_env_fir_window
         self.ext_env_freq = ext_env_freq
+        self.ext_env_multirate = ext_env_multirate
+        self.vocoder_multirate = vocoder_multirate
+        if vocoder_threads < 1:
+            raise ValueError("vocoder_threads must be positive, but got {}".format(vocoder_threads))
+        self.vocoder_threads = vocoder_threads
+        self.filter_spec = parse_filter_spec(filter_spec)
+        self.ext_env_filter_spec = parse_filter_spec(ext_env_filter_spec)
 
         self._configure_frequency_band()
+        self._fir_filterbanks = None
 
     @staticmethod
     def add_arguments(parser):
@@ -183,6 +216,41 @@ class NoiseVocodedSpeech(AbsCommonInterface, AbsStimulusInterface):
             type=float,
             help="Frequency of the lowpass filter for the envelope extraction",
         )
+        group.add_argument(
+            "--ext-env-multirate",
+            default=False,
+            type=strtobool,
+            help="Apply the lowpass filter for the envelope extraction at the low rate "
+            "with the polyphase decimation and interpolation",
+        )
+        group.add_argument(
+            "--vocoder-multirate",
+            default=False,
+            type=strtobool,
+            help="Process each band at the lowest rate which its upper frequency allows. "
+            "Use only when --filter-impulse-response-method=fir",
+        )
+        group.add_argument(
+            "--vocoder-threads",
+            default=1,
+            type=int,
+            help="Number of threads to process the bands in parallel",
+        )
+        group.add_argument(
+            "--filter-spec",
+            default=None,
+            type=str,
+            help="Passband ripple [dB], stopband attenuation [dB] and transition width relative to the bandwidth "
+            "of each band splitted by the underscore symbol (e.g. 1_40_0.2) instead of --filter-order",
+        )
+        group.add_argument(
+            "--ext-env-filter-spec",
+            default=None,
+            type=str,
+            help="Passband ripple [dB], stopband attenuation [dB] and transition width [Hz] of the lowpass filter "
+            "for extracting envelope splitted by the underscore symbol (e.g. 1_40_16) "
+            "instead of --ext-env-filter-order",
+        )
 
         return parser
 
@@ -211,66 +279,228 @@ class NoiseVocodedSpeech(AbsCommonInterface, AbsStimulusInterface):
         stimulus = x[0]
         t = stimulus.shape[0]
 
-        band_signals = []
-        for i, band in enumerate(self.bands):
-            x_cloned = stimulus.copy()
-            n_cloned = noise.copy()[:t]
-            # bandpass speech
-            if band[0] == 0 and band[1] >= self.samp_freq / 2:
-                pass  # do nothing when freq_band=[0, nyquist_freq]
-            else:
-                if band[0] == 0:
-                    btype = "lowpass"
-                    freq_array = band[1]
-                elif band[1] >= self.samp_freq / 2:
-                    if band[0] >= self.samp_freq / 2:
-                        raise ValueError(
-                            "Invalid bandwidth = ("
-                            + str(band[0])
-                            + ", "
-                            + str(band[1])
-                            + ")."
-                        )
-                    btype = "highpass"
-                    freq_array = band[0]
+        if self.filter_impulse_response_method == "fir":
+            output = None
+            for factors, band_edge, filterbank in self._filterbanks():
+                factor = int(np.prod(factors))
+                if factor > 1:
+                    # the speech and noise are decimated once for the bands of the same rate
+                    low_stimulus = decimate(stimulus, factors, self.samp_freq, band_edge)
+                    low_noise = decimate(noise[:t], factors, self.samp_freq, band_edge)
                 else:
-                    btype = "bandpass"
-                    freq_array = band
-                x_cloned = filter_signal(
-                    x_cloned,
-                    btype,
-                    freq_array,
-                    self.filter_impulse_response_method,
-                    self.filter_order,
-                    self.filter_fir_window,
-                    self.samp_freq,
-                )
-                n_cloned = filter_signal(
-                    n_cloned,
-                    btype,
-                    freq_array,
-                    self.filter_impulse_response_method,
-                    self.filter_order,
-                    self.filter_fir_window,
-                    self.samp_freq,
-                )
-            env = extract_envelope(
-                x_cloned,
-                self.ext_env_method,
-                self.ext_env_freq,
-                self.ext_env_impulse_response_method,
-                self.ext_env_filter_order,
-                self.ext_env_fir_window,
+                    low_stimulus = stimulus
+                    low_noise = noise[:t]
+                # the speech and noise are split into all bands at once by the same filterbank
+                envelopes = filterbank(low_stimulus)
+                # the envelope of each band is extracted in place
+                self._apply_bands(lambda env: self._extract_envelope(env, factor), envelopes)
+                # the noise bands are modulated by the envelopes block by block
+                y = filterbank.mix(low_noise, envelopes)
+                del envelopes, low_stimulus, low_noise
+                if factor > 1:
+                    y = interpolate(y, factors, self.samp_freq, band_edge, t)
+                if output is None:
+                    output = y
+                else:
+                    output += y
+                del y
+            return output.astype(x[0].dtype, copy=False)
+
+        # the inputs are not modified, and the band signals are accumulated to the output in the order of bands
+        output = np.zeros(t, dtype=x[0].dtype)
+        for band_signal in self._map_bands(lambda band: self._vocode_band(band, stimulus, noise[:t]), self.bands):
+            output += band_signal
+            # release the band signal before the next band is accumulated
+            del band_signal
+
+        return output
+
+    def _map_bands(self, func: Callable[[Any], Any], bands: Iterable[Any]) -> Iterator[Any]:
+        """Apply the function to each band by `vocoder_threads` threads and yield the results in the order of bands
+
+        Args:
+            func: Function applied to each band
+            bands: Bands
+
+        Yields:
+            Result of each band. At most twice as many results as the threads are held at once.
+        """
+        if self.vocoder_threads == 1:
+            yield from map(func, bands)
+            return
+        with ThreadPoolExecutor(self.vocoder_threads) as executor:
+            pending = deque()
+            for band in bands:
+                pending.append(executor.submit(func, band))
+                if len(pending) >= 2 * self.vocoder_threads:
+                    yield pending.popleft().result()
+            while len(pending) > 0:
+                yield pending.popleft().result()
+
+    def _apply_bands(self, func: Callable[[Any], Any], bands: Iterable[Any]) -> None:
+        """Apply the function which modifies each band in place by `vocoder_threads` threads
+
+        Args:
+            func: Function applied to each band. The return value is discarded.
+            bands: Bands
+        """
+        if self.vocoder_threads == 1:
+            for band in bands:
+                func(band)
+            return
+        with ThreadPoolExecutor(self.vocoder_threads) as executor:
+            futures = [executor.submit(func, band) for band in bands]
+            # the exception of each thread is raised here
+            for future in futures:
+                future.result()
+
+    def _extract_envelope(self, x: np.ndarray, factor: int = 1) -> np.ndarray:
+        """Extract the envelope of the band signal decimated by the factor in place"""
+        filter_order = self.ext_env_filter_order
+        if self.ext_env_filter_spec is not None:
+            # the order is given by the specification at the rate
+            filter_order = None
+        elif factor > 1 and self.ext_env_impulse_response_method == "fir":
+            # the same transition width in Hz with the fewer taps
+            filter_order = max(int(round(filter_order / factor)), 2)
+        return extract_envelope(
+            x,
+            self.ext_env_method,
+            self.ext_env_freq,
+            self.ext_env_impulse_response_method,
+            filter_order,
+            self.ext_env_fir_window,
+            self.samp_freq / factor,
+            out=x,
+            multirate=self.ext_env_multirate,
+            filter_spec=self.ext_env_filter_spec,
+        )
+
+    def _vocode_band(self, band: Sequence[float], stimulus: np.ndarray, noise: np.ndarray) -> np.ndarray:
+        """Modulate the noise of the band by the envelope of the speech of the band
+
+        Args:
+            band: Lower and upper frequencies of the band
+            stimulus: Speech signal
+            noise: Noise signal with the same length as the speech
+
+        Returns:
+            Noise-vocoded speech of the band
+        """
+        btype, freq_array = band_filter(band, self.samp_freq)
+        filter_spec = self._band_filter_spec(band)
+        filter_order = self.filter_order if filter_spec is None else None
+        if btype is None:
+            x_band = stimulus
+        else:
+            x_band = filter_signal(
+                stimulus,
+                btype,
+                freq_array,
+                self.filter_impulse_response_method,
+                filter_order,
+                self.filter_fir_window,
                 self.samp_freq,
+                filter_spec=filter_spec,
             )
-            band_signals.append(env * n_cloned)
+        env = extract_envelope(
+            x_band,
+            self.ext_env_method,
+            self.ext_env_freq,
+            self.ext_env_impulse_response_method,
+            self.ext_env_filter_order if self.ext_env_filter_spec is None else None,
+            self.ext_env_fir_window,
+            self.samp_freq,
+            # the filtered speech is no longer used
+            out=None if btype is None else x_band,
+            multirate=self.ext_env_multirate,
+            filter_spec=self.ext_env_filter_spec,
+        )
+        # the noise is filtered after the envelope extraction to reduce the peak memory
+        if btype is None:
+            n_band = noise
+        else:
+            n_band = filter_signal(
+                noise,
+                btype,
+                freq_array,
+                self.filter_impulse_response_method,
+                filter_order,
+                self.filter_fir_window,
+                self.samp_freq,
+                filter_spec=filter_spec,
+            )
+        env *= n_band
+        return env
 
-        # sum the above all signals
-        stimulus = np.zeros(t)
-        for s in band_signals:
-            stimulus += s
+    def _band_filter_spec(self, band: Sequence[float]) -> Optional[Tuple[float, float, float]]:
+        """Return the specification of the filter of the band with the transition width in Hz (or None)"""
+        if self.filter_spec is None:
+            return None
+        passband_ripple, stopband_attenuation, ratio = self.filter_spec
+        nyquist = self.samp_freq / 2
+        width = ratio * (min(band[1], nyquist) - band[0])
+        # the transition bands are kept within 0 Hz to the Nyquist frequency
+        if band[0] > 0:
+            width = min(width, band[0])
+        if band[1] < nyquist:
+            width = min(width, nyquist - band[1])
+        return passband_ripple, stopband_attenuation, width
+
+    def _filterbanks(self) -> List[Tuple[List[int], float, FIRFilterbank]]:
+        """Return the FIR filterbanks of the bands designed at the first call
+
+        Returns:
+            Decimation factors, band edge (upper limit of the frequency components after the modulation)
+                and filterbank at the decimated rate for each group of the bands processed at the same rate
+        """
+        if self._fir_filterbanks is not None:
+            return self._fir_filterbanks
+        groups = {}
+        for band in self.bands:
+            btype, _ = band_filter(band, self.samp_freq)
+            factors = []
+            band_edge = self.samp_freq / 2
+            if self.vocoder_multirate and btype in ["lowpass", "bandpass"]:
+                # the transition bands of the band-pass filter and the envelope are added to the upper frequency
+                if self.filter_spec is not None:
+                    band_edge = band[1] + self._band_filter_spec(band)[2] / 2
+                else:
+                    band_edge = band[1] + 4 * self.samp_freq / self.filter_order
+                if self.ext_env_filter_spec is not None:
+                    band_edge += self.ext_env_freq + self.ext_env_filter_spec[2] / 2
+                elif self.ext_env_impulse_response_method == "fir":
+                    band_edge += self.ext_env_freq + 4 * self.samp_freq / self.ext_env_filter_order
+                else:
+                    # the slow roll-off of IIR filter
+                    band_edge += 16 * self.ext_env_freq
+                factors = decimation_factors(self.samp_freq, band_edge)
+            group = groups.setdefault(tuple(factors), [[], 0.0])
+            group[0].append(band)
+            group[1] = max(group[1], band_edge)
 
-        return stimulus
+        self._fir_filterbanks = []
+        for factors, (bands, band_edge) in groups.items():
+            factor = int(np.prod(factors))
+            filter_order = self.filter_order
+            if factor > 1:
+                # the same transition width in Hz with the fewer taps
+                filter_order = max(int(round(filter_order / factor)), 2)
+            filterbank = design_filterbank(
+                bands,
+                filter_order,
+                self.filter_fir_window,
+                self.samp_freq / factor,
+                None if self.filter_spec is None else [self._band_filter_spec(band) for band in bands],
+            )
+            self._fir_filterbanks.append((list(factors), band_edge, filterbank))
+        if len(self._fir_filterbanks) > 1:
+            logger.info(
+                "Decimation factors and number of bands = {}".format(
+                    [(int(np.prod(f)), filterbank.num_filters) for f, _, filterbank in self._fir_filterbanks]
+                )
+            )
+        return self._fir_filterbanks
 
     def _configure_frequency_band(self):
         """Generate frequency band configuration"""
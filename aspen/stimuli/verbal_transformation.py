@@ -6,11 +6,12 @@ from typing import Sequence
 
 import numpy as np
 
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
 from aspen.interfaces.abs_common_interface import AbsCommonInterface
 from aspen.interfaces.abs_stimulus_interface import AbsStimulusInterface
 
 
-class VerbalTransformation(AbsCommonInterface, AbsStimulusInterface):
+class VerbalTransformation(AbsCommonInterface, AbsStimulusInterface, AbsBlockInterface):
     """Stimulus that occurs the verbal transformation.
 
     Args:
@@ -46,3 +47,16 @@ class VerbalTransformation(AbsCommonInterface, AbsStimulusInterface):
 
         stimulus = np.tile(x[0], self.num_iteration)
         return stimulus
+
+    @property
+    def num_passes(self) -> int:
+        # the input is streamed again for each iteration
+        return self.num_iteration
+
+    def block_output_length(self, length: int) -> int:
+        return length * self.num_iteration
+
+    def process_block(self, x: Sequence[np.ndarray], pass_index: int, last: bool) -> np.ndarray:
+        if len(x) != 1:
+            raise ValueError("input length must be 1, but got {}".format(len(x)))
+        return x[0]
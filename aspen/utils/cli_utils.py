@@ -1,6 +1,3 @@
-from distutils.util import strtobool as dist_strtobool
-
-
 def strtobool(x: str) -> bool:
     """Boolean related string convert to boolean
     Inspired from https://github.com/espnet/espnet
@@ -12,5 +9,12 @@ def strtobool(x: str) -> bool:
         Boolean Flag
     """
 
-    # distutils.util.strtobool returns integer, but it's confusing,
-    return bool(dist_strtobool(x))
+    # same as distutils.util.strtobool, which is not used here
+    # because importing distutils (setuptools) takes a long time and it has been deprecated
+    x = x.lower()
+    if x in ("y", "yes", "t", "true", "on", "1"):
+        return True
+    elif x in ("n", "no", "f", "false", "off", "0"):
+        return False
+    else:
+        raise ValueError("invalid truth value {}".format(x))
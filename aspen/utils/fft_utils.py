@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""FFT backend shared by all FFTs of aspen
+
+The FFTs of aspen are computed by the functions of this module, and the FFTs inside the third-party functions
+(e.g. `librosa.stft` and `scipy.signal.stft`) are dispatched to the same backend within `fft_backend()`.
+The backend applies the number of worker threads and the optional plan cache set by `set_fft_backend`
+and counts the number and time of the FFTs of each size (see `fft_stats`).
+
+The length of an utterance is often a prime or has a large prime factor, for which FFT is several times
+slower than for a length with only small prime factors. The signals are zero-padded to the next fast length
+(see `scipy.fft.next_fast_len`) before FFT and the results are trimmed to the original length.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import fft as sp_fft
+
+# transforms of scipy.fft which take the number of workers
+TRANSFORMS = {"fft", "ifft", "rfft", "irfft", "fft2", "ifft2", "rfft2", "irfft2", "fftn", "ifftn", "rfftn", "irfftn"}
+
+# number of worker threads of each FFT
+_workers = 1
+# module of the transforms with the plan cache (pyfftw.interfaces.scipy_fft), or None (= scipy.fft)
+_plan_module = None
+# number and total time [s] of the FFTs of each transform and size
+_stats: Dict[Tuple[str, Tuple[int, ...]], list] = {}
+_stats_lock = threading.Lock()
+
+
+def set_fft_backend(workers: int = 1, plan_cache: bool = False):
+    """Configure the FFTs in this process
+
+    Args:
+        workers: Number of worker threads of each FFT (a negative value counts from the number of CPUs,
+            e.g. -1 is all CPUs; see `scipy.fft.fft`). Defaults to 1.
+        plan_cache: The flag to compute the FFTs by FFTW with the cache of the plans (requires pyfftw).
+            The plans of the repeated shapes are reused across utterances.
+            If False, scipy.fft (pocketfft, which keeps only a few recent plans) is used. Defaults to False.
+    """
+    global _workers, _plan_module
+    if workers == 0:
+        raise ValueError("Number of FFT workers must not be 0")
+    if plan_cache:
+        try:
+            import pyfftw
+            import pyfftw.interfaces.scipy_fft
+        except ImportError as e:
+            raise ImportError("pyfftw is required for the FFT plan cache (pip install pyfftw)") from e
+        pyfftw.interfaces.cache.enable()
+        _plan_module = pyfftw.interfaces.scipy_fft
+    else:
+        _plan_module = None
+    _workers = workers
+
+
+def fft_workers() -> int:
+    """Return the number of worker threads of each FFT"""
+    return _workers
+
+
+def _size(name: str, args: Sequence, kwargs: Dict) -> Tuple[int, ...]:
+    """Return the FFT length (or the input length along the axis if not specified) as the key of the stats"""
+    shape = np.shape(args[0])
+    if name.endswith("n") or name.endswith("2"):
+        s = kwargs.get("s", args[1] if len(args) > 1 else None)
+        return tuple(shape) if s is None else tuple(s)
+    n = kwargs.get("n", args[1] if len(args) > 1 else None)
+    if n is None:
+        axis = kwargs.get("axis", args[2] if len(args) > 2 else -1)
+        n = shape[axis]
+    return (int(n),)
+
+
+def _transform(name: str, func: Callable, args: Sequence, kwargs: Dict):
+    """Compute the transform with the configured backend and count it"""
+    if _plan_module is not None:
+        func = getattr(_plan_module, name, func)
+    kwargs.setdefault("workers", _workers)
+    start = time.perf_counter()
+    y = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    key = (name, _size(name, args, kwargs))
+    with _stats_lock:
+        stat = _stats.setdefault(key, [0, 0.0])
+        stat[0] += 1
+        stat[1] += elapsed
+    return y
+
+
+class _FFTBackend(object):
+    """Backend of scipy.fft (see `scipy.fft.set_backend`) which dispatches the transforms to `_transform`"""
+
+    __ua_domain__ = "numpy.scipy.fft"
+
+    @staticmethod
+    def __ua_function__(method, args, kwargs):
+        if method.__name__ not in TRANSFORMS:
+            return NotImplemented
+        # the transform itself is computed by the next backend (scipy)
+        with sp_fft.skip_backend(_FFTBackend):
+            return _transform(method.__name__, method, args, dict(kwargs))
+
+
+def fft_backend():
+    """Context manager to compute the FFTs inside the third-party functions by the backend of this module
+
+    The backend is set to the current thread only.
+
+    Examples:
+        >>> with fft_backend():
+        ...     spec = librosa.stft(x)
+    """
+    return sp_fft.set_backend(_FFTBackend)
+
+
+def fft_stats() -> Dict[Tuple[str, Tuple[int, ...]], Tuple[int, float]]:
+    """Return the number and total time [s] of the FFTs of each transform and size in this process"""
+    with _stats_lock:
+        return {key: (stat[0], stat[1]) for key, stat in _stats.items()}
+
+
+def pop_fft_stats() -> Dict[Tuple[str, Tuple[int, ...]], Tuple[int, float]]:
+    """Return the stats (see `fft_stats`) and reset them"""
+    with _stats_lock:
+        stats = {key: (stat[0], stat[1]) for key, stat in _stats.items()}
+        _stats.clear()
+    return stats
+
+
+def add_fft_stats(stats: Dict[Tuple[str, Tuple[int, ...]], Tuple[int, float]]):
+    """Add the stats of another process (e.g. the worker of --nj) to the stats of this process"""
+    with _stats_lock:
+        for key, (count, elapsed) in stats.items():
+            stat = _stats.setdefault(key, [0, 0.0])
+            stat[0] += count
+            stat[1] += elapsed
+
+
+def fft_stats_summary(num_rows: int = 10) -> str:
+    """Return the table of the FFT sizes which take the longest total time
+
+    Args:
+        num_rows: Number of rows of the table. Defaults to 10.
+
+    Returns:
+        Table of the transform, size, count and total time
+    """
+    stats = fft_stats()
+    total_count = sum(count for count, _ in stats.values())
+    total_time = sum(elapsed for _, elapsed in stats.values())
+    lines = [
+        "FFT: {} calls, {:.3f} s (workers {}, plan cache {})".format(
+            total_count, total_time, _workers, "on" if _plan_module is not None else "off"
+        ),
+        "{:<8} {:<24} {:>8} {:>10}".format("fft", "size", "count", "time[s]"),
+    ]
+    for (name, size), (count, elapsed) in sorted(stats.items(), key=lambda item: -item[1][1])[:num_rows]:
+        lines.append(
+            "{:<8} {:<24} {:>8} {:>10.3f}".format(name, "x".join(str(n) for n in size), count, elapsed)
+        )
+    return "\n".join(lines)
+
+
+def fast_length(length: int) -> int:
+    """Return the shortest length of the real FFT which is not shorter than the given length
+
+    Args:
+        length: Length of the signal
+
+    Returns:
+        Length with only the small prime factors (2, 3 and 5)
+    """
+    return sp_fft.next_fast_len(length, real=True)
+
+
+def _trim(x: np.ndarray, length: int, axis: int) -> np.ndarray:
+    """Return the first `length` samples along the axis"""
+    index = [slice(None)] * x.ndim
+    index[axis] = slice(0, length)
+    return x[tuple(index)]
+
+
+def rfft(x: np.ndarray, n: Optional[int] = None, axis: int = -1, norm: Optional[str] = None) -> np.ndarray:
+    """Real FFT of the signal zero-padded to the fast length
+
+    The spectrum is sampled at `fast_length(n)` points instead of `n` points of the signal,
+    so it must be inverted by `irfft` with the original length.
+
+    Args:
+        x: Input signal
+        n: Length of FFT. Defaults to None (= the fast length of the signal).
+        axis: Axis of time. Defaults to -1.
+        norm: Normalization mode of `scipy.fft.rfft`. Defaults to None (= "backward").
+
+    Returns:
+        Spectrum with `n // 2 + 1` bins along the axis
+    """
+    if n is None:
+        n = fast_length(x.shape[axis])
+    return _transform("rfft", sp_fft.rfft, (x, n), dict(axis=axis, norm=norm))
+
+
+def irfft(
+    X: np.ndarray, length: int, axis: int = -1, norm: Optional[str] = None, n: Optional[int] = None
+) -> np.ndarray:
+    """Inverse of `rfft` trimmed to the original length
+
+    Args:
+        X: Spectrum returned by `rfft`
+        length: Length of the original signal
+        axis: Axis of frequency. Defaults to -1.
+        norm: Normalization mode of `scipy.fft.irfft`, which must be the same as `rfft`. Defaults to None.
+        n: Length of FFT given to `rfft`. Defaults to None (= the fast length of the original signal).
+
+    Returns:
+        Real signal with the length of `length` along the axis
+    """
+    nfft = fast_length(length) if n is None else n
+    if X.shape[axis] != nfft // 2 + 1:
+        raise ValueError(
+            "Spectrum of length {} must have {} bins, but got {}".format(length, nfft // 2 + 1, X.shape[axis])
+        )
+    return _trim(_transform("irfft", sp_fft.irfft, (X, nfft), dict(axis=axis, norm=norm)), length, axis)
+
+
+def fft2(x: np.ndarray, axes: Tuple[int, int] = (-2, -1), norm: Optional[str] = None) -> np.ndarray:
+    """2-D FFT without padding (the frequency grid is a part of the result, e.g. the modulation power spectrum)
+
+    Args:
+        x: Input array
+        axes: Axes of the transform. Defaults to (-2, -1).
+        norm: Normalization mode of `scipy.fft.fft2`. Defaults to None (= "backward").
+
+    Returns:
+        Spectrum with the same shape as the input
+    """
+    return _transform("fft2", sp_fft.fft2, (x,), dict(axes=axes, norm=norm))
+
+
+def ifft2(X: np.ndarray, axes: Tuple[int, int] = (-2, -1), norm: Optional[str] = None) -> np.ndarray:
+    """Inverse of `fft2`
+
+    Args:
+        X: Spectrum
+        axes: Axes of the transform. Defaults to (-2, -1).
+        norm: Normalization mode of `scipy.fft.ifft2`. Defaults to None (= "backward").
+
+    Returns:
+        Complex array with the same shape as the input
+    """
+    return _transform("ifft2", sp_fft.ifft2, (X,), dict(axes=axes, norm=norm))
+
+
+def hilbert(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Analytic signal of the signal zero-padded to the fast length (see `scipy.signal.hilbert`)
+
+    Args:
+        x: Input signal
+        axis: Axis of time. Defaults to -1.
+
+    Returns:
+        Analytic signal with the same length as the input
+    """
+    from scipy import signal
+
+    length = x.shape[axis]
+    with fft_backend():
+        return _trim(signal.hilbert(x, N=fast_length(length), axis=axis), length, axis)
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Design and application of filters shared by all callers
+
+The same filters are designed for every utterance (e.g. the band-pass filters of noise-vocoded speech
+and the low-pass filter of envelope extraction), so the coefficients are memoized by the bounded LRU cache.
+The cached coefficients are read-only since they are shared.
+FIR filters are applied by the direct or FFT (overlap-save) convolution, whichever is estimated to be faster.
+"""
+
+from functools import lru_cache
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import fft as sp_fft
+from scipy import signal
+
+from aspen.utils.fft_utils import irfft, rfft
+
+# maximum number of filters kept in the cache
+FILTER_CACHE_SIZE = 256
+
+# cost model of the convolution in units of a multiply-accumulate of the direct convolution.
+# the FFT convolution costs FFT_CONVOLUTION_COST * log2(FFT length) per sample
+# and FFT_CONVOLUTION_OVERHEAD per call (measured with numpy's convolve and scipy.fft)
+FFT_CONVOLUTION_COST = 30.0
+FFT_CONVOLUTION_OVERHEAD = 5e5
+
+# length of FFT of the overlap-save convolution relative to the number of taps
+OVERLAP_SAVE_FFT_RATIO = 8
+
+
+def _freeze(value):
+    """Convert the argument into a hashable one (arrays and lists into tuples)"""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _design_filter(
+    btype: str,
+    filter_freq: Union[float, Tuple[float, ...]],
+    impulse_response: str,
+    filter_order: int,
+    firwindow: Union[str, Tuple],
+    samp_freq: int,
+) -> np.ndarray:
+    if isinstance(filter_freq, tuple):
+        filter_freq = np.array(filter_freq, dtype=np.float64)
+    if impulse_response == "fir":
+        # 1st argv of firwin is the number of taps (= the filter order + 1)
+        coef = signal.firwin(
+            filter_order + 1,
+            filter_freq,
+            window=firwindow,
+            pass_zero=btype,
+            fs=samp_freq,
+        )
+    elif impulse_response == "iir":
+        # butterworth filter (IIR) with SOS (Second Order Section, Biquad) type
+        coef = signal.butter(
+            filter_order,
+            filter_freq,
+            btype=btype,
+            fs=samp_freq,
+            output="sos",
+        )
+    else:
+        raise ValueError("Invalid impulse_response. Must be either fir or iir.")
+    coef.flags.writeable = False
+    return coef
+
+
+def design_filter(
+    btype: str,
+    filter_freq: Union[float, np.ndarray],
+    impulse_response: str,
+    filter_order: int,
+    firwindow: Union[str, Tuple] = "hann",
+    samp_freq: int = 16000,
+) -> np.ndarray:
+    """Design the filter or return the cached one designed with the same parameters
+
+    Args:
+        btype: The type of filter (lowpass, highpass, bandpass or bandstop).
+        filter_freq: Cutoff frequency (the lower/upper frequencies in the case of bandpass or bandstop).
+        impulse_response: Type of impulse response of filter (fir or iir).
+        filter_order: Number of the filter order.
+        firwindow: Type of FIR window. Use only when impulse_response=fir. Defaults to "hann".
+        samp_freq: Sampling frequency. Defaults to 16000.
+
+    Returns:
+        Read-only coefficients of FIR filter or second-order sections of IIR filter
+    """
+    if impulse_response == "iir":
+        # the window does not affect IIR filter, so it is not a part of the key
+        firwindow = None
+    return _design_filter(
+        btype,
+        _freeze(filter_freq),
+        impulse_response,
+        int(filter_order),
+        _freeze(firwindow),
+        _freeze(samp_freq),
+    )
+
+
+def filter_cache_info():
+    """Return the statistics of the filter cache
+
+    Returns:
+        Named tuple of `hits`, `misses`, `maxsize` and `currsize` (see `functools.lru_cache`)
+    """
+    return _design_filter.cache_info()
+
+
+def clear_filter_cache():
+    """Remove all filters from the cache and reset its statistics"""
+    _design_filter.cache_clear()
+
+
+def parse_filter_spec(
+    filter_spec: Union[str, Sequence[float], None]
+) -> Optional[Tuple[float, float, float]]:
+    """Parse the specification of filter
+
+    Args:
+        filter_spec: Passband ripple [dB], stopband attenuation [dB] and transition width
+            split by the underscore symbol (e.g. 1_60_100) or their sequence
+
+    Returns:
+        Tuple of the three values, or None if `filter_spec` is None
+    """
+    if filter_spec is None:
+        return None
+    if isinstance(filter_spec, str):
+        filter_spec = filter_spec.split("_")
+    spec = tuple(float(v) for v in filter_spec)
+    if len(spec) != 3 or min(spec) <= 0:
+        raise ValueError(
+            "Filter specification must be the positive passband ripple, stopband attenuation and transition width, "
+            "but got {}".format(filter_spec)
+        )
+    return spec
+
+
+def minimum_filter_order(
+    btype: str,
+    filter_freq: Union[float, np.ndarray],
+    impulse_response: str,
+    passband_ripple: float,
+    stopband_attenuation: float,
+    transition_width: float,
+    samp_freq: int = 16000,
+) -> Tuple[int, Union[float, np.ndarray], Optional[Tuple]]:
+    """Return the minimum order of the filter which meets the specification
+
+    The transition band of the width is centered on each cutoff frequency.
+    FIR filter is designed by the Kaiser window whose length and shape are estimated by `scipy.signal.kaiserord`,
+    and the order of butterworth filter (IIR) is given by `scipy.signal.buttord`
+    with half the ripple and the attenuation since the filter is applied forward and backward.
+
+    Args:
+        btype: The type of filter (lowpass, highpass, bandpass or bandstop).
+        filter_freq: Cutoff frequency (the lower/upper frequencies in the case of bandpass or bandstop).
+        impulse_response: Type of impulse response of filter (fir or iir).
+        passband_ripple: Maximum ripple (loss) in the passband [dB].
+        stopband_attenuation: Minimum attenuation in the stopband [dB].
+        transition_width: Width of the transition band [Hz].
+        samp_freq: Sampling frequency. Defaults to 16000.
+
+    Returns:
+        Filter order (even for FIR filter), cutoff frequency and window of FIR filter (None for IIR filter)
+    """
+    freq = np.atleast_1d(np.asarray(filter_freq, dtype=np.float64))
+    half = transition_width / 2
+    if btype == "lowpass":
+        passband, stopband = freq - half, freq + half
+    elif btype == "highpass":
+        passband, stopband = freq + half, freq - half
+    elif btype == "bandpass":
+        passband, stopband = freq + [half, -half], freq + [-half, half]
+    elif btype == "bandstop":
+        passband, stopband = freq + [-half, half], freq + [half, -half]
+    else:
+        raise ValueError("Invalid btype {}".format(btype))
+    edges = np.concatenate([passband, stopband])
+    if np.any(edges <= 0) or np.any(edges >= samp_freq / 2) or np.any(np.diff(passband) <= 0):
+        raise ValueError(
+            "Transition width {} is too wide for the cutoff frequency {}".format(transition_width, filter_freq)
+        )
+    if impulse_response == "fir":
+        # the window method has the same ripple in the passband and the stopband, so the smaller one is met
+        ripple = 10 ** (passband_ripple / 20)
+        attenuation = max(stopband_attenuation, -20 * np.log10((ripple - 1) / (ripple + 1)))
+        num_taps, beta = signal.kaiserord(attenuation, transition_width / (samp_freq / 2))
+        filter_order = num_taps - 1 + (num_taps - 1) % 2
+        return filter_order, filter_freq, ("kaiser", beta)
+    elif impulse_response == "iir":
+        if len(freq) == 1:
+            passband, stopband = passband[0], stopband[0]
+        filter_order, natural_freq = signal.buttord(
+            passband, stopband, passband_ripple / 2, stopband_attenuation / 2, fs=samp_freq
+        )
+        return int(filter_order), natural_freq, None
+    else:
+        raise ValueError("Invalid impulse_response. Must be either fir or iir.")
+
+
+def filter_cost(coef: np.ndarray, impulse_response: str) -> int:
+    """Return the number of multiplications per sample of the filter applied in the direct form
+
+    Args:
+        coef: Coefficients of FIR filter or second-order sections of IIR filter
+        impulse_response: Type of impulse response of filter (fir or iir).
+
+    Returns:
+        Number of taps of FIR filter, or 5 multiplications of each section twice (forward and backward) of IIR filter
+    """
+    if impulse_response == "fir":
+        return len(coef)
+    return 2 * 5 * len(coef)
+
+
+def overlap_save_length(length: int, num_taps: int) -> int:
+    """Return the length of FFT of the overlap-save convolution
+
+    Args:
+        length: Length of the signal
+        num_taps: Number of taps of the filter
+
+    Returns:
+        FFT length, which is several times the number of taps (but not longer than the whole convolution)
+    """
+    return sp_fft.next_fast_len(min(OVERLAP_SAVE_FFT_RATIO * num_taps, length + num_taps - 1), real=True)
+
+
+def overlap_save_blocks(x: np.ndarray, num_taps: int, nfft: int) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Split the signal into the blocks of the overlap-save convolution with the delay compensation
+
+    The block `buf` is the input segment for the output samples `[start, start + length)`:
+    the output is `irfft(rfft(buf) * rfft(b, nfft))[num_taps - 1 : num_taps - 1 + length]`.
+    The input is read only up to `delay` samples ahead of the output,
+    so the output may be written to the input itself block by block.
+
+    Args:
+        x: Input signal whose first axis is time
+        num_taps: Number of taps of the filter
+        nfft: Length of FFT (see `overlap_save_length`)
+
+    Yields:
+        Start and length of the output block and the input segment whose first axis has `nfft` length.
+            The segment is reused for the next block, so it must not be modified.
+    """
+    t = x.shape[0]
+    order = num_taps - 1
+    delay = order // 2
+    step = nfft - order
+    if step <= 0:
+        raise ValueError("FFT length {} must be longer than the number of taps {}".format(nfft, num_taps))
+    buf = np.zeros((nfft,) + x.shape[1:], dtype=x.dtype)
+    # the first block starts with the zeros before the input
+    head = min(delay, t)
+    buf[order - delay : order - delay + head] = x[:head]
+    for start in range(0, t, step):
+        length = min(step, t - start)
+        segment = x[start + delay : start + delay + length]
+        buf[order : order + segment.shape[0]] = segment
+        # zeros after the input
+        buf[order + segment.shape[0] : order + length] = 0
+        yield start, length, buf
+        # the last `order` samples are the head of the next block
+        buf[:order] = buf[length : length + order]
+
+
+def overlap_save(
+    x: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None, nfft: Optional[int] = None
+) -> np.ndarray:
+    """Apply the FIR filter with the delay compensation by the overlap-save convolution
+
+    Args:
+        x: Input signal whose first axis is time
+        b: Coefficients of FIR filter
+        out: Output buffer (may be `x` itself). Defaults to None.
+        nfft: Length of FFT. Defaults to None (= `overlap_save_length`).
+
+    Returns:
+        Output signal with the same length as the input
+    """
+    order = len(b) - 1
+    if nfft is None:
+        nfft = overlap_save_length(x.shape[0], len(b))
+    if out is None:
+        out = np.empty(x.shape, dtype=np.result_type(x, b))
+    # the filter is broadcast to each channel
+    spec = rfft(b, nfft).reshape((-1,) + (1,) * (x.ndim - 1))
+    for start, length, buf in overlap_save_blocks(x, len(b), nfft):
+        y = irfft(rfft(buf, nfft, axis=0) * spec, nfft, axis=0)
+        out[start : start + length] = y[order : order + length]
+    return out
+
+
+def choose_convolution_method(length: int, num_taps: int) -> str:
+    """Choose the faster method of the convolution by the cost model
+
+    Args:
+        length: Length of the signal
+        num_taps: Number of taps of the filter
+
+    Returns:
+        "direct" or "fft"
+    """
+    direct = length * num_taps
+    nfft = overlap_save_length(length, num_taps)
+    fft = FFT_CONVOLUTION_COST * (length + num_taps) * np.log2(nfft) + FFT_CONVOLUTION_OVERHEAD
+    return "fft" if fft < direct else "direct"
+
+
+def convolve(x: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Full convolution of the signal and the filter along the first axis
+
+    Args:
+        x: Input signal whose first axis is time
+        b: Coefficients of FIR filter
+
+    Returns:
+        Convolved signal with the length of `len(x) + len(b) - 1`
+    """
+    if x.ndim == 1:
+        return np.convolve(x, b)
+    # each channel is convolved with the same filter
+    y = np.empty((x.shape[0] + len(b) - 1,) + x.shape[1:], dtype=np.result_type(x, b))
+    for channel in np.ndindex(*x.shape[1:]):
+        y[(slice(None),) + channel] = np.convolve(x[(slice(None),) + channel], b)
+    return y
+
+
+def fir_filter(x: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None, method: str = "auto") -> np.ndarray:
+    """Apply the linear-phase FIR filter with the compensation of its delay (half the filter order)
+
+    The output is the same as filtering the input followed by the zeros of the delay
+    and removing the first samples of the delay, without copying the input.
+
+    Args:
+        x: Input signal whose first axis is time
+        b: Coefficients of FIR filter with an odd number of taps
+        out: Output buffer (may be `x` itself). Defaults to None.
+        method: "direct" (full convolution), "fft" (overlap-save convolution)
+            or "auto" (chosen by `choose_convolution_method`). Defaults to "auto".
+
+    Returns:
+        Output signal with the same length as the input
+    """
+    if method == "auto":
+        method = choose_convolution_method(x.shape[0], len(b))
+    if method == "fft":
+        return overlap_save(x, b, out=out)
+    elif method != "direct":
+        raise ValueError("Invalid convolution method {}. Must be either auto, direct or fft.".format(method))
+    t = x.shape[0]
+    delay = (len(b) - 1) // 2
+    y = convolve(x, b)[delay : t + delay]
+    if out is None:
+        return y
+    out[...] = y
+    return out
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Bank of FIR filters applied in one pass
+
+All filters share the forward FFT of each input block of the overlap-save convolution,
+and only the products with the filters and their inverse FFTs are computed for each filter.
+"""
+
+from logging import getLogger
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from aspen.utils.fft_utils import irfft, rfft
+from aspen.utils.filter_utils import (
+    design_filter,
+    minimum_filter_order,
+    overlap_save_blocks,
+    overlap_save_length,
+)
+
+logger = getLogger(__name__)
+
+
+class FIRFilterbank(object):
+    """Bank of FIR filters with the delay compensation (half the filter order)
+
+    Args:
+        coefs: Coefficients of FIR filters (number of filters, number of taps)
+    """
+
+    def __init__(self, coefs: np.ndarray):
+        self.coefs = np.atleast_2d(coefs)
+        self.num_filters, self.num_taps = self.coefs.shape
+        # spectra of the filters for each FFT length and data type, shared by the signals of the same length
+        self._spectra: Dict[Tuple[int, np.dtype], np.ndarray] = {}
+
+    def _spectrum(self, nfft: int, dtype: np.dtype) -> np.ndarray:
+        key = (nfft, dtype)
+        if key not in self._spectra:
+            self._spectra[key] = rfft(self.coefs.astype(dtype), nfft, axis=-1)
+        return self._spectra[key]
+
+    def _blocks(self, x: np.ndarray):
+        """Yield the start and length of each output block and the filtered block (number of filters, length)"""
+        if x.ndim != 1:
+            raise ValueError("Input of filterbank must be 1-D, but got the shape {}".format(x.shape))
+        order = self.num_taps - 1
+        nfft = overlap_save_length(x.shape[0], self.num_taps)
+        spec = self._spectrum(nfft, np.result_type(x.dtype, np.float32))
+        for start, length, buf in overlap_save_blocks(x, self.num_taps, nfft):
+            # one forward FFT of the input block for all filters
+            y = irfft(rfft(buf, nfft) * spec, nfft, axis=-1)
+            yield start, length, y[:, order : order + length]
+
+    def __call__(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Filter the signal by each filter
+
+        Args:
+            x: Input signal (1-D)
+            out: Output buffer (number of filters, length of input). Defaults to None.
+
+        Returns:
+            Filtered signals (number of filters, length of input)
+        """
+        if out is None:
+            out = np.empty((self.num_filters, x.shape[0]), dtype=np.result_type(x.dtype, np.float32))
+        for start, length, y in self._blocks(x):
+            out[:, start : start + length] = y
+        return out
+
+    def mix(self, x: np.ndarray, weights: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Filter the signal by each filter, weight the filtered signals sample by sample and sum them up
+
+        The filtered signals are not kept for the whole input.
+
+        Args:
+            x: Input signal (1-D)
+            weights: Weights of the filtered signals (number of filters, length of input)
+            out: Output buffer (length of input). Defaults to None.
+
+        Returns:
+            Sum of the weighted signals
+        """
+        if out is None:
+            out = np.empty(x.shape[0], dtype=np.result_type(x.dtype, weights.dtype))
+        for start, length, y in self._blocks(x):
+            y *= weights[:, start : start + length]
+            y.sum(axis=0, out=out[start : start + length])
+        return out
+
+
+def band_filter(band: Sequence[float], samp_freq: int) -> Tuple[Optional[str], Optional[np.ndarray]]:
+    """Return the type and cutoff frequencies of the filter which passes the frequency band
+
+    Args:
+        band: Lower and upper frequencies of the band
+        samp_freq: Sampling frequency
+
+    Returns:
+        Type of filter (None if the band covers the whole frequencies) and cutoff frequencies
+    """
+    if band[0] == 0 and band[1] >= samp_freq / 2:
+        return None, None
+    elif band[0] == 0:
+        return "lowpass", band[1]
+    elif band[1] >= samp_freq / 2:
+        if band[0] >= samp_freq / 2:
+            raise ValueError("Invalid bandwidth = ({}, {}).".format(band[0], band[1]))
+        return "highpass", band[0]
+    else:
+        return "bandpass", np.asarray(band, dtype=np.float64)
+
+
+def design_filterbank(
+    bands: Sequence[Sequence[float]],
+    filter_order: int = 512,
+    firwindow: str = "hann",
+    samp_freq: int = 16000,
+    filter_specs: Optional[Sequence[Tuple[float, float, float]]] = None,
+) -> FIRFilterbank:
+    """Design the bank of FIR band-pass filters
+
+    Args:
+        bands: Lower and upper frequencies of each band (e.g. [[0, 500], [500, 1000]]).
+            The band from 0 Hz is low-pass, the band to the Nyquist frequency is high-pass
+            and the band of the whole frequencies passes the signal as it is.
+        filter_order: Number of the filter order (rounded up to even). Defaults to 512.
+        firwindow: Type of FIR window. Defaults to "hann".
+        samp_freq: Sampling frequency. Defaults to 16000.
+        filter_specs: Passband ripple [dB], stopband attenuation [dB] and transition width [Hz] of each band
+            (see `minimum_filter_order`) instead of `filter_order` and `firwindow`.
+            The shorter filters are centered in the longest one, so that all filters have the same delay.
+            Defaults to None.
+
+    Returns:
+        Filterbank
+    """
+    if filter_order % 2 != 0:
+        filter_order += 1
+    # type, cutoff frequency, order and window of the filter of each band
+    designs = []
+    for i, band in enumerate(bands):
+        btype, freq = band_filter(band, samp_freq)
+        if btype is None:
+            designs.append((btype, freq, 0, None))
+        elif filter_specs is None:
+            designs.append((btype, freq, filter_order, firwindow))
+        else:
+            order, _, window = minimum_filter_order(btype, freq, "fir", *filter_specs[i], samp_freq=samp_freq)
+            designs.append((btype, freq, order, window))
+    if filter_specs is not None:
+        orders = [order for _, _, order, _ in designs]
+        logger.info(
+            "Minimum filter orders of bands = {} ({:.0f}% of the taps of the order {})".format(
+                orders, 100 * sum(order + 1 for order in orders) / (len(orders) * (filter_order + 1)), filter_order
+            )
+        )
+        filter_order = max(orders)
+    coefs = np.zeros((len(bands), filter_order + 1))
+    for i, (btype, freq, order, window) in enumerate(designs):
+        if btype is None:
+            # the unit impulse delayed by half the filter order
+            coefs[i, filter_order // 2] = 1
+        else:
+            offset = (filter_order - order) // 2
+            coefs[i, offset : offset + order + 1] = design_filter(btype, freq, "fir", order, window, samp_freq)
+    return FIRFilterbank(coefs)
@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 # encoding: utf-8
 
+import hashlib
+import json
 import os
-from typing import Optional
+import threading
+from collections import deque
+from typing import Any, Iterable, Iterator, Optional, Tuple
 
-import librosa
 import numpy as np
-import sounddevice as sd
-import soundfile as sf
+
+from aspen.utils.profile_utils import profile_stage
+
+# librosa, soundfile and sounddevice are imported when they are actually used
+# because these imports take a long time (and sounddevice requires PortAudio)
 
 
 def add_prefix_suffix(basedname: Optional[str], prefix: Optional[str] = None, suffix: Optional[str] = None) -> str:
@@ -30,8 +36,41 @@ def add_prefix_suffix(basedname: Optional[str], prefix: Optional[str] = None, su
     return outname
 
 
+def read_wavlist(wav_list: str) -> Iterator[Tuple[str, str]]:
+    """Read the listed wav file
+
+    Args:
+        wav_list: Path of listed wav file
+
+    Yields:
+        Key (i.e. basename without the extension) and path of each wav file
+    """
+    with open(wav_list, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line == "":
+                continue
+            yield os.path.splitext(os.path.basename(line))[0], line
+
+
 class WavReader(object):
-    def __init__(self, wav_list, segments=None):
+    """Read the wav files listed in a file
+
+    Args:
+        wav_list: Path of listed wav file. If None, yield only one dummy item.
+        segments: Not supported.
+        cache_dir: Directory to cache the decoded samples. Defaults to None (= without cache).
+            Each decoded signal is stored as `.npy` and recorded to `index.json` with the size and mtime of the
+            source file. From the next time, the cached signal is memory-mapped (read-only) instead of decoding
+            unless the source file has been changed.
+        dtype: Data type of signals. Defaults to "float64".
+        num_prefetch: Number of wav files decoded ahead by the thread pool while the previous signal is processed.
+            Defaults to 0 (= decode each file when it is required).
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, wav_list, segments=None, cache_dir=None, dtype="float64", num_prefetch=0):
         if segments is not None:
             raise ValueError("Not supported to use segments. Use kaldiio instead.")
         self.initialized = False
@@ -41,6 +80,14 @@ class WavReader(object):
             self.dummy = True
         else:
             self.file = open(wav_list, "r")
+        self.dtype = np.dtype(dtype)
+        self.num_prefetch = num_prefetch
+        self.cache_dir = cache_dir
+        self.cache_index = {}
+        self.cache_updated = False
+        if self.cache_dir is not None and not self.dummy:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.cache_index = self._read_cache_index()
         self.initialized = True
 
     def __iter__(self):
@@ -49,18 +96,120 @@ class WavReader(object):
             yield None, (None, None)
         else:
             with self.file as f:
-                for line in f:
-                    line = line.strip()
-                    if line == "":
-                        continue
-                    try:
-                        k = os.path.splitext(os.path.basename(line))[0]
-                        v, sr = librosa.load(line, sr=None, dtype=np.float64)
-                    except Exception:
-                        raise
+                items = (
+                    (os.path.splitext(os.path.basename(line))[0], line)
+                    for line in (line.strip() for line in f)
+                    if line != ""
+                )
+                if self.num_prefetch > 0:
+                    loaded = self._prefetch(items)
+                else:
+                    loaded = ((k, self._load_key(k, path)) for k, path in items)
+                for k, (v, sr) in loaded:
                     yield k, (sr, v)
+            self._write_cache_index()
             self.closed = True
 
+    def _prefetch(self, items: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, Tuple[np.ndarray, int]]]:
+        """Decode the wav files ahead by the thread pool
+
+        Args:
+            items: Key and path of each wav file
+
+        Yields:
+            Key and the return value of `_load` in the order of `items`
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        pending = deque()
+        with ThreadPoolExecutor(self.num_prefetch) as executor:
+            for k, path in items:
+                pending.append((k, executor.submit(self._load_key, k, path)))
+                # at most `num_prefetch` files are decoded (or waiting) besides the yielded one
+                if len(pending) > self.num_prefetch:
+                    k, future = pending.popleft()
+                    yield k, future.result()
+            while len(pending) > 0:
+                k, future = pending.popleft()
+                yield k, future.result()
+
+    def _load_key(self, key: str, path: str) -> Tuple[np.ndarray, int]:
+        """`_load` with the key of the wav file in the error message"""
+        try:
+            with profile_stage("read", key):
+                return self._load(path)
+        except Exception as e:
+            raise RuntimeError("Failed to read {} ({}): {}".format(key, path, e)) from e
+
+    def _load(self, path: str) -> Tuple[np.ndarray, int]:
+        """Load a wav file via the cache if enabled
+
+        Args:
+            path: Path of wav file
+
+        Returns:
+            Signal and its sampling frequency
+        """
+        import librosa
+
+        if self.cache_dir is None:
+            return librosa.load(path, sr=None, dtype=self.dtype)
+
+        abspath = os.path.abspath(path)
+        stat = os.stat(abspath)
+        entry = self.cache_index.get(abspath)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and os.path.exists(os.path.join(self.cache_dir, entry["file"]))
+        ):
+            # zero-copy loading, the cached signal must not be modified in-place
+            v = np.load(os.path.join(self.cache_dir, entry["file"]), mmap_mode="r")
+            # the signal cached with the other data type is converted (the same as decoding with the data type)
+            return np.asarray(v).astype(self.dtype, copy=False), entry["samp_freq"]
+
+        v, sr = librosa.load(abspath, sr=None, dtype=self.dtype)
+        npyname = hashlib.sha1(abspath.encode("utf-8")).hexdigest() + ".npy"
+        # write to a temporary file and rename it so that the other process never reads the incomplete file
+        tmpname = os.path.join(
+            self.cache_dir, "{}.{}.{}.tmp".format(npyname, os.getpid(), threading.get_ident())
+        )
+        with open(tmpname, "wb") as f:
+            np.save(f, v)
+        os.replace(tmpname, os.path.join(self.cache_dir, npyname))
+        self.cache_index[abspath] = {
+            "file": npyname,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "samp_freq": sr,
+        }
+        self.cache_updated = True
+        return v, sr
+
+    def _read_cache_index(self) -> dict:
+        path = os.path.join(self.cache_dir, self.INDEX_NAME)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except ValueError:
+            # broken index is regarded as empty (i.e. all files are decoded again)
+            return {}
+
+    def _write_cache_index(self):
+        if self.cache_dir is None or not self.cache_updated:
+            return
+        # merge the entries written by the other process in the meantime
+        index = self._read_cache_index()
+        index.update(self.cache_index)
+        tmpname = os.path.join(self.cache_dir, "{}.{}.tmp".format(self.INDEX_NAME, os.getpid()))
+        with open(tmpname, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmpname, os.path.join(self.cache_dir, self.INDEX_NAME))
+        self.cache_updated = False
+
     def __enter__(self):
         return self
 
@@ -71,9 +220,92 @@ class WavReader(object):
     def close(self):
         if self.initialized and not self.dummy and not self.closed:
             self.file.close()
+            self._write_cache_index()
             self.closed = True
 
 
+class WavBlockReader(object):
+    """Read a wav file block by block
+
+    Args:
+        path: Path of wav file
+        dtype: Data type of signal. Defaults to "float64".
+    """
+
+    def __init__(self, path, dtype="float64"):
+        import soundfile as sf
+
+        self.dtype = np.dtype(dtype)
+        self.file = sf.SoundFile(path)
+        self.samp_freq = self.file.samplerate
+        self.length = self.file.frames
+
+    def blocks(self, block_size: int) -> Iterator[Tuple[np.ndarray, bool]]:
+        """Read the blocks from the beginning of file
+
+        Args:
+            block_size: Number of samples of each block
+
+        Yields:
+            Block of signal and the flag whether the block is the last one
+        """
+        self.file.seek(0)
+        position = 0
+        while True:
+            x = self.file.read(min(block_size, self.length - position), dtype=self.dtype.name, always_2d=True)
+            position += x.shape[0]
+            # multi-channel signal is converted to mono as librosa.load
+            x = x[:, 0] if x.shape[1] == 1 else np.mean(x, axis=1, dtype=self.dtype)
+            last = position >= self.length or x.shape[0] == 0
+            yield x, last
+            if last:
+                break
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class WavBlockWriter(object):
+    """Write a wav file block by block
+
+    Args:
+        path: Path of wav file
+        samp_freq: Sampling frequency
+    """
+
+    def __init__(self, path, samp_freq):
+        self.path = path
+        self.samp_freq = samp_freq
+        self.file = None
+
+    def write(self, x: np.ndarray):
+        if self.file is None:
+            import soundfile as sf
+
+            # number of channels is determined by the first block
+            channels = 1 if x.ndim == 1 else x.shape[1]
+            self.file = sf.SoundFile(
+                self.path, "w", self.samp_freq, channels, subtype="PCM_16", format="WAV"
+            )
+        self.file.write(x)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 class WavWriter(object):
     def __init__(self, wspecifier=None, write_function=None):
         if wspecifier is not None:
@@ -87,6 +319,8 @@ class WavWriter(object):
         # array = (sr, x)
         if self.closed:
             raise RuntimeError("WavWriter has been already closed")
+        import soundfile as sf
+
         # (TODO) subtype argument
         sf.write(key, array[1], array[0], subtype="PCM_16", format="WAV")
 
@@ -113,6 +347,8 @@ class NumpyPlayer(object):
         # array = (sr, x)
         if self.closed:
             raise RuntimeError("NumpyPlayer has been already closed")
+        import sounddevice as sd
+
         try:
             sd.play(array[1], array[0])
         except Exception:
@@ -126,5 +362,169 @@ class NumpyPlayer(object):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        import sounddevice as sd
+
         sd.stop()
         self.closed = True
+
+
+def _nbytes(value: Any) -> int:
+    """Return the total bytes of the arrays in `value` (e.g. the pair of sampling frequency and signal)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    elif isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    else:
+        return 0
+
+
+class PrefetchReader(object):
+    """Read the inputs ahead by a background thread while the previous input is processed
+
+    Args:
+        reader: Reader which yields the pairs of key and input (e.g. kaldiio ReadHelper).
+            It is iterated by the background thread.
+        num_prefetch: Number of inputs read ahead
+    """
+
+    def __init__(self, reader, num_prefetch):
+        if num_prefetch < 1:
+            raise ValueError("num_prefetch must be greater than 0, but got {}".format(num_prefetch))
+        self.reader = reader
+        self.num_prefetch = num_prefetch
+
+    def __iter__(self):
+        from queue import Full, Queue
+
+        queue = Queue(maxsize=self.num_prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            # give up when the main thread stops iterating (e.g. by an error)
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def run():
+            key = None
+            try:
+                for key, value in self.reader:
+                    if not put(("item", (key, value))):
+                        return
+                put(("end", None))
+            except Exception as e:
+                put(("error", (key, e)))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                kind, item = queue.get()
+                if kind == "end":
+                    break
+                elif kind == "error":
+                    key, e = item
+                    if key is None:
+                        raise RuntimeError("Failed to read the first input: {}".format(e)) from e
+                    raise RuntimeError("Failed to read the input next to {}: {}".format(key, e)) from e
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+
+class BackgroundWriter(object):
+    """Write the outputs by a background thread while the next output is generated
+
+    The outputs are written in the order of the calls.
+    The error of writing is raised by the next call or `close` with the key of the output.
+
+    Args:
+        writer: Writer which is called with key and value (e.g. WavWriter or kaldiio WriteHelper).
+            It is called only by the background thread.
+        max_bytes: Maximum bytes of the arrays waiting to be written.
+            The call blocks while it is exceeded, but one output is always accepted regardless of its size.
+    """
+
+    def __init__(self, writer, max_bytes):
+        self.writer = writer
+        self.max_bytes = max_bytes
+        self.queue = deque()
+        self.inflight_bytes = 0
+        self.error = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, key, value):
+        nbytes = _nbytes(value)
+        with self.condition:
+            while (
+                self.error is None
+                and len(self.queue) > 0
+                and self.inflight_bytes + nbytes > self.max_bytes
+            ):
+                self.condition.wait()
+            self._raise_error()
+            self.queue.append((key, value, nbytes))
+            self.inflight_bytes += nbytes
+            self.condition.notify_all()
+
+    def __setitem__(self, key, value):
+        self(key, value)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while len(self.queue) == 0 and not self.closed:
+                    self.condition.wait()
+                if len(self.queue) == 0:
+                    return
+                key, value, nbytes = self.queue[0]
+            try:
+                self.writer(key, value)
+            except Exception as e:
+                with self.condition:
+                    # the remaining outputs are discarded
+                    self.error = (key, e)
+                    self.queue.clear()
+                    self.inflight_bytes = 0
+                    self.condition.notify_all()
+                return
+            with self.condition:
+                self.queue.popleft()
+                self.inflight_bytes -= nbytes
+                self.condition.notify_all()
+
+    def _raise_error(self):
+        if self.error is not None:
+            key, e = self.error
+            raise RuntimeError("Failed to write {}: {}".format(key, e)) from e
+
+    def close(self, raise_error=True):
+        """Wait until all outputs are written
+
+        Args:
+            raise_error: The flag to raise the error of writing. Defaults to True.
+        """
+        with self.condition:
+            self.closed = True
+            if not raise_error:
+                # the remaining outputs are discarded
+                self.queue.clear()
+            self.condition.notify_all()
+        self.thread.join()
+        if raise_error:
+            self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # the error of writing is not raised again while the other error is propagated
+        self.close(raise_error=exc_type is None)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Multirate processing of band-limited signals
+
+A signal whose frequency components are limited below the band edge (e.g. the envelope)
+is decimated in stages with the polyphase anti-aliasing filters, processed at the low rate
+and interpolated back to the original rate.
+"""
+
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+from scipy import signal
+
+# stopband attenuation [dB] of the anti-aliasing and anti-imaging filters
+MULTIRATE_ATTENUATION = 80.0
+
+# the low rate is at least this times the band edge
+MULTIRATE_OVERSAMPLING = 4.0
+
+# maximum decimation factor of each stage
+MAX_STAGE_FACTOR = 8
+
+# the last stage of the interpolation is linear if its input rate is at least this times the band edge
+# (the images of the components at the band edge are attenuated by about 36 dB)
+LINEAR_INTERPOLATION_OVERSAMPLING = 8.0
+
+
+def decimation_factors(samp_freq: float, band_edge: float) -> List[int]:
+    """Return the decimation factor of each stage
+
+    Args:
+        samp_freq: Sampling frequency
+        band_edge: Upper limit of the frequency components to be kept
+
+    Returns:
+        Factors of the stages (powers of 2 up to `MAX_STAGE_FACTOR`, the largest first).
+            The list is empty if the signal cannot be decimated.
+    """
+    factor = 1
+    while samp_freq / (factor * 2) >= MULTIRATE_OVERSAMPLING * band_edge:
+        factor *= 2
+    factors = []
+    while factor > 1:
+        stage = min(factor, MAX_STAGE_FACTOR)
+        factors.append(stage)
+        factor //= stage
+    return factors
+
+
+@lru_cache(maxsize=64)
+def _antialiasing_filter(samp_freq: float, factor: int, band_edge: float) -> np.ndarray:
+    # the components below the band edge are passed and the ones aliased onto them are attenuated
+    low_rate = samp_freq / factor
+    width = (low_rate - 2 * band_edge) / (samp_freq / 2)
+    num_taps, beta = signal.kaiserord(MULTIRATE_ATTENUATION, width)
+    h = signal.firwin(num_taps | 1, low_rate / 2, window=("kaiser", beta), fs=samp_freq)
+    h.flags.writeable = False
+    return h
+
+
+def multirate_margin(factors: Sequence[int], samp_freq: float, band_edge: float) -> int:
+    """Return the number of samples of the margin covered by the anti-aliasing filters of all stages
+
+    The signal padded with the zeros of the margin at both sides is decimated and interpolated
+    without the transients of the filters at the edges of the original signal.
+
+    Args:
+        factors: Decimation factors of the stages (see `decimation_factors`)
+        samp_freq: Sampling frequency of the original signal
+        band_edge: Upper limit of the frequency components to be kept
+
+    Returns:
+        Margin at the original rate, which is a multiple of the total decimation factor
+    """
+    margin = 0.0
+    rate = samp_freq
+    for factor in factors:
+        margin += (len(_antialiasing_filter(rate, factor, band_edge)) // 2) * samp_freq / rate
+        rate /= factor
+    factor = int(np.prod(factors))
+    return int(-(-int(np.ceil(margin)) // factor) * factor)
+
+
+def _decimate_stage(x: np.ndarray, h: np.ndarray, factor: int) -> np.ndarray:
+    """Filter and downsample the signal with the delay compensation and one more sample after the end"""
+    delay = (len(h) - 1) // 2
+    # the filter is delayed so that its delay is a multiple of the factor
+    pad = -delay % factor
+    h = np.concatenate([np.zeros(pad), h])
+    start = (delay + pad) // factor
+    length = -(-x.shape[0] // factor) + 1
+    return signal.upfirdn(h, x, 1, factor, axis=0)[start : start + length]
+
+
+def decimate(x: np.ndarray, factors: Sequence[int], samp_freq: float, band_edge: float) -> np.ndarray:
+    """Decimate the signal in stages
+
+    Each stage keeps one more sample after the end of the signal (filtered with the zeros after the end),
+    so that the interpolation covers the whole original signal.
+
+    Args:
+        x: Input signal whose first axis is time
+        factors: Decimation factors of the stages (see `decimation_factors`)
+        samp_freq: Sampling frequency of the input
+        band_edge: Upper limit of the frequency components to be kept
+
+    Returns:
+        Decimated signal
+    """
+    y = x
+    for factor in factors:
+        y = _decimate_stage(y, _antialiasing_filter(samp_freq, factor, band_edge), factor)
+        samp_freq /= factor
+    return y.astype(x.dtype, copy=False)
+
+
+def _linear_interpolate(x: np.ndarray, factor: int) -> np.ndarray:
+    """Interpolate the signal linearly (the samples after the last one are held)"""
+    n = x.shape[0]
+    y = np.empty((n * factor,) + x.shape[1:], dtype=x.dtype)
+    view = y.reshape((n, factor) + x.shape[1:])
+    diff = np.zeros_like(x)
+    np.subtract(x[1:], x[:-1], out=diff[:-1])
+    weights = (np.arange(factor) / factor).reshape((1, factor) + (1,) * (x.ndim - 1))
+    np.multiply(diff[:, None], weights, out=view)
+    view += x[:, None]
+    return y
+
+
+def interpolate(x: np.ndarray, factors: Sequence[int], samp_freq: float, band_edge: float, length: int) -> np.ndarray:
+    """Interpolate the decimated signal back to the original rate
+
+    The stages are polyphase except the last one, which is linear if the signal is oversampled enough
+    (see `LINEAR_INTERPOLATION_OVERSAMPLING`) since it is the most expensive stage at the original rate.
+
+    Args:
+        x: Decimated signal whose first axis is time
+        factors: Decimation factors of the stages used by `decimate`
+        samp_freq: Sampling frequency of the original signal (not the decimated one)
+        band_edge: Upper limit of the frequency components of the signal
+        length: Length of the original signal
+
+    Returns:
+        Interpolated signal with the length of `length`
+    """
+    rates = [samp_freq]
+    for factor in factors[:-1]:
+        rates.append(rates[-1] / factor)
+    y = x
+    for i, (factor, rate) in enumerate(zip(reversed(factors), reversed(rates))):
+        if i == len(factors) - 1 and rate / factor >= LINEAR_INTERPOLATION_OVERSAMPLING * band_edge:
+            y = _linear_interpolate(y, factor)
+        else:
+            # the same filter as the decimation removes the images (the gain is compensated by resample_poly)
+            h = _antialiasing_filter(rate, factor, band_edge)
+            y = signal.resample_poly(y, factor, 1, axis=0, window=h)
+    return y[:length].astype(x.dtype, copy=False)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Memory-mapped bank of noise
+
+A long noise of each configuration is generated once into a `.npy` file of the bank directory
+and the noise of each utterance is the slice of the bank at a random offset
+(or a random one of the independent segments of the bank).
+The offsets are drawn from `np.random`, which is re-seeded for each input by `--seed`,
+so the noises are reproducible regardless of the order of the inputs and the number of jobs.
+The bank itself is generated with the fixed seed and shared (memory-mapped) by all processes.
+"""
+
+import os
+import threading
+from logging import getLogger
+from typing import Callable
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+# seed of the random generator of the bank
+NOISE_BANK_SEED = 0
+
+
+def noise_bank_name(*params) -> str:
+    """Return the file name of the bank of the parameters (e.g. the color, sampling frequency and length)"""
+    return "_".join(str(p) for p in params).replace("/", "-") + ".npy"
+
+
+def load_noise_bank(
+    bank_dir: str, name: str, length: int, generate: Callable[[np.random.RandomState, int], np.ndarray]
+) -> np.ndarray:
+    """Return the bank of noise, which is generated at the first time
+
+    Args:
+        bank_dir: Directory of the banks
+        name: File name of the bank (see `noise_bank_name`)
+        length: Number of samples of the bank
+        generate: Function to generate the noise from the random generator and the number of samples
+
+    Returns:
+        Read-only (memory-mapped) signal of the bank
+    """
+    path = os.path.join(bank_dir, name)
+    if not os.path.exists(path):
+        logger.info("Generate the noise bank {} of {} samples".format(path, length))
+        os.makedirs(bank_dir, exist_ok=True)
+        x = generate(np.random.RandomState(NOISE_BANK_SEED), length)
+        # write to a temporary file and rename it so that the other process never reads the incomplete file
+        tmpname = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+        with open(tmpname, "wb") as f:
+            np.save(f, x)
+        os.replace(tmpname, path)
+    bank = np.load(path, mmap_mode="r")
+    if bank.shape != (length,):
+        raise ValueError("Noise bank {} must have {} samples, but got {}".format(path, length, bank.shape))
+    return np.asarray(bank)
+
+
+def draw_from_bank(bank: np.ndarray, length: int, aligned: bool = False) -> np.ndarray:
+    """Return the slice of the bank at a random offset
+
+    Args:
+        bank: Signal of the bank
+        length: Number of samples of the slice
+        aligned: The flag to draw the offset from the multiples of `length`,
+            i.e. the bank is the sequence of the independent segments of `length`. Defaults to False.
+
+    Returns:
+        Read-only view of the bank
+    """
+    if length > bank.shape[0]:
+        raise ValueError(
+            "Noise of {} samples cannot be drawn from the noise bank of {} samples".format(length, bank.shape[0])
+        )
+    if aligned:
+        offset = np.random.randint(0, bank.shape[0] // length) * length
+    else:
+        offset = np.random.randint(0, bank.shape[0] - length + 1)
+    return bank[offset : offset + length]
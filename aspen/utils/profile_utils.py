@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Per-stage timing (and memory usage) of the generation
+
+The profiler is disabled by default and `profile_stage` costs almost nothing in that case,
+so the stages and pipeline components are instrumented unconditionally.
+"""
+
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# stage which covers the whole generation of one output, with the duration of processed audio
+UTTERANCE_STAGE = "utterance"
+
+# number of stages shown in the table of the top allocating stages
+NUM_TOP_ALLOCATIONS = 10
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak RSS of this process [byte] (None if it is not available on the platform)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Profiler(object):
+    """Collect the wall-clock and CPU time of each stage keyed by utterance
+
+    Args:
+        path: Path of JSON-lines file to which each record is written. Defaults to None (= kept only in memory).
+        memory: The flag to record the memory usage of each stage by tracemalloc in addition to the time.
+            `alloc_delta` (bytes allocated and not freed by the stage), `alloc_peak` (peak bytes allocated
+            during the stage) and `rss_peak` (peak RSS of the process after the stage) are added to the records.
+            Only the stages in the thread which creates the profiler are measured,
+            since tracemalloc traces the whole process. Defaults to False.
+    """
+
+    def __init__(self, path: Optional[str] = None, memory: bool = False):
+        self.records = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.memory = memory
+        self.memory_thread = threading.get_ident()
+        # peaks of the stages which are being measured (innermost last)
+        self.memory_stack = []
+        self.started_tracemalloc = False
+        if self.memory:
+            if not hasattr(tracemalloc, "reset_peak"):
+                raise ValueError("memory profiling requires Python 3.9 or later")
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracemalloc = True
+        self.file = None if path is None else open(path, "w")
+        self.start = time.perf_counter()
+
+    @property
+    def key(self) -> Optional[str]:
+        """Key of the utterance processed by the current thread"""
+        return getattr(self.local, "key", None)
+
+    @key.setter
+    def key(self, key: Optional[str]):
+        self.local.key = key
+
+    @contextmanager
+    def stage(self, name: str, key: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Measure the time of the stage
+
+        Args:
+            name: Name of the stage (e.g. `postprocess/Declip` for a pipeline component)
+            key: Key of the utterance. Defaults to None (= the key of the current thread).
+
+        Yields:
+            Dictionary of the additional fields of the record (e.g. `audio_sec` of the utterance stage)
+        """
+        if key is None:
+            key = self.key
+        fields = {}
+        memory = self.memory and threading.get_ident() == self.memory_thread
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if len(self.memory_stack) > 0:
+                # the peak of the outer stage is kept here since it is reset for this stage
+                self.memory_stack[-1] = max(self.memory_stack[-1], peak)
+            tracemalloc.reset_peak()
+            self.memory_stack.append(current)
+        wall = time.perf_counter()
+        # CPU time of the current thread, since the reader and writer run in the other threads
+        cpu = time.thread_time()
+        try:
+            yield fields
+        finally:
+            record = {
+                "key": key,
+                "stage": name,
+                "wall": time.perf_counter() - wall,
+                "cpu": time.thread_time() - cpu,
+            }
+            if memory:
+                end, peak = tracemalloc.get_traced_memory()
+                peak = max(self.memory_stack.pop(), peak)
+                if len(self.memory_stack) > 0:
+                    self.memory_stack[-1] = max(self.memory_stack[-1], peak)
+                record["alloc_delta"] = end - current
+                record["alloc_peak"] = peak - current
+                record["rss_peak"] = peak_rss()
+            record.update(fields)
+            self.add_records([record])
+
+    def add_records(self, records: Iterable[Dict[str, Any]]):
+        """Add the records (e.g. measured by the worker processes)"""
+        with self.lock:
+            for record in records:
+                self.records.append(record)
+                if self.file is not None:
+                    self.file.write(json.dumps(record) + "\n")
+
+    def pop_records(self) -> List[Dict[str, Any]]:
+        """Return and remove the records measured so far"""
+        with self.lock:
+            records, self.records = self.records, []
+        return records
+
+    def summary(self) -> str:
+        """Return the table of per-stage totals and percentiles and the real-time factor"""
+        elapsed = time.perf_counter() - self.start
+        with self.lock:
+            records = list(self.records)
+        stages = {}
+        for record in records:
+            stages.setdefault(record["stage"], []).append(record)
+
+        lines = [
+            "{:<32} {:>6} {:>10} {:>10} {:>9} {:>9} {:>9} {:>7}".format(
+                "stage", "count", "wall[s]", "cpu[s]", "p50[ms]", "p90[ms]", "p99[ms]", "share"
+            )
+        ]
+        for name in sorted(stages):
+            walls = np.array([r["wall"] for r in stages[name]])
+            p50, p90, p99 = np.percentile(walls, [50, 90, 99]) * 1000
+            lines.append(
+                "{:<32} {:>6} {:>10.3f} {:>10.3f} {:>9.1f} {:>9.1f} {:>9.1f} {:>6.1f}%".format(
+                    name,
+                    len(walls),
+                    walls.sum(),
+                    sum(r["cpu"] for r in stages[name]),
+                    p50,
+                    p90,
+                    p99,
+                    100 * walls.sum() / elapsed if elapsed > 0 else 0.0,
+                )
+            )
+        audio_sec = sum(r.get("audio_sec", 0.0) for r in stages.get(UTTERANCE_STAGE, []))
+        lines.append(
+            "audio {:.3f} s in {:.3f} s (real-time factor: {:.2f} seconds of audio per second)".format(
+                audio_sec, elapsed, audio_sec / elapsed if elapsed > 0 else 0.0
+            )
+        )
+        if self.memory:
+            lines.extend(self.memory_summary(stages))
+        return "\n".join(lines)
+
+    def memory_summary(self, stages: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+        """Return the lines of the table of the top allocating stages
+
+        Args:
+            stages: Mapping from a stage name to its records
+
+        Returns:
+            Lines of the table sorted by the maximum peak allocation
+        """
+        peaks = []
+        for name, records in stages.items():
+            records = [r for r in records if "alloc_peak" in r]
+            if len(records) > 0:
+                top = max(records, key=lambda r: r["alloc_peak"])
+                delta = sum(r["alloc_delta"] for r in records) / len(records)
+                peaks.append((top["alloc_peak"], name, delta, top["key"]))
+        lines = [
+            "",
+            "{:<32} {:>14} {:>14}  {}".format("top allocating stage", "peak[MB]", "mean delta[MB]", "key of peak"),
+        ]
+        for peak, name, delta, key in sorted(peaks, reverse=True)[:NUM_TOP_ALLOCATIONS]:
+            lines.append("{:<32} {:>14.1f} {:>14.1f}  {}".format(name, peak / 2**20, delta / 2**20, key))
+        rss = peak_rss()
+        if rss is not None:
+            lines.append("peak RSS {:.1f} MB".format(rss / 2**20))
+        return lines
+
+    def close(self):
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# profiler enabled in this process
+_profiler = None
+
+
+def enable_profiler(path: Optional[str] = None, memory: bool = False) -> Profiler:
+    """Enable the profiler in this process
+
+    Args:
+        path: Path of JSON-lines file. Defaults to None (= kept only in memory).
+        memory: The flag to record the memory usage of each stage. Defaults to False.
+
+    Returns:
+        Enabled profiler
+    """
+    global _profiler
+    disable_profiler()
+    _profiler = Profiler(path, memory)
+    return _profiler
+
+
+def disable_profiler():
+    """Disable (and close) the profiler in this process"""
+    global _profiler
+    if _profiler is not None:
+        _profiler.close()
+    _profiler = None
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Return the profiler enabled in this process, or None"""
+    return _profiler
+
+
+def profile_stage(name: str, key: Optional[str] = None):
+    """Context manager to measure the stage by the enabled profiler (do nothing if disabled)
+
+    Args:
+        name: Name of the stage
+        key: Key of the utterance. Defaults to None (= the key of the current thread).
+    """
+    if _profiler is None:
+        # the fields set to the yielded dictionary (a new one for each call) are discarded
+        return nullcontext({})
+    return _profiler.stage(name, key)
+
+
+def set_profile_key(key: Optional[str]):
+    """Set the key of the utterance processed by the current thread"""
+    if _profiler is not None:
+        _profiler.key = key
+
+
+def profile_iter(iterable: Iterable[Tuple[str, Any]], name: str) -> Iterator[Tuple[str, Any]]:
+    """Measure the time to get each pair of key and value from `iterable` (e.g. reader)"""
+    iterator = iter(iterable)
+    while True:
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            key, value = next(iterator)
+        except StopIteration:
+            return
+        if _profiler is not None:
+            # the record is keyed by the item, so it is not measured by `profile_stage`
+            _profiler.add_records(
+                [
+                    {
+                        "key": key,
+                        "stage": name,
+                        "wall": time.perf_counter() - wall,
+                        "cpu": time.thread_time() - cpu,
+                    }
+                ]
+            )
+        yield key, value
+
+
+def profile_call(func: Callable[[str, Any], Any], name: str) -> Callable[[str, Any], Any]:
+    """Wrap the function called with key and value (e.g. writer) to measure each call"""
+
+    def wrapper(key, value):
+        with profile_stage(name, key):
+            return func(key, value)
+
+    return wrapper
@@ -6,7 +6,8 @@ from typing import Union
 import numpy as np
 import numpy.typing as npt
 
-from aspen.processings.declip import declip
+# number of samples converted at once from float to int to bound the temporary array
+CHUNK_SIZE = 65536
 
 
 def scaling_astype(x: np.ndarray, out_dtype: Union[str, npt.DTypeLike]) -> np.ndarray:
@@ -19,11 +20,11 @@ def scaling_astype(x: np.ndarray, out_dtype: Union[str, npt.DTypeLike]) -> np.nd
     Ref: https://numpy.org/doc/stable/user/basics.types.html
 
     Args:
-        x: Input signal.
+        x: Input signal. It is never modified.
         out_dtype: Output numpy dtype.
 
     Returns:
-        Output signal.
+        Output signal. The input signal itself when the data type is the same as `out_dtype`.
     """
 
     if not isinstance(x, np.ndarray):
@@ -31,20 +32,31 @@ def scaling_astype(x: np.ndarray, out_dtype: Union[str, npt.DTypeLike]) -> np.nd
     else:
         in_dtype = x.dtype
 
-    cloned = x.copy()
     if in_dtype == out_dtype:
-        pass
+        return x
     elif np.issubdtype(in_dtype, np.floating):
-        # if the x has the element > 1.0, declip is applied to scale the output
-        cloned = declip(cloned, 1.0)
+        # if the x has the element > 1.0, the output is scaled as declip
+        # (without the temporary array of np.abs(x))
+        peak = max(x.max(), -x.min()) if x.size > 0 else 0
         # when float -> int, the values are scaled to min-max value of dtype
         if np.issubdtype(out_dtype, np.signedinteger):
-            cloned *= np.iinfo(out_dtype).max
+            y = np.empty(x.shape, dtype=out_dtype)
+            for start in range(0, x.shape[0], CHUNK_SIZE):
+                chunk = x[start : start + CHUNK_SIZE]
+                if peak > 1.0:
+                    chunk = chunk / peak
+                    chunk *= np.iinfo(out_dtype).max
+                else:
+                    chunk = chunk * np.iinfo(out_dtype).max
+                y[start : start + CHUNK_SIZE] = chunk.astype(out_dtype)
+            return y
+        scaled = x / peak if peak > 1.0 else x
     elif np.issubdtype(in_dtype, np.signedinteger):
         # e.g. -32768 <= np.iinfo("int16") <= 32767
-        cloned = cloned.astype(np.float64)
-        cloned /= np.iinfo(in_dtype).max + 1
+        scaled = x.astype(np.float64)
+        scaled /= np.iinfo(in_dtype).max + 1
         if np.issubdtype(out_dtype, np.signedinteger):
-            cloned = cloned * np.iinfo(out_dtype).max
-    cloned = cloned.astype(out_dtype)
-    return cloned
+            scaled *= np.iinfo(out_dtype).max
+    else:
+        scaled = x
+    return scaled.astype(out_dtype)
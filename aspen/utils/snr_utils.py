@@ -19,7 +19,10 @@ def rms(x: np.ndarray) -> np.ndarray:
 
 
 def get_snr_noise(
-    x: np.ndarray, noise: np.ndarray, snr: Optional[float] = None
+    x: np.ndarray,
+    noise: np.ndarray,
+    snr: Optional[float] = None,
+    length: Optional[int] = None,
 ) -> np.ndarray:
     """Return the noise signal with signal-to-noise ratio(SNR) by x
     `RMS_noise = RMS_x / (10 ** (SNR / 20))`
@@ -29,11 +32,16 @@ def get_snr_noise(
         x: Reference signal
         noise: Target noise
         snr: Signal-to-noise ratio. Defaults to None (= do nothing).
+        length: Length of the returned noise signal. The RMS is calculated from the whole noise.
+            Defaults to None (= the whole noise).
 
     Returns:
         noise signal with signal-to-noise ratio(SNR) by x
     """
     if snr is None:
-        return noise
+        return noise[:length]
     rms_noise_at_snr = rms(x) / (10 ** (snr / 20))
-    return noise / rms(noise) * rms_noise_at_snr
+    # the new array is scaled in-place
+    y = noise[:length] / rms(noise)
+    y *= rms_noise_at_snr
+    return y
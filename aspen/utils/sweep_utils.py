@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+import itertools
+from typing import Any, Dict, List, Sequence, Tuple
+
+Condition = List[Tuple[str, Any]]
+
+
+def parse_sweep(sweep: str) -> Dict[str, List[Any]]:
+    """Parse the sweep setting
+
+    Args:
+        sweep: YAML mapping from an option name (without the leading hyphens) to the list of its values
+            (e.g. `{gap-method: [replace, silent], target-snr: [0, -10]}`).
+            configargparse passes the mapping in a config file to this string representation.
+
+    Returns:
+        Mapping from an option name to the list of its values
+    """
+    import yaml
+
+    try:
+        parsed = yaml.safe_load(sweep)
+    except yaml.YAMLError as e:
+        raise ValueError("Invalid sweep setting {}: {}".format(sweep, e))
+    if not isinstance(parsed, dict) or len(parsed) == 0:
+        raise ValueError(
+            "sweep must be a non-empty mapping of option name to values, but got {}".format(
+                sweep
+            )
+        )
+    sweep_dict = {}
+    for k, v in parsed.items():
+        if not isinstance(v, list):
+            v = [v]
+        if len(v) == 0:
+            raise ValueError("sweep values of '{}' must not be empty".format(k))
+        sweep_dict[str(k).lstrip("-")] = v
+    return sweep_dict
+
+
+def expand_sweep(sweep: Dict[str, Sequence[Any]]) -> List[Condition]:
+    """Expand the sweep setting to the condition matrix (i.e. the product of all values)
+
+    Args:
+        sweep: Mapping from an option name to the list of its values
+
+    Returns:
+        List of conditions. Each condition is a list of (option name, value).
+    """
+    names = list(sweep.keys())
+    return [list(zip(names, values)) for values in itertools.product(*sweep.values())]
+
+
+def sweep_cmd_args(condition: Condition) -> List[str]:
+    """Convert the condition to command-line arguments
+
+    Args:
+        condition: List of (option name, value).
+            If the value is a list, it is passed to the option with `nargs`.
+
+    Returns:
+        Command-line arguments (e.g. `["--gap-method=replace", "--target-snr=-10"]`)
+    """
+    cmd_args = []
+    for name, value in condition:
+        if isinstance(value, list):
+            cmd_args.append("--" + name)
+            cmd_args.extend([str(v) for v in value])
+        else:
+            # use `=` so that a negative number is not regarded as an option
+            cmd_args.append("--{}={}".format(name, value))
+    return cmd_args
+
+
+def sweep_suffix(condition: Condition) -> str:
+    """Return the suffix of output file or key for the condition
+
+    Args:
+        condition: List of (option name, value)
+
+    Returns:
+        Suffix (e.g. `gap-method-replace_target-snr--10`)
+    """
+    suffix = []
+    for name, value in condition:
+        if isinstance(value, list):
+            value = "-".join([str(v) for v in value])
+        suffix.append("{}-{}".format(name, value))
+    return "_".join(suffix)
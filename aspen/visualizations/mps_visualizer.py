@@ -64,8 +64,9 @@ class MpsVisualizer(AbsCommonInterface, AbsVisualizationInterface):
         else:
             ax.set_xticks([])
             ax.set_yticks([])
-        (_, mps_f, mps_t, mps, mps_pow,) = modulation_power_spectrum(
-            sample, samp_freq=self.samp_freq
+        # only the power is plotted, so the frames of 2D-FFT are not kept
+        (_, mps_f, mps_t, _, mps_pow,) = modulation_power_spectrum(
+            sample, samp_freq=self.samp_freq, keep_raw_mps=False
         )  # use default for other argv
         mps_pow_shift = fft.fftshift(mps_pow)
         mps_f_shift = fft.fftshift(mps_f)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Benchmark of the execution time of each sound, stimulus, processing and visualization
+
+Each component is instantiated with its default parameters and timed for every combination of
+the input durations and sampling frequencies (the minimum of `--repeat` runs after a warm-up with 1 s input).
+The result is stored as `.benchmarks/<commit>.json` by default, so that it can be compared with
+the result of another commit by `--compare`. The run fails (exit status 1) if any case is slower than
+`--threshold` times the compared result, or fails although it was measured in the compared result.
+
+Usage:
+    python benchmarks/bench_components.py [--durations 1 10 60 600] [--samp-freqs 16000 44100 48000]
+        [--repeat 3] [--output result.json] [--compare <commit or json>] [--threshold 1.25] [component ...]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+RESULT_DIR = os.path.join(REPO_DIR, ".benchmarks")
+
+DURATIONS = [1, 10, 60, 600]
+SAMP_FREQS = [16000, 44100, 48000]
+
+# inputs of each stimulus ("speech": speech-like signal, "noise": white noise, "tone": 50 ms pure tone)
+# and the parameters which depend on the duration [s]
+STIMULI = {
+    "auditory_streaming": (["tone", "tone"], lambda duration: {"num_repetition": max(1, round(duration / 0.44))}),
+    "continuity": (["speech", "noise"], lambda duration: {}),
+    "identity": (["speech"], lambda duration: {}),
+    "iterated_rippled_noise": (["noise"], lambda duration: {}),
+    "locally_time_reversed_speech": (["speech"], lambda duration: {}),
+    "modulation_filtered_speech": (["speech"], lambda duration: {}),
+    "noise_vocoded_speech": (["speech", "noise"], lambda duration: {}),
+    "verbal_transformation": (["speech"], lambda duration: {}),
+}
+
+# parameters of the components which have no default (or a default which does nothing)
+PARAMS = {
+    "processings/apply_ramp": {"apply_ramp_duration": 5},
+    "processings/filter_signal": {"filter_signal_btype": "bandpass", "filter_signal_filter_freq": "800_1200"},
+}
+
+# maximum duration [s] of the components which are too slow or large for long inputs
+MAX_DURATIONS = {
+    "stimuli/modulation_filtered_speech": 60,
+    "stimuli/verbal_transformation": 60,
+    "processings/modulation_power_spectrum": 60,
+    "visualizations/mps_visualizer": 60,
+    "visualizations/spectrogram_visualizer": 60,
+}
+
+
+def list_components() -> List[str]:
+    """Return the names of all components (e.g. `processings/filter_signal`)"""
+    import importlib
+    import pkgutil
+
+    components = []
+    for category in ["sounds", "stimuli", "processings", "visualizations"]:
+        package = importlib.import_module("aspen." + category)
+        components.extend(category + "/" + m.name for m in pkgutil.iter_modules(package.__path__))
+    return components
+
+
+def input_signal(kind: str, duration: float, samp_freq: int, rng: np.random.RandomState) -> np.ndarray:
+    """Generate the input signal
+
+    Args:
+        kind: "speech" (noise modulated at the syllable rate), "noise" or "tone"
+        duration: Duration in second (ignored for "tone")
+        samp_freq: Sampling frequency
+        rng: Random generator
+
+    Returns:
+        Input signal
+    """
+    if kind == "tone":
+        return np.sin(2 * np.pi * 440 * np.arange(int(0.05 * samp_freq)) / samp_freq)
+    t = int(duration * samp_freq)
+    x = rng.uniform(-0.5, 0.5, t)
+    if kind == "speech":
+        x *= 0.5 * (1 - np.cos(2 * np.pi * 4 * np.arange(t) / samp_freq))
+    return x
+
+
+def build_case(component: str, duration: float, samp_freq: int) -> Callable[[], object]:
+    """Instantiate the component and prepare its input
+
+    Args:
+        component: Name of the component (e.g. `processings/filter_signal`)
+        duration: Duration of the signal in second
+        samp_freq: Sampling frequency
+
+    Returns:
+        Function which runs the component once
+    """
+    from aspen.utils.dynamic_classimport import dynamic_classimport
+
+    category, name = component.split("/")
+    cls = dynamic_classimport(name, "aspen." + category)
+    # the parameters except the sampling frequency and duration are the defaults of `__init__`
+    args = argparse.Namespace(samp_freq=samp_freq, **PARAMS.get(component, {}))
+    rng = np.random.RandomState(0)
+    if category == "sounds":
+        setattr(args, name + "_duration", [duration * 1000])
+        return cls(**cls.load_class_kwargs(args))
+    elif category == "stimuli":
+        kinds, params = STIMULI[name]
+        for k, v in params(duration).items():
+            setattr(args, k, v)
+        obj = cls(**cls.load_class_kwargs(args))
+        x = [input_signal(kind, duration, samp_freq, rng) for kind in kinds]
+        return lambda: obj(x)
+    elif category == "processings":
+        obj = cls(**cls.load_class_kwargs(args))
+        x = input_signal("speech", duration, samp_freq, rng)
+        return lambda: obj(x)
+    else:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        obj = cls(**cls.load_class_kwargs(args))
+        x = input_signal("speech", duration, samp_freq, rng)
+
+        def run():
+            fig, ax = plt.subplots()
+            try:
+                obj(fig, ax, x)
+                # the drawing is included in the time
+                fig.canvas.draw()
+            finally:
+                plt.close(fig)
+
+        return run
+
+
+def measure(component: str, duration: float, samp_freq: int, repeat: int) -> Dict[str, float]:
+    """Measure the execution time of the component
+
+    Args:
+        component: Name of the component
+        duration: Duration of the signal in second
+        samp_freq: Sampling frequency
+        repeat: Number of measurements
+
+    Returns:
+        Minimum and median of the execution time [s]
+    """
+    # warm-up (e.g. imports and filter design) with a short input
+    build_case(component, 1, samp_freq)()
+    run = build_case(component, duration, samp_freq)
+    times = []
+    for _ in range(repeat):
+        np.random.seed(0)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def git_commit() -> str:
+    """Return the commit hash of the working tree (`unknown` if it is not a git repository)"""
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            check=True,
+        )
+        return proc.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_result(name: str) -> dict:
+    """Load the result from a JSON file or the commit hash stored in `.benchmarks`"""
+    path = name if os.path.exists(name) else os.path.join(RESULT_DIR, name + ".json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_time: float) -> List[str]:
+    """Compare the results with the baseline
+
+    Args:
+        results: Mapping from a case to its result
+        baseline: Mapping from a case to its result of the baseline
+        threshold: Ratio of the execution time regarded as a slowdown
+        min_time: Cases faster than this time [s] in the baseline are ignored as noisy
+
+    Returns:
+        List of the slowed-down cases and the failed cases which were measured in the baseline
+    """
+    regressions = []
+    for case, result in results.items():
+        if case not in baseline or "min" not in baseline[case]:
+            continue
+        base = baseline[case]["min"]
+        if "min" not in result:
+            # the case is broken since the baseline
+            regressions.append(case)
+            print("{:<64} {:>10.4f} -> failed: {}  ERROR".format(case, base, result.get("error")))
+            continue
+        ratio = result["min"] / base if base > 0 else float("inf")
+        mark = ""
+        if base >= min_time and ratio > threshold:
+            regressions.append(case)
+            mark = "  SLOWDOWN"
+        print("{:<64} {:>10.4f} -> {:>10.4f} s ({:.2f}x){}".format(case, base, result["min"], ratio, mark))
+    return regressions
+
+def main(cmd_args) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "components",
+        nargs="*",
+        help="Components to be measured (e.g. processings/filter_signal or processings). Defaults to all.",
+    )
+    parser.add_argument("--durations", default=DURATIONS, type=float, nargs="+", help="Durations of input [s]")
+    parser.add_argument("--samp-freqs", default=SAMP_FREQS, type=int, nargs="+", help="Sampling frequencies")
+    parser.add_argument("--repeat", default=3, type=int, help="Number of measurements for each case")
+    parser.add_argument(
+        "--output", default=None, type=str, help="Path of the JSON result. Defaults to .benchmarks/<commit>.json"
+    )
+    parser.add_argument(
+        "--compare", default=None, type=str, help="JSON result or commit hash (in .benchmarks) to be compared with"
+    )
+    parser.add_argument(
+        "--threshold", default=1.25, type=float, help="Ratio of the execution time regarded as a slowdown"
+    )
+    parser.add_argument(
+        "--min-time", default=0.001, type=float, help="Cases faster than this time [s] are not compared"
+    )
+    args = parser.parse_args(cmd_args)
+
+    components = [
+        c
+        for c in list_components()
+        if len(args.components) == 0 or c in args.components or c.split("/")[0] in args.components
+    ]
+    baseline = None if args.compare is None else load_result(args.compare)["results"]
+
+    results = {}
+    for component in components:
+        for samp_freq in args.samp_freqs:
+            for duration in args.durations:
+                case = "{}/{:g}s/{}Hz".format(component, duration, samp_freq)
+                if duration > MAX_DURATIONS.get(component, float("inf")):
+                    continue
+                try:
+                    results[case] = measure(component, duration, samp_freq, args.repeat)
+                except Exception as e:
+                    results[case] = {"error": "{}: {}".format(type(e).__name__, e)}
+                    print("{:<64} failed: {}".format(case, results[case]["error"]))
+                    continue
+                print("{:<64} {:>10.4f} s".format(case, results[case]["min"]))
+
+    commit = git_commit()
+    output = args.output
+    if output is None:
+        os.makedirs(RESULT_DIR, exist_ok=True)
+        output = os.path.join(RESULT_DIR, commit + ".json")
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": commit,
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        if len(regressions) > 0:
+            print("{} cases failed or are slower than {}x".format(len(regressions), args.threshold))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
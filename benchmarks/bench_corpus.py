@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Benchmark of the end-to-end throughput of the recipes on a synthetic corpus
+
+A deterministic speech-like corpus is synthesized locally (no download) with the given number of utterances
+and distribution of durations, and `generate.py` is run with each recipe in `egs/conf` on the corpus
+in a fresh interpreter for each number of workers (`--nj`).
+The utterances per second and the real-time factor (seconds of input audio processed per second)
+of the wall-clock time and excluding the startup (measured by the run with a short utterance for each worker),
+the peak RSS (of the main and worker processes) and the speedup over the first `--nj` are reported.
+The throughput excluding the startup is not reported (null) when the startup takes more than
+`MAX_STARTUP_SHARE` of the wall-clock time, since the startup is measured by another run with its own noise.
+
+Usage:
+    python benchmarks/bench_corpus.py [--num-utterances 100] [--distribution lognormal] [--mean-duration 4]
+        [--nj 1 2 4] [--output corpus.json] [recipe ...]
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+CONF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "egs", "conf")
+
+# maximum share of the startup in the wall-clock time to report the throughput excluding the startup
+MAX_STARTUP_SHARE = 0.5
+
+# number of signals taken by the stimuli which can transform the input speech
+# (the recipes which generate all of them by the sounds are not benchmarked)
+INPUT_STIMULI = {
+    "continuity": 2,
+    "locally_time_reversed_speech": 1,
+    "modulation_filtered_speech": 1,
+    "noise_vocoded_speech": 2,
+    "verbal_transformation": 1,
+}
+
+
+def list_recipes() -> List[str]:
+    """Return the names of the recipes which take the input speech"""
+    from aspen.bin.generate import parse_args
+
+    recipes = []
+    for conf in sorted(os.listdir(CONF_DIR)):
+        if not conf.endswith(".conf"):
+            continue
+        args = parse_args(["--conf", os.path.join(CONF_DIR, conf)])
+        num_inputs = INPUT_STIMULI.get(args.stimulus_module, 0)
+        if len(args.sound_generation_pipeline) < num_inputs and args.sweep is None:
+            recipes.append(os.path.splitext(conf)[0])
+    return recipes
+
+
+def speech_like(duration: float, samp_freq: int, rng: np.random.RandomState) -> np.ndarray:
+    """Synthesize a speech-like signal
+
+    The harmonic complex with a wandering fundamental frequency and the noise are alternated
+    and modulated at the syllable rate (about 4 Hz).
+
+    Args:
+        duration: Duration in second
+        samp_freq: Sampling frequency
+        rng: Random generator
+
+    Returns:
+        Signal within [-1, 1]
+    """
+    t = int(duration * samp_freq)
+    n = np.arange(t) / samp_freq
+    f0 = 150 + 50 * np.sin(2 * np.pi * rng.uniform(0.2, 0.5) * n + rng.uniform(0, 2 * np.pi))
+    phase = 2 * np.pi * np.cumsum(f0) / samp_freq
+    voiced = np.zeros(t)
+    for k in range(1, int(samp_freq / 4 / 200) + 1):
+        voiced += np.sin(k * phase) / k
+    noise = rng.uniform(-1, 1, t)
+    rate = rng.uniform(3, 5)
+    syllable = 0.5 * (1 - np.cos(2 * np.pi * rate * n))
+    # voiced and unvoiced parts are switched at every syllable
+    voicing = np.floor(rate * n) % 3 != 2
+    y = syllable * np.where(voicing, voiced / 3, 0.3 * noise)
+    return y / max(np.abs(y).max(), 1e-8) * 0.5
+
+
+def synthesize_corpus(corpus_dir: str, args, samp_freq: int) -> float:
+    """Write the wav files of the corpus and its list `wav.list`
+
+    Args:
+        corpus_dir: Output directory
+        args: Arguments of the corpus
+        samp_freq: Sampling frequency
+
+    Returns:
+        Total duration of the corpus in second
+    """
+    import soundfile as sf
+
+    rng = np.random.RandomState(args.seed)
+    if args.distribution == "lognormal":
+        durations = rng.lognormal(np.log(args.mean_duration), args.sigma, args.num_utterances)
+    else:
+        durations = rng.uniform(args.min_duration, args.max_duration, args.num_utterances)
+    durations = np.clip(durations, args.min_duration, args.max_duration)
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = []
+    for i, duration in enumerate(durations):
+        path = os.path.join(corpus_dir, "utt{:05d}.wav".format(i))
+        sf.write(path, speech_like(duration, samp_freq, rng), samp_freq, subtype="PCM_16")
+        paths.append(path)
+    with open(os.path.join(corpus_dir, "wav.list"), "w") as f:
+        f.write("\n".join(paths) + "\n")
+    # short utterance to measure the startup time
+    sf.write(
+        os.path.join(corpus_dir, "warmup.wav"),
+        speech_like(args.min_duration, samp_freq, rng),
+        samp_freq,
+        subtype="PCM_16",
+    )
+    return float(sum(int(d * samp_freq) for d in durations) / samp_freq)
+
+
+def peak_rss(who) -> int:
+    """Return the peak RSS of this process or its children [byte]"""
+    maxrss = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def run_worker(cmd_args: List[str]) -> dict:
+    """Run `generate.py` in this process
+
+    Args:
+        cmd_args: Command-line arguments of `generate.py`
+
+    Returns:
+        Wall-clock time and peak RSS of this process and the worker processes
+    """
+    start = time.perf_counter()
+    from aspen.bin.generate import main
+
+    main(cmd_args)
+    wall = time.perf_counter() - start
+    return {
+        "wall": wall,
+        "peak_rss": peak_rss(resource.RUSAGE_SELF),
+        "peak_rss_workers": peak_rss(resource.RUSAGE_CHILDREN),
+    }
+
+
+def run_generate(cmd_args: List[str]) -> dict:
+    """Run `generate.py` in a fresh interpreter so that the peak RSS is not shared
+
+    Args:
+        cmd_args: Command-line arguments of `generate.py`
+
+    Returns:
+        Return value of `run_worker`
+    """
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(cmd_args)],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def main(cmd_args):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recipes", nargs="*", help="Recipes in egs/conf (e.g. continuity). Defaults to all.")
+    parser.add_argument("--num-utterances", default=100, type=int, help="Number of utterances of the corpus")
+    parser.add_argument(
+        "--distribution",
+        default="lognormal",
+        choices=["lognormal", "uniform"],
+        help="Distribution of the durations of utterances",
+    )
+    parser.add_argument("--mean-duration", default=4.0, type=float, help="Median duration of lognormal [s]")
+    parser.add_argument("--sigma", default=0.5, type=float, help="Standard deviation of log duration of lognormal")
+    parser.add_argument("--min-duration", default=0.5, type=float, help="Minimum duration [s]")
+    parser.add_argument("--max-duration", default=30.0, type=float, help="Maximum duration [s]")
+    parser.add_argument("--seed", default=0, type=int, help="Random seed of the corpus and generation")
+    parser.add_argument("--nj", default=[1, 2, 4], type=int, nargs="+", help="Numbers of worker processes")
+    parser.add_argument("--visualize", action="store_true", help="Keep the visualization of the recipes")
+    parser.add_argument("--corpus-dir", default=None, type=str, help="Directory of the corpus (reused if exists)")
+    parser.add_argument("--output", default=None, type=str, help="Path of the JSON result")
+    parser.add_argument("--worker", default=None, type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args(cmd_args)
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return
+
+    from aspen.bin.generate import parse_args
+
+    workdir = tempfile.mkdtemp(prefix="aspen_bench_corpus_")
+    corpus_root = args.corpus_dir or os.path.join(workdir, "corpus")
+    results = {}
+    try:
+        for recipe in args.recipes or list_recipes():
+            conf = os.path.join(CONF_DIR, recipe + ".conf")
+            recipe_args = parse_args(["--conf", conf])
+            # corpus at the sampling frequency of the recipe
+            corpus_dir = os.path.join(corpus_root, str(recipe_args.samp_freq))
+            info_path = os.path.join(corpus_dir, "info.json")
+            if os.path.exists(info_path):
+                with open(info_path) as f:
+                    audio_sec = json.load(f)["audio_sec"]
+            else:
+                audio_sec = synthesize_corpus(corpus_dir, args, recipe_args.samp_freq)
+                with open(info_path, "w") as f:
+                    json.dump({"audio_sec": audio_sec}, f)
+
+            generate_args = ["--conf", conf, "--seed", str(args.seed)]
+            if "colored_noise" in recipe_args.sound_generation_pipeline:
+                # the noise must cover the longest utterance
+                generate_args += ["--colored-noise-duration", str(args.max_duration * 1000)]
+            if not args.visualize:
+                generate_args += ["--visualization-pipeline"]
+
+            results[recipe] = {}
+            for nj in args.nj:
+                outdir = os.path.join(workdir, "out", recipe, str(nj))
+                nj_args = generate_args + [
+                    "--outdir",
+                    outdir,
+                    "--visualization-outdir",
+                    os.path.join(outdir, "vis"),
+                    "--nj",
+                    str(nj),
+                ]
+                # the startup (e.g. imports in the main and worker processes) is measured
+                # with a short utterance for each worker
+                warmup_list = os.path.join(workdir, "warmup.list")
+                with open(warmup_list, "w") as f:
+                    f.write((os.path.join(corpus_dir, "warmup.wav") + "\n") * nj)
+                startup = run_generate(nj_args + ["--wavlist", warmup_list])
+                result = run_generate(nj_args + ["--wavlist", os.path.join(corpus_dir, "wav.list")])
+                shutil.rmtree(outdir, ignore_errors=True)
+                result["startup"] = startup["wall"]
+                # throughput of the wall-clock time and in the steady state
+                result["wall_utterances_per_sec"] = args.num_utterances / result["wall"]
+                result["wall_real_time_factor"] = audio_sec / result["wall"]
+                processing = result["wall"] - result["startup"]
+                if processing <= (1 - MAX_STARTUP_SHARE) * result["wall"]:
+                    sys.stderr.write(
+                        "Warning: {} --nj {}: the startup ({:.2f} s) is more than {:.0f}% of the wall-clock time "
+                        "({:.2f} s), so the throughput excluding the startup is not reported. "
+                        "Use more or longer utterances.\n".format(
+                            recipe, nj, result["startup"], 100 * MAX_STARTUP_SHARE, result["wall"]
+                        )
+                    )
+                    result["utterances_per_sec"] = None
+                    result["real_time_factor"] = None
+                else:
+                    result["utterances_per_sec"] = args.num_utterances / processing
+                    result["real_time_factor"] = audio_sec / processing
+                base = results[recipe].get(str(args.nj[0]))
+                # the speedup of the throughput excluding the startup if available, otherwise of the wall-clock time
+                key = "utterances_per_sec"
+                if result[key] is None or (base is not None and base[key] is None):
+                    key = "wall_utterances_per_sec"
+                result["speedup"] = 1.0 if base is None else result[key] / base[key]
+                results[recipe][str(nj)] = result
+                steady = [
+                    "n/a" if result[k] is None else "{:.2f}".format(result[k])
+                    for k in ["utterances_per_sec", "real_time_factor"]
+                ]
+                print(
+                    "{} --nj {}: {:.1f} s (startup {:.1f} s), {:.2f} utt/s and RTF {:.1f} (wall-clock), "
+                    "{} utt/s and RTF {} (excluding startup), "
+                    "peak RSS {:.0f} MB (workers {:.0f} MB), speedup {:.2f}x".format(
+                        recipe,
+                        nj,
+                        result["wall"],
+                        result["startup"],
+                        result["wall_utterances_per_sec"],
+                        result["wall_real_time_factor"],
+                        steady[0],
+                        steady[1],
+                        result["peak_rss"] / 2**20,
+                        result["peak_rss_workers"] / 2**20,
+                        result["speedup"],
+                    )
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Benchmark of the FFT of the signals with adversarial lengths
+
+The real FFT round trip (`rfft` and `irfft`) and the Hilbert transform are timed on the original length
+(as `numpy.fft` and `scipy.signal.hilbert` do) and on the fast length of `aspen.utils.fft_utils`
+for the lengths which are primes, twice primes and products of small primes around the given durations.
+
+Usage:
+    python benchmarks/bench_fft.py [--durations 1 10 60] [--samp-freq 16000] [--repeat 3] [--output fft.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+from scipy import signal
+
+from aspen.utils.fft_utils import fast_length, hilbert, irfft, rfft
+
+
+def is_prime(n: int) -> bool:
+    if n < 2:
+        return False
+    return all(n % d != 0 for d in range(2, int(n**0.5) + 1))
+
+
+def adversarial_lengths(length: int) -> Dict[str, int]:
+    """Return the prime, twice a prime and fast lengths not shorter than the given length"""
+    prime = length
+    while not is_prime(prime):
+        prime += 1
+    half = length // 2
+    while not is_prime(half):
+        half += 1
+    return {"prime": prime, "twice_prime": 2 * half, "fast": fast_length(length)}
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Return the minimum execution time [s] of the function"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(cmd_args):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", default=[1, 10, 60], type=float, nargs="+", help="Durations of input [s]")
+    parser.add_argument("--samp-freq", default=16000, type=int, help="Sampling frequency")
+    parser.add_argument("--repeat", default=3, type=int, help="Number of runs of each case")
+    parser.add_argument("--output", default=None, type=str, help="Path of the JSON result")
+    args = parser.parse_args(cmd_args)
+
+    rng = np.random.RandomState(0)
+    results: List[dict] = []
+    for duration in args.durations:
+        for kind, length in adversarial_lengths(int(duration * args.samp_freq)).items():
+            x = rng.normal(size=[length])
+            cases = {
+                "rfft_irfft": (
+                    lambda: np.fft.irfft(np.fft.rfft(x), length),
+                    lambda: irfft(rfft(x), length),
+                ),
+                "hilbert": (lambda: signal.hilbert(x), lambda: hilbert(x)),
+            }
+            for name, (original, padded) in cases.items():
+                result = {
+                    "duration": duration,
+                    "kind": kind,
+                    "length": length,
+                    "fast_length": fast_length(length),
+                    "transform": name,
+                    "original": measure(original, args.repeat),
+                    "padded": measure(padded, args.repeat),
+                }
+                result["speedup"] = result["original"] / result["padded"]
+                results.append(result)
+                print(
+                    "{:<10} {:>6.1f} s {:<12} length {:>8} -> {:>8}: {:>9.4f} s -> {:>9.4f} s ({:.1f}x)".format(
+                        name,
+                        duration,
+                        kind,
+                        length,
+                        result["fast_length"],
+                        result["original"],
+                        result["padded"],
+                        result["speedup"],
+                    )
+                )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
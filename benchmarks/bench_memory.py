@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Benchmark of the peak memory usage to generate a stimulus from one input
+
+Each configuration is measured in a fresh interpreter.
+The input signal is allocated and the pipeline is warmed up with a short input before the measurement,
+and the increase of peak RSS (and of the peak traced by tracemalloc) while generating the stimulus
+from the input is reported relative to the size of the input signal.
+
+Usage:
+    python benchmarks/bench_memory.py [--duration 30] [--output memory.json] [config ...]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+
+CONF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "egs", "conf")
+
+# name and generate.py arguments of each configuration.
+# `{duration_ms}` is replaced by the duration of input signal so that the noise covers the input.
+CONFIGS = {
+    "identity": ["--stimulus-module", "identity", "--postprocess-pipeline", "declip"],
+    "continuity": [
+        "--conf",
+        os.path.join(CONF_DIR, "continuity.conf"),
+        "--colored-noise-duration",
+        "{duration_ms}",
+    ],
+    "noise_vocoded_speech": [
+        "--conf",
+        os.path.join(CONF_DIR, "noise_vocoded_speech_rect.conf"),
+        "--colored-noise-duration",
+        "{duration_ms}",
+    ],
+    "locally_time_reversed_speech": ["--conf", os.path.join(CONF_DIR, "locally_time_reversed_speech.conf")],
+}
+
+
+def peak_rss() -> int:
+    """Return the peak RSS of this process [byte]"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def measure(name: str, duration: float) -> dict:
+    """Measure the peak memory usage of the configuration in this process
+
+    Args:
+        name: Name of configuration
+        duration: Duration of input signal in second
+
+    Returns:
+        Peak memory usage [byte] and its ratio to the size of input signal
+    """
+    from aspen.bin.generate import build_executors, generate_utterance, parse_args
+
+    cmd_args = [arg.format(duration_ms=duration * 1000) for arg in CONFIGS[name]]
+    cmd_args += ["--outdir", ".", "--seed", "0", "--visualization-pipeline"]
+    args = parse_args(cmd_args)
+    executors = build_executors(args)
+
+    def run(t):
+        x = np.sin(2 * np.pi * 440 * np.arange(t) / args.samp_freq).astype(args.dtype)
+        return x, lambda: generate_utterance(args, executors, "bench", args.samp_freq, x)
+
+    # warm-up (e.g. imports and filter design) with a short input
+    _, warmup = run(args.samp_freq)
+    warmup()
+
+    x, generate = run(int(duration * args.samp_freq))
+    baseline = peak_rss()
+    tracemalloc.start()
+    generate()
+    _, traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = max(peak_rss() - baseline, 0)
+    return {
+        "signal_mb": x.nbytes / 2**20,
+        "peak_rss_mb": rss / 2**20,
+        "peak_rss_ratio": rss / x.nbytes,
+        "peak_traced_mb": traced / 2**20,
+        "peak_traced_ratio": traced / x.nbytes,
+    }
+
+
+def main(cmd_args):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("configs", nargs="*", choices=[[]] + list(CONFIGS), help="Configurations to be measured")
+    parser.add_argument("--duration", default=30.0, type=float, help="Duration of input signal in second")
+    parser.add_argument("--output", default=None, type=str, help="Path of the JSON result")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(cmd_args)
+
+    if args.worker:
+        print(json.dumps(measure(args.configs[0], args.duration)))
+        return
+
+    results = {}
+    for name in args.configs or list(CONFIGS):
+        # fresh interpreter for each configuration so that the peak RSS is not shared
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--duration", str(args.duration), name],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        results[name] = json.loads(proc.stdout.splitlines()[-1])
+        print(
+            "{}: signal {:.1f} MB, peak RSS +{:.1f} MB ({:.2f}x), traced peak {:.1f} MB ({:.2f}x)".format(
+                name,
+                results[name]["signal_mb"],
+                results[name]["peak_rss_mb"],
+                results[name]["peak_rss_ratio"],
+                results[name]["peak_traced_mb"],
+                results[name]["peak_traced_ratio"],
+            )
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
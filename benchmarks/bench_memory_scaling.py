@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Benchmark of the memory footprint of each stimulus and processing against the input length
+
+Each component is run with the default parameters (see `bench_components.py`) for several input lengths,
+and the peak of the memory allocated during the call (traced by tracemalloc, excluding the input itself)
+is fitted by a line. The slope is the footprint per input sample (e.g. 8 bytes per sample
+is one float64 copy of the input), which reveals hidden O(N) copies regardless of the constant overhead.
+The run fails (exit status 1) if the slope of any component exceeds its budget.
+
+Usage:
+    python benchmarks/bench_memory_scaling.py [--durations 1 2 4 8] [--samp-freq 16000] [--output scaling.json]
+        [component ...]
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+
+import numpy as np
+
+from bench_components import build_case, list_components
+
+# default budget of the footprint [bytes per input sample] (i.e. four float64 copies of the input)
+DEFAULT_BUDGET = 32.0
+
+# budgets of the components whose output or intermediate representation is inherently larger
+BUDGETS = {
+    # the output is the repetition of the input (20 times by default)
+    "stimuli/verbal_transformation": 8 * 20 + 8,
+    # spectrogram (about 10 complex values per input sample at 1 kHz frame rate) and its temporaries
+    "stimuli/modulation_filtered_speech": 1300.0,
+    # envelopes of all bands (4 by default) of the filterbank and the output
+    "stimuli/noise_vocoded_speech": 8 * 4 + 16,
+    "processings/modulation_power_spectrum": 1200.0,
+}
+
+# components which take no signal proportional to the input length
+EXCLUDED = ["stimuli/auditory_streaming"]
+
+
+def footprint(component: str, duration: float, samp_freq: int) -> int:
+    """Return the peak memory [byte] allocated during one call of the component"""
+    run = build_case(component, duration, samp_freq)
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    y = run()
+    _, peak = tracemalloc.get_traced_memory()
+    del y
+    return peak - start
+
+
+def main(cmd_args) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "components",
+        nargs="*",
+        help="Components to be measured (e.g. stimuli/continuity or processings). "
+        "Defaults to all stimuli and processings.",
+    )
+    parser.add_argument("--durations", default=[1, 2, 4, 8], type=float, nargs="+", help="Durations of input [s]")
+    parser.add_argument("--samp-freq", default=16000, type=int, help="Sampling frequency")
+    parser.add_argument("--output", default=None, type=str, help="Path of the JSON result")
+    args = parser.parse_args(cmd_args)
+    if len(args.durations) < 2:
+        raise ValueError("at least 2 durations are required to fit the slope")
+
+    components = [
+        c
+        for c in list_components()
+        if c.split("/")[0] in ["stimuli", "processings"]
+        and c not in EXCLUDED
+        and (len(args.components) == 0 or c in args.components or c.split("/")[0] in args.components)
+    ]
+
+    tracemalloc.start()
+    results = {}
+    over_budget = []
+    for component in components:
+        # warm-up (e.g. imports and filter design) with a short input
+        build_case(component, 1, args.samp_freq)()
+        lengths = [int(d * args.samp_freq) for d in args.durations]
+        peaks = [footprint(component, d, args.samp_freq) for d in args.durations]
+        slope, intercept = np.polyfit(lengths, peaks, 1)
+        budget = BUDGETS.get(component, DEFAULT_BUDGET)
+        results[component] = {
+            "lengths": lengths,
+            "peaks": peaks,
+            "bytes_per_sample": slope,
+            "intercept": intercept,
+            "budget": budget,
+        }
+        mark = ""
+        if slope > budget:
+            over_budget.append(component)
+            mark = "  OVER BUDGET"
+        print(
+            "{:<48} {:>8.1f} bytes/sample (budget {:.0f}), constant {:>8.1f} MB{}".format(
+                component, slope, budget, intercept / 2**20, mark
+            )
+        )
+    tracemalloc.stop()
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if len(over_budget) > 0:
+        print("{} components exceed the budget: {}".format(len(over_budget), ", ".join(over_budget)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
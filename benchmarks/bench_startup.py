@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""Benchmark of the startup time of the entry points
+
+The import time of each entry point is measured with `python -X importtime`
+in a fresh interpreter, and the slowest modules are reported.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--top 10] [--output startup.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS = ["aspen.bin.generate", "aspen.bin.visualize"]
+
+# modules that must not be imported at startup of the entry points
+HEAVY_MODULES = ["matplotlib", "librosa", "sounddevice", "soundfile", "distutils", "scipy.signal"]
+
+
+def importtime(module: str) -> Tuple[Dict[str, int], List[str]]:
+    """Import the module in a fresh interpreter with `-X importtime`
+
+    Args:
+        module: Module name to be imported
+
+    Returns:
+        Mapping from a module name to its cumulative import time [us]
+        and the list of the heavy modules loaded by the import
+    """
+    code = "import sys, {}; print(' '.join(m for m in {} if m in sys.modules))".format(
+        module, HEAVY_MODULES
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cum)
+    return cumulative, proc.stdout.split()
+
+
+def main(cmd_args):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", default=5, type=int, help="Number of measurements for each entry point")
+    parser.add_argument("--top", default=10, type=int, help="Number of the slowest modules to be reported")
+    parser.add_argument("--output", default=None, type=str, help="Path of the JSON result")
+    args = parser.parse_args(cmd_args)
+
+    results = {}
+    for module in ENTRY_POINTS:
+        totals = []
+        for _ in range(args.repeat):
+            cumulative, heavy = importtime(module)
+            totals.append(cumulative[module])
+        top = sorted(
+            [(k, v) for k, v in cumulative.items() if k != module], key=lambda kv: kv[1], reverse=True
+        )[: args.top]
+        results[module] = {
+            "median_ms": statistics.median(totals) / 1000,
+            "min_ms": min(totals) / 1000,
+            "heavy_modules": heavy,
+            "slowest_modules_ms": {k: v / 1000 for k, v in top},
+        }
+        print(
+            "{}: median {:.1f} ms, min {:.1f} ms".format(
+                module, results[module]["median_ms"], results[module]["min_ms"]
+            )
+        )
+        if len(heavy) > 0:
+            print("  WARNING: heavy modules are imported at startup: {}".format(", ".join(heavy)))
+        for k, v in top:
+            print("  {:>8.1f} ms  {}".format(v / 1000, k))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
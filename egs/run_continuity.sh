@@ -5,6 +5,7 @@
 stage=1
 stop_stage=100
 verbose=0
+nj=1
 
 wavlist=$1
 
@@ -22,6 +23,7 @@ if [ ${stage} -le 1 ] && [ ${stop_stage} -ge 1 ]; then
                 generate.py \
                     --verbose ${verbose} \
                     --wavlist ${wavlist} \
+                    --nj ${nj} \
                     --suffix ${gap_method}_target${gap}ms_gap${gap}ms_snr-${snr} \
                     --gap-method ${gap_method} \
                     --target-duration ${gap} \
@@ -5,6 +5,7 @@
 stage=1
 stop_stage=100
 verbose=0
+nj=1
 
 wavlist=$1
 
@@ -22,6 +23,7 @@ if [ ${stage} -le 1 ] && [ ${stop_stage} -ge 1 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix duration${duration} \
             --reverse-duration ${duration} \
             --config conf/locally_time_reversed_speech.conf
@@ -34,6 +36,7 @@ if [ ${stage} -le 2 ] && [ ${stop_stage} -ge 2 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix duration${duration}_randomize \
             --reverse-duration ${duration} \
             --randomize true \
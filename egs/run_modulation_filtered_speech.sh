@@ -5,6 +5,7 @@
 stage=1
 stop_stage=100
 verbose=0
+nj=1
 
 wavlist=$1
 
@@ -31,6 +32,7 @@ if [ ${stage} -le 1 ] && [ ${stop_stage} -ge 1 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix temp${temporal_stopband}_spec${spectral_stopband} \
             --temporal-stopbands ${temporal_stopband} \
             --spectral-stopbands ${spectral_stopband} \
@@ -47,6 +49,7 @@ if [ ${stage} -le 2 ] && [ ${stop_stage} -ge 2 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix temp${temporal_stopband}_spec${spectral_stopband} \
             --temporal-stopbands ${temporal_stopband} \
             --spectral-stopbands ${spectral_stopband} \
@@ -64,6 +67,7 @@ if [ ${stage} -le 3 ] && [ ${stop_stage} -ge 3 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix temp${temporal_stopband}_spec${notch_stopband} \
             --temporal-stopbands ${temporal_stopband} \
             --spectral-stopbands ${notch_stopband} \
@@ -73,6 +77,7 @@ if [ ${stage} -le 3 ] && [ ${stop_stage} -ge 3 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix temp${notch_stopband}_spec${spectral_stopband} \
             --temporal-stopbands ${notch_stopband} \
             --spectral-stopbands ${spectral_stopband} \
@@ -85,6 +90,7 @@ if [ ${stage} -le 4 ] && [ ${stop_stage} -ge 4 ]; then
     generate.py \
         --verbose ${verbose} \
         --wavlist ${wavlist} \
+        --nj ${nj} \
         --suffix core \
         --temporal-stopbands 7.75_${max_temporal_modulation} \
         --spectral-stopbands 3.75_${max_spectral_modulation} \
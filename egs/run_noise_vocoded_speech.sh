@@ -5,6 +5,7 @@
 stage=1
 stop_stage=100
 verbose=0
+nj=1
 
 wavlist=$1
 
@@ -22,6 +23,7 @@ if [ ${stage} -le 1 ] && [ ${stop_stage} -ge 1 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix octave_rect_band${band} \
             --num-freqband ${band} \
             --config conf/noise_vocoded_speech_rect.conf
@@ -34,6 +36,7 @@ if [ ${stage} -le 2 ] && [ ${stop_stage} -ge 2 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix octave_hilbert_band${band} \
             --num-freqband ${band} \
             --config conf/noise_vocoded_speech_hilbert.conf
@@ -46,6 +49,7 @@ if [ ${stage} -le 3 ] && [ ${stop_stage} -ge 3 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix user_rect_band${band} \
             --num-freqband ${band} \
             --config conf/noise_vocoded_speech_user.conf
@@ -58,6 +62,7 @@ if [ ${stage} -le 4 ] && [ ${stop_stage} -ge 4 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix erb_rect_band${band} \
             --freqband-scale-method erb \
             --freqband-limit "0_8000" \
@@ -74,6 +79,7 @@ if [ ${stage} -le 5 ] && [ ${stop_stage} -ge 5 ]; then
         generate.py \
             --verbose ${verbose} \
             --wavlist ${wavlist} \
+            --nj ${nj} \
             --suffix erb_rect_band${band}_step2 \
             --freqband-scale-method erb \
             --freqband-limit "0_8000" \
@@ -5,6 +5,7 @@
 stage=1
 stop_stage=100
 verbose=0
+nj=1
 
 wavlist=$1
 
@@ -20,6 +21,7 @@ if [ ${stage} -le 1 ] && [ ${stop_stage} -ge 1 ]; then
     generate.py \
         --verbose ${verbose} \
         --wavlist ${wavlist} \
+        --nj ${nj} \
         --config conf/verbal_transformation.conf
 fi
 
@@ -41,6 +41,7 @@ extras_require = {
         "sphinxcontrib-katex",
     ],
     "tests": ["pytest", "pytest-cov", "flake8", "mypy", "black"],
+    "fft": ["pyfftw"],
 }
 
 setup(
@@ -1,9 +1,16 @@
 import argparse
+import json
+import subprocess
+import sys
 
+import numpy as np
 import pytest
+import soundfile as sf
 
 from aspen.bin.generate import get_parser, main
 
+WAVPATH = "./tests/helpers/pure_tone_440hz_1000ms_sf16000.wav\n./tests/helpers/pure_tone_1000hz_1000ms_sf16000.wav"
+
 
 def test_get_parser():
     assert isinstance(get_parser(), argparse.ArgumentParser)
@@ -12,3 +19,259 @@ def test_get_parser():
 def test_main_null_cmd_args():
     with pytest.raises(SystemExit):
         main("")
+
+
+def test_lazy_import():
+    # heavy modules must not be imported until they are required
+    code = "import sys, aspen.bin.generate; print(' '.join(sorted(sys.modules)))"
+    modules = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True).split()
+    for m in ["matplotlib", "librosa", "sounddevice", "soundfile", "distutils", "scipy.signal"]:
+        assert m not in modules
+
+
+def test_main_parallel(tmp_path):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = [
+        "--stimulus-module",
+        "continuity",
+        "--sound-generation-pipeline",
+        "colored_noise",
+        "--wavlist",
+        str(wavlist),
+        "--seed",
+        "0",
+    ]
+    main(cmd_args + ["--outdir", str(tmp_path / "nj1")])
+    main(cmd_args + ["--outdir", str(tmp_path / "nj2"), "--nj", "2"])
+    for wav in ["pure_tone_440hz_1000ms_sf16000", "pure_tone_1000hz_1000ms_sf16000"]:
+        y1, _ = sf.read(str(tmp_path / "nj1" / (wav + ".wav")))
+        y2, _ = sf.read(str(tmp_path / "nj2" / (wav + ".wav")))
+        np.testing.assert_array_equal(y1, y2)
+
+
+def test_main_overlapped_io(tmp_path):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = [
+        "--stimulus-module",
+        "continuity",
+        "--sound-generation-pipeline",
+        "colored_noise",
+        "--wavlist",
+        str(wavlist),
+        "--seed",
+        "0",
+    ]
+    main(cmd_args + ["--outdir", str(tmp_path / "sync"), "--num-prefetch", "0", "--write-queue-mb", "0"])
+    main(cmd_args + ["--outdir", str(tmp_path / "overlap"), "--num-prefetch", "4", "--write-queue-mb", "0.01"])
+    for wav in ["pure_tone_440hz_1000ms_sf16000", "pure_tone_1000hz_1000ms_sf16000"]:
+        y1, _ = sf.read(str(tmp_path / "sync" / (wav + ".wav")))
+        y2, _ = sf.read(str(tmp_path / "overlap" / (wav + ".wav")))
+        np.testing.assert_array_equal(y1, y2)
+    with pytest.raises(ValueError):
+        main(cmd_args + ["--outdir", str(tmp_path), "--num-prefetch", "-1"])
+
+
+def test_main_profile(tmp_path, capsys):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    profile = tmp_path / "profile.jsonl"
+    cmd_args = [
+        "--stimulus-module",
+        "continuity",
+        "--sound-generation-pipeline",
+        "colored_noise",
+        "--postprocess-pipeline",
+        "declip",
+        "--wavlist",
+        str(wavlist),
+        "--outdir",
+        str(tmp_path),
+        "--profile",
+        str(profile),
+    ]
+    for nj in ["1", "2"]:
+        main(cmd_args + ["--nj", nj])
+        with open(str(profile)) as f:
+            records = [json.loads(line) for line in f]
+        stages = set(r["stage"] for r in records)
+        for stage in ["read", "sounds/ColoredNoise", "stimulus", "postprocess/Declip", "write", "utterance"]:
+            assert stage in stages
+        assert sum(r.get("audio_sec", 0) for r in records) == 2.0
+        # the FFTs of colored noise (also in the workers) are counted
+        assert "rfft" in capsys.readouterr().err
+
+    main(cmd_args + ["--memory-profile"])
+    with open(str(profile)) as f:
+        records = [json.loads(line) for line in f]
+    assert all("alloc_peak" in r for r in records if r["stage"] == "stimulus")
+
+
+def test_main_wav_cache(tmp_path):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = [
+        "--stimulus-module",
+        "continuity",
+        "--sound-generation-pipeline",
+        "colored_noise",
+        "--wavlist",
+        str(wavlist),
+        "--seed",
+        "0",
+    ]
+    main(cmd_args + ["--outdir", str(tmp_path / "nocache")])
+    # 1st run stores the cache and 2nd run reads it
+    for outdir in ["cache1", "cache2"]:
+        main(cmd_args + ["--outdir", str(tmp_path / outdir), "--wav-cache-dir", str(tmp_path / "cache")])
+    for wav in ["pure_tone_440hz_1000ms_sf16000", "pure_tone_1000hz_1000ms_sf16000"]:
+        y, _ = sf.read(str(tmp_path / "nocache" / (wav + ".wav")))
+        for outdir in ["cache1", "cache2"]:
+            np.testing.assert_array_equal(y, sf.read(str(tmp_path / outdir / (wav + ".wav")))[0])
+
+
+@pytest.mark.parametrize(
+    "cmd_args",
+    [
+        ["--stimulus-module", "continuity", "--sound-generation-pipeline", "colored_noise"],
+        ["--stimulus-module", "continuity", "--gap-method", "silent"],
+        ["--stimulus-module", "locally_time_reversed_speech", "--reverse-duration", "30"],
+        ["--stimulus-module", "verbal_transformation", "--num-iteration", "3", "--equalize-inout-duration", "false"],
+        [
+            "--stimulus-module",
+            "verbal_transformation",
+            "--num-iteration",
+            "3",
+            "--postprocess-pipeline",
+            "filter_signal",
+            "--filter-signal-btype",
+            "lowpass",
+            "--filter-signal-filter-freq",
+            "440",
+        ],
+        [
+            "--stimulus-module",
+            "continuity",
+            "--gap-method",
+            "silent",
+            "--postprocess-pipeline",
+            "filter_signal",
+            "--filter-signal-btype",
+            "lowpass",
+            "--filter-signal-filter-freq",
+            "440",
+            "--filter-signal-impulse-response",
+            "iir",
+        ],
+    ],
+)
+def test_main_block(tmp_path, cmd_args):
+    # the cutoff frequency of filter is set so that the output is not saturated (i.e. declip is not applied)
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = cmd_args + ["--wavlist", str(wavlist), "--seed", "0"]
+    main(cmd_args + ["--outdir", str(tmp_path / "whole")])
+    main(cmd_args + ["--outdir", str(tmp_path / "block"), "--block-size", "3000"])
+    for wav in ["pure_tone_440hz_1000ms_sf16000", "pure_tone_1000hz_1000ms_sf16000"]:
+        y1, _ = sf.read(str(tmp_path / "whole" / (wav + ".wav")), dtype="int16")
+        y2, _ = sf.read(str(tmp_path / "block" / (wav + ".wav")), dtype="int16")
+        assert y1.shape == y2.shape
+        # rounding of the float difference may change the least significant bit
+        np.testing.assert_allclose(y1, y2, atol=1)
+
+
+@pytest.mark.parametrize("block_size", ["160000", "3000"])
+def test_main_block_conf(tmp_path, block_size):
+    # the example of documentation, where declip of the configuration is replaced by the clipping
+    wavlist = tmp_path / "wavlist.txt"
+    wavlist.write_text(WAVPATH)
+    cmd_args = ["--conf", "egs/conf/locally_time_reversed_speech.conf", "--wavlist", str(wavlist)]
+    main(cmd_args + ["--visualization-pipeline", "--outdir", str(tmp_path / "whole")])
+    main(cmd_args + ["--block-size", block_size, "--visualization-pipeline", "--outdir", str(tmp_path / "block")])
+    for wav in ["pure_tone_440hz_1000ms_sf16000", "pure_tone_1000hz_1000ms_sf16000"]:
+        y1, _ = sf.read(str(tmp_path / "whole" / (wav + "_duration25.wav")), dtype="int16")
+        y2, _ = sf.read(str(tmp_path / "block" / (wav + "_duration25.wav")), dtype="int16")
+        np.testing.assert_array_equal(y1, y2)
+
+
+def test_main_block_invalid(tmp_path):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = ["--wavlist", str(wavlist), "--outdir", str(tmp_path), "--block-size", "3000"]
+    with pytest.raises(ValueError):
+        main(cmd_args + ["--stimulus-module", "identity"])
+    with pytest.raises(ValueError):
+        main(cmd_args + ["--stimulus-module", "verbal_transformation", "--postprocess-pipeline", "normalize"])
+    with pytest.raises(ValueError):
+        main(cmd_args + ["--stimulus-module", "verbal_transformation", "--nj", "2"])
+    with pytest.raises(ValueError):
+        main(["--stimulus-module", "verbal_transformation", "--outdir", str(tmp_path), "--block-size", "3000"])
+
+
+@pytest.mark.parametrize(
+    "cmd_args",
+    [
+        ["--stimulus-module", "continuity", "--sound-generation-pipeline", "colored_noise"],
+        ["--stimulus-module", "noise_vocoded_speech", "--sound-generation-pipeline", "colored_noise"],
+        ["--stimulus-module", "locally_time_reversed_speech", "--reverse-duration", "30"],
+        [
+            "--stimulus-module",
+            "continuity",
+            "--gap-method",
+            "silent",
+            "--postprocess-pipeline",
+            "filter_signal",
+            "--filter-signal-btype",
+            "lowpass",
+            "--filter-signal-filter-freq",
+            "440",
+        ],
+    ],
+)
+def test_main_dtype(tmp_path, cmd_args):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = cmd_args + ["--wavlist", str(wavlist), "--seed", "0"]
+    main(cmd_args + ["--outdir", str(tmp_path / "float64")])
+    main(cmd_args + ["--outdir", str(tmp_path / "float32"), "--dtype", "float32"])
+    for wav in ["pure_tone_440hz_1000ms_sf16000", "pure_tone_1000hz_1000ms_sf16000"]:
+        y64, _ = sf.read(str(tmp_path / "float64" / (wav + ".wav")), dtype="int16")
+        y32, _ = sf.read(str(tmp_path / "float32" / (wav + ".wav")), dtype="int16")
+        # deviation of float32 is within the least significant bit of int16
+        np.testing.assert_allclose(y32, y64, atol=1)
+
+
+def test_main_invalid_nj(tmp_path):
+    with pytest.raises(ValueError):
+        main(["--stimulus-module", "identity", "--outdir", str(tmp_path), "--nj", "0"])
+
+
+def test_main_sweep(tmp_path):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH)
+    cmd_args = [
+        "--stimulus-module",
+        "continuity",
+        "--sound-generation-pipeline",
+        "colored_noise",
+        "--wavlist",
+        str(wavlist),
+        "--seed",
+        "0",
+        "--suffix",
+        "cnt",
+    ]
+    config = tmp_path / "sweep.conf"
+    config.write_text("sweep:\n  gap-method: [replace, silent]\n  target-snr: [0, -10]\n")
+    main(cmd_args + ["--outdir", str(tmp_path / "sweep"), "--config", str(config)])
+    main(
+        cmd_args
+        + ["--outdir", str(tmp_path / "single"), "--gap-method", "silent", "--target-snr=-10"]
+    )
+    outfiles = sorted([p.name for p in (tmp_path / "sweep").iterdir()])
+    assert len(outfiles) == 8
+    wav = "pure_tone_440hz_1000ms_sf16000"
+    y1, _ = sf.read(str(tmp_path / "sweep" / (wav + "_cnt_gap-method-silent_target-snr--10.wav")))
+    y2, _ = sf.read(str(tmp_path / "single" / (wav + "_cnt.wav")))
+    np.testing.assert_array_equal(y1, y2)
@@ -1,4 +1,6 @@
 import argparse
+import subprocess
+import sys
 
 import pytest
 
@@ -12,3 +14,11 @@ def test_get_parser():
 def test_main_null_cmd_args():
     with pytest.raises(ValueError):
         main("")
+
+
+def test_lazy_import():
+    # matplotlib must not be imported until a visualization is actually drawn
+    code = "import sys, aspen.bin.visualize; print(' '.join(sorted(sys.modules)))"
+    modules = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True).split()
+    for m in ["matplotlib", "librosa", "sounddevice"]:
+        assert m not in modules
@@ -1,5 +1,7 @@
 import argparse
 
+import numpy as np
+
 from aspen.executors.processing_applier import PROCESSINGS, ProcessingApplier
 
 
@@ -21,3 +23,52 @@ def test_arguments():
     assert len(pipeline) == len(PROCESSINGS)
     pipeline_module = [i.__class__.__module__.split(".")[-1] for i in pipeline]
     assert pipeline_module == PROCESSINGS
+
+
+def test_readonly_input():
+    parser = argparse.ArgumentParser()
+    ProcessingApplier.add_arguments(parser)
+    cmd_args = [
+        "--postprocess-pipeline",
+        "declip",
+        "apply_ramp",
+        "normalize",
+        "--apply-ramp-duration",
+        "10",
+    ]
+    args, _ = parser.parse_known_args(cmd_args)
+    ProcessingApplier.processing_add_arguments(parser, args)
+    args = parser.parse_args(cmd_args)
+    postprocessings = ProcessingApplier(args)
+
+    t = np.arange(0, 16000) / 16000
+    x = np.sin(2 * np.pi * 440 * t, dtype=np.float64)
+    expected = x.copy()
+    for proc in postprocessings.show_pipeline():
+        expected = proc(expected)
+    # declip returns the input itself, and the others work in-place on the copy made by apply_ramp
+    x.flags.writeable = False
+    np.testing.assert_array_equal(postprocessings(x), expected)
+
+
+def test_multichannel():
+    parser = argparse.ArgumentParser()
+    ProcessingApplier.add_arguments(parser)
+    cmd_args = ["--postprocess-pipeline"] + PROCESSINGS + [
+        "--filter-signal-btype",
+        "lowpass",
+        "--filter-signal-filter-freq",
+        "500",
+        "--apply-ramp-duration",
+        "10",
+    ]
+    args, _ = parser.parse_known_args(cmd_args)
+    ProcessingApplier.processing_add_arguments(parser, args)
+    args = parser.parse_args(cmd_args)
+    postprocessings = ProcessingApplier(args)
+
+    t = np.arange(0, 16000) / 16000
+    x = np.stack([np.sin(2 * np.pi * 440 * t), 0.5 * np.sin(2 * np.pi * 1000 * t)], axis=1)
+    # each channel is processed independently as mono signal
+    expected = np.stack([postprocessings(x[:, i].copy()) for i in range(x.shape[1])], axis=1)
+    np.testing.assert_allclose(postprocessings(x), expected, rtol=1e-10, atol=1e-12)
@@ -1,5 +1,8 @@
 import argparse
 
+import numpy as np
+import pytest
+
 from aspen.executors.sound_generator import SOUNDS, SoundGenerator
 
 
@@ -16,3 +19,40 @@ def test_arguments():
     assert len(pipeline) == len(SOUNDS)
     pipeline_module = [i.__class__.__module__.split(".")[-1] for i in pipeline]
     assert pipeline_module == SOUNDS
+
+
+def test_sound_cache():
+    parser = argparse.ArgumentParser()
+    SoundGenerator.add_arguments(parser)
+    args, _ = parser.parse_known_args(["--sound-generation-pipeline", "pure_tone", "colored_noise"])
+    SoundGenerator.sound_add_arguments(parser, args)
+    args = parser.parse_args(["--sound-generation-pipeline", "pure_tone", "colored_noise"])
+    sounds = SoundGenerator(args)
+    tone1, noise1 = sounds()
+    tone2, noise2 = sounds()
+    # the deterministic sound is generated once and shared as the read-only view
+    assert np.shares_memory(tone1, tone2)
+    assert not tone1.flags.writeable and not tone2.flags.writeable
+    with pytest.raises(ValueError):
+        tone2[0] = 1.0
+    # the stochastic sound is generated for every call
+    assert noise1.flags.writeable
+    assert not np.array_equal(noise1, noise2)
+
+    args.sound_cache = False
+    sounds = SoundGenerator(args)
+    tone1, _ = sounds()
+    tone2, _ = sounds()
+    assert tone1.flags.writeable and not np.shares_memory(tone1, tone2)
+    np.testing.assert_array_equal(tone1, tone2)
+
+
+def test_deterministic_sounds():
+    parser = argparse.ArgumentParser()
+    SoundGenerator.add_arguments(parser)
+    args, _ = parser.parse_known_args(["--sound-generation-pipeline"] + SOUNDS)
+    SoundGenerator.sound_add_arguments(parser, args)
+    deterministic = {
+        type(s).__module__.split(".")[-1] for s in SoundGenerator(args).show_pipeline() if s.deterministic
+    }
+    assert deterministic == {"am_tone", "click_train_pitch", "complex_tone", "fm_tone", "pure_tone"}
@@ -0,0 +1,17 @@
+import numpy as np
+
+from aspen.interfaces.abs_block_interface import AbsBlockInterface
+
+
+def test_abs_block_interface():
+    class DummyClass(AbsBlockInterface):
+        def process_block(self, x, pass_index, last):
+            return x
+
+    clsobj = DummyClass()
+    clsobj.reset(10)
+    assert clsobj.num_passes == 1
+    assert clsobj.block_output_length(10) == 10
+    indata = np.ones(10)
+    out = clsobj.process_block(indata, 0, True)
+    np.testing.assert_array_equal(out, indata)
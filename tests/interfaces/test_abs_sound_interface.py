@@ -14,3 +14,8 @@ def test_abs_sound_interface():
     num_signals = 5
     out = DummyClass(indata, num_signals)()
     assert out == indata
+
+
+def test_deterministic():
+    # a sound is generated for every call unless it opts in to be shared
+    assert not AbsSoundInterface.deterministic
@@ -85,3 +85,26 @@ def test_arguments(duration, wfunction, position, samp_freq):
     assert clsobj.wfunction == wfunction
     assert clsobj.position == position
     assert clsobj.samp_freq == samp_freq
+
+
+@pytest.mark.parametrize("position", ["onset", "offset", "both"])
+@pytest.mark.parametrize("wfunction", ["hann", "linear"])
+@pytest.mark.parametrize("block_size", [7, 50, 1000, 16000])
+@pytest.mark.parametrize("channels", [(), (2,)])
+def test_block(sin_data, position, wfunction, block_size, channels):
+    indata = np.broadcast_to(sin_data.reshape((-1,) + (1,) * len(channels)), sin_data.shape + channels).copy()
+    clsobj = ApplyRamp(10, wfunction, position, 16000)
+    clsobj.reset(indata.shape[0])
+    original = indata.copy()
+    y = []
+    for i in range(0, indata.shape[0], block_size):
+        last = i + block_size >= indata.shape[0]
+        y.append(clsobj.process_block(indata[i : i + block_size], 0, last))
+    # the input blocks are not overwritten
+    np.testing.assert_array_equal(indata, original)
+    np.testing.assert_array_equal(np.concatenate(y), clsobj(indata))
+
+
+def test_block_raise_valueerror():
+    with pytest.raises(ValueError):
+        ApplyRamp(10, "hann", "both", 16000).reset(200)
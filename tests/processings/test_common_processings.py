@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from aspen.processings.amplitude_maximize import AmplitudeMaximize
+from aspen.processings.apply_ramp import ApplyRamp
+from aspen.processings.declip import Declip
+from aspen.processings.extract_envelope import ExtractEnvelope
+from aspen.processings.filter_signal import FilterSignal
+from aspen.processings.normalize import Normalize
+
+PROCESSINGS = [
+    (AmplitudeMaximize, {}),
+    (ApplyRamp, {"apply_ramp_duration": 10}),
+    (Declip, {}),
+    (ExtractEnvelope, {}),
+    (
+        FilterSignal,
+        {"filter_signal_btype": "lowpass", "filter_signal_filter_freq": 1000},
+    ),
+    (
+        FilterSignal,
+        {
+            "filter_signal_btype": "lowpass",
+            "filter_signal_filter_freq": 1000,
+            "filter_signal_impulse_response": "iir",
+        },
+    ),
+    (Normalize, {}),
+]
+
+
+@pytest.fixture(scope="function")
+def sin_data():
+    t = np.arange(0, 16000) / 16000
+    return 2.0 * np.sin(2 * np.pi * 440 * t, dtype=np.float64)
+
+
+@pytest.mark.parametrize("cls, kwargs", PROCESSINGS)
+def test_readonly_input(sin_data, cls, kwargs):
+    expected = sin_data.copy()
+    sin_data.flags.writeable = False
+    cls(**kwargs)(sin_data)
+    np.testing.assert_array_equal(sin_data, expected)
+
+
+@pytest.mark.parametrize("cls, kwargs", PROCESSINGS)
+def test_out(sin_data, cls, kwargs):
+    expected = cls(**kwargs)(sin_data)
+    out = np.empty_like(sin_data)
+    assert cls(**kwargs)(sin_data, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+    # in-place
+    assert cls(**kwargs)(sin_data, out=sin_data) is sin_data
+    np.testing.assert_array_equal(sin_data, expected)
+
+
+@pytest.mark.parametrize("cls, kwargs", PROCESSINGS)
+def test_multichannel(sin_data, cls, kwargs):
+    # the channels with the different amplitude are processed independently
+    x = np.stack([sin_data, 0.5 * sin_data[::-1], 0.25 * sin_data], axis=1)
+    proc = cls(**kwargs)
+    assert proc.multichannel
+    expected = np.apply_along_axis(proc, 0, x)
+    np.testing.assert_allclose(proc(x), expected, rtol=1e-10, atol=1e-12)
@@ -107,3 +107,60 @@ def test_arguments(
     assert clsobj.lpf_filter_order == lpf_filter_order
     assert clsobj.lpf_fir_window == lpf_fir_window
     assert clsobj.samp_freq == samp_freq
+
+
+@pytest.mark.parametrize("method", ["hilbert", "rect"])
+def test_dtype(am_data, method):
+    out64 = extract_envelope(am_data, method)
+    out32 = extract_envelope(am_data.astype(np.float32), method)
+    assert out32.dtype == np.float32
+    np.testing.assert_allclose(out32, out64, atol=1e-5)
+
+
+@pytest.mark.parametrize(
+    "method, lpf_freq, lpf_impulse_response, lpf_filter_order, lpf_fir_window, samp_freq, atol, rms",
+    [
+        ("hilbert", 16.0, "fir", 512, "hann", 16000, 2e-3, 1e-3),
+        ("rect", 16.0, "fir", 512, "hann", 16000, 2e-3, 1e-3),
+        ("hilbert", 32.0, "fir", 512, "hann", 16000, 2e-3, 1e-3),
+        ("hilbert", 16.0, "fir", 512, "hamming", 16000, 2e-3, 1e-3),
+        ("rect", 64.0, "fir", 1024, "hann", 16000, 2e-3, 1e-3),
+        # IIR filter is applied at the original rate
+        ("hilbert", 16.0, "iir", 2, "hann", 16000, 1e-12, 1e-12),
+    ],
+)
+def test_multirate(
+    am_data, method, lpf_freq, lpf_impulse_response, lpf_filter_order, lpf_fir_window, samp_freq, atol, rms
+):
+    params = (method, lpf_freq, lpf_impulse_response, lpf_filter_order, lpf_fir_window, samp_freq)
+    expected = extract_envelope(am_data, *params)
+    out = extract_envelope(am_data, *params, multirate=True)
+    # the low-pass filter at the low rate approximates the one at the original rate
+    np.testing.assert_allclose(out, expected, atol=atol)
+    assert np.sqrt(np.mean((out - expected) ** 2)) < rms * np.sqrt(np.mean(expected**2))
+
+    indata = am_data.astype(np.float32)
+    out32 = ExtractEnvelope(*params, extract_envelope_multirate=True)(indata, out=indata)
+    assert out32 is indata
+    np.testing.assert_allclose(out32, out, atol=1e-5)
+
+
+@pytest.mark.parametrize(
+    "method, lpf_impulse_response, lpf_filter_order, rms, peak",
+    [
+        ("rect", "fir", 512, 2e-4, 1e-3),
+        ("hilbert", "fir", 512, 2e-4, 1e-3),
+        ("rect", "iir", 2, 1e-12, 1e-12),
+        ("rect", "iir", 4, 1e-12, 1e-12),
+    ],
+)
+def test_multirate_white_noise(method, lpf_impulse_response, lpf_filter_order, rms, peak):
+    # the error is bounded over the whole signal including the edges
+    rng = np.random.RandomState(0)
+    indata = rng.normal(size=48000)
+    params = (method, 16.0, lpf_impulse_response, lpf_filter_order, "hann", 16000)
+    expected = extract_envelope(indata, *params)
+    out = extract_envelope(indata, *params, multirate=True)
+    assert out.shape == expected.shape
+    assert np.sqrt(np.mean((out - expected) ** 2)) < rms * np.sqrt(np.mean(expected**2))
+    assert np.abs(out - expected).max() < peak * np.abs(expected).max()
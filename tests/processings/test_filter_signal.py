@@ -200,3 +200,55 @@ def test_bandpass_power(
     indata = declip(indata, 1.0)
     indataf = stopfreq_amplitude(indata, btype, filter_freq)
     np.testing.assert_allclose(indataf, np.zeros_like(indataf), atol=1e-3)
+
+
+@pytest.mark.parametrize(
+    "btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq",
+    PARAMS,
+)
+@pytest.mark.parametrize("block_size", [1000, 3333, 16000])
+def test_block(white_noise, btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq, block_size):
+    clsobj = FilterSignal(btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq)
+    clsobj.reset(white_noise.shape[0])
+    y = []
+    for i in range(0, white_noise.shape[0], block_size):
+        last = i + block_size >= white_noise.shape[0]
+        y.append(clsobj.process_block(white_noise[i : i + block_size], 0, last))
+    np.testing.assert_allclose(np.concatenate(y), clsobj(white_noise), atol=1e-10)
+
+
+@pytest.mark.parametrize(
+    "btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq",
+    PARAMS,
+)
+def test_dtype(white_noise, btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq):
+    y64 = filter_signal(white_noise, btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq)
+    y32 = filter_signal(
+        white_noise.astype(np.float32), btype, filter_freq, impulse_response, filter_order, firwindow, samp_freq
+    )
+    assert y32.dtype == np.float32
+    np.testing.assert_allclose(y32, y64, atol=1e-5)
+
+
+@pytest.mark.parametrize("impulse_response", ["fir", "iir"])
+def test_filter_spec(white_noise, impulse_response):
+    clsobj = FilterSignal(
+        filter_signal_btype="lowpass",
+        filter_signal_filter_freq="1000",
+        filter_signal_impulse_response=impulse_response,
+        filter_signal_filter_spec="1_40_400",
+    )
+    y = clsobj(white_noise.copy())
+    assert clsobj.filter_order is not None
+    if impulse_response == "fir":
+        assert clsobj.firwindow[0] == "kaiser"
+    # the stopband (above 1200 Hz) is attenuated
+    yf = np.abs(fft(y))[: y.shape[0] // 2]
+    xf = fftfreq(y.shape[0], 1.0 / 16000)[: y.shape[0] // 2]
+    xf_in = np.abs(fft(white_noise))[: y.shape[0] // 2]
+    assert np.sum(yf[xf > 1200] ** 2) < 1e-3 * np.sum(xf_in[xf > 1200] ** 2)
+    np.testing.assert_allclose(
+        filter_signal(white_noise, "lowpass", "1000", impulse_response, filter_spec="1_40_400"), y
+    )
+    with pytest.raises(ValueError):
+        FilterSignal("lowpass", "1000", filter_signal_filter_order=512, filter_signal_filter_spec="1_40_400")
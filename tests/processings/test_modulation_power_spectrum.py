@@ -188,3 +188,40 @@ def test_arguments(
     assert clsobj.fft2_win_shift == fft2_win_shift
     assert clsobj.backend == backend
     assert clsobj.samp_freq == samp_freq
+
+
+@pytest.mark.parametrize("fft2_win_duration", [0, 100])
+def test_dtype(sin_data, fft2_win_duration):
+    mps_pow64 = modulation_power_spectrum(sin_data, fft2_win_duration=fft2_win_duration)[4]
+    mps_pow32 = modulation_power_spectrum(sin_data.astype(np.float32), fft2_win_duration=fft2_win_duration)[4]
+    assert mps_pow32.dtype == np.float32
+    assert np.all(np.isfinite(mps_pow64)) and np.all(np.isfinite(mps_pow32))
+    # relative to the peak of power
+    np.testing.assert_allclose(mps_pow32, mps_pow64, atol=mps_pow64.max() * 1e-5)
+
+
+def test_keep_raw_mps(sin_data):
+    _, _, _, mps, mps_pow = modulation_power_spectrum(sin_data)
+    _, _, _, discarded, mps_pow_discarded = modulation_power_spectrum(sin_data, keep_raw_mps=False)
+    assert len(mps) > 0
+    assert discarded is None
+    np.testing.assert_array_equal(mps_pow_discarded, mps_pow)
+
+
+def test_finite_with_silence():
+    # the noise with the silent gaps, whose frames are constant after the clip of spec_db_range
+    rng = np.random.RandomState(0)
+    t = np.arange(0, 32000) / 16000
+    x = rng.uniform(-0.5, 0.5, 32000) * (np.sin(2 * np.pi * 2 * t) > 0)
+    mps_pow = ModulationPowerSpectrum()(x)
+    assert mps_pow.shape == (153, 101)
+    assert np.all(np.isfinite(mps_pow))
+    # the whole spectrogram is normalized (the values of the original implementation)
+    np.testing.assert_allclose(mps_pow.sum(), 70480662.08742134, rtol=1e-6)
+    np.testing.assert_allclose(mps_pow.max(), 34331352.744708814, rtol=1e-6)
+    np.testing.assert_allclose(mps_pow[1, 1], 3556.3515089127172, rtol=1e-6)
+
+
+def test_raise_out_valueerror(sin_data):
+    with pytest.raises(ValueError):
+        ModulationPowerSpectrum()(sin_data, out=np.empty_like(sin_data))
@@ -57,3 +57,14 @@ def test_arguments(method):
     )
     clsobj = Normalize(normalize_method=args.normalize_method)
     assert clsobj.method == method
+
+
+def test_axis():
+    x = np.random.RandomState(0).randn(100, 2) * [1.0, 3.0] + [0.0, 5.0]
+    # each channel
+    y = normalize(x)
+    np.testing.assert_allclose(y.mean(axis=0), 0, atol=1e-12)
+    np.testing.assert_allclose(y.std(axis=0), 1)
+    # the whole array
+    y = normalize(x, axis=None)
+    np.testing.assert_allclose(y, (x - x.mean()) / x.std())
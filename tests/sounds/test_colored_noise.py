@@ -1,4 +1,5 @@
 import argparse
+import os
 
 import numpy as np
 import pytest
@@ -70,3 +71,46 @@ def test_arguments(duration, color, num_signals, samp_freq):
     assert clsobj.color == color
     assert clsobj.num_signals == num_signals
     assert clsobj.samp_freq == samp_freq
+
+
+@pytest.mark.parametrize("color", [["white"], ["pink"]])
+def test_noise_bank(tmp_path, color):
+    kwargs = dict(
+        colored_noise_duration=[1000],
+        colored_noise_color=color,
+        noise_bank_dir=str(tmp_path),
+        noise_bank_duration=10000,
+    )
+    np.random.seed(0)
+    x = ColoredNoise(**kwargs)()[0]
+    assert x.shape == (16000,) and x.flags.writeable
+    assert np.max(np.abs(x)) <= 1.0
+    # the bank is shared and the noise is reproducible by the seed
+    np.random.seed(0)
+    np.testing.assert_array_equal(ColoredNoise(**kwargs)()[0], x)
+    assert len(os.listdir(str(tmp_path))) == 1
+    assert not np.array_equal(ColoredNoise(**kwargs)()[0], x)
+
+
+@pytest.mark.parametrize("color", ["pink", "brown"])
+def test_noise_bank_spectrum(tmp_path, color):
+    def slope(x):
+        # slope of the power spectrum in dB/decade between 10 Hz and 1 kHz
+        f = np.fft.rfftfreq(x.shape[-1], 1 / 16000)
+        power = np.mean(np.abs(np.fft.rfft(x)) ** 2, axis=0)
+        band = (f >= 10) & (f <= 1000)
+        return np.polyfit(np.log10(f[band]), 10 * np.log10(power[band]), 1)[0]
+
+    def share(x):
+        # share of the power between 100 Hz and 1 kHz
+        f = np.fft.rfftfreq(x.shape[-1], 1 / 16000)
+        power = np.mean(np.abs(np.fft.rfft(x)) ** 2, axis=0)
+        return np.sum(power[(f >= 100) & (f < 1000)]) / np.sum(power)
+
+    np.random.seed(0)
+    fresh = np.array([ColoredNoise([1000], [color])()[0] for _ in range(20)])
+    bank = ColoredNoise([1000], [color], noise_bank_dir=str(tmp_path), noise_bank_duration=20000)
+    sliced = np.array([bank()[0] for _ in range(20)])
+    # the slices of the bank have the same spectrum as the noise generated with the duration
+    assert abs(slope(sliced) - slope(fresh)) < 1.0
+    np.testing.assert_allclose(share(sliced), share(fresh), rtol=0.2)
@@ -48,3 +48,15 @@ def test_sampling_frequency(cls, func):
     short_tone = cls(samp_freq=16000)()
     long_tone = cls(samp_freq=32000)()
     assert 2 * len(short_tone[0]) == len(long_tone[0])
+
+
+@pytest.mark.parametrize("cls, func", SOUNDS)
+def test_dtype(cls, func):
+    np.random.seed(0)
+    data_float64 = cls(dtype="float64")()
+    np.random.seed(0)
+    data_float32 = func(dtype="float32")
+    for x64, x32 in zip(data_float64, data_float32):
+        assert x64.dtype == np.float64
+        assert x32.dtype == np.float32
+        np.testing.assert_allclose(x32, x64, atol=1e-6)
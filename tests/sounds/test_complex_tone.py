@@ -1,5 +1,6 @@
 import argparse
 
+import numpy as np
 import pytest
 
 from aspen.sounds.complex_tone import ComplexTone, complex_tone
@@ -145,3 +146,16 @@ def test_arguments(
     assert clsobj.tilt_type == tilt_type
     assert clsobj.num_signals == num_signals
     assert clsobj.samp_freq == samp_freq
+
+
+@pytest.mark.parametrize("tilt_type", ["up", "down"])
+def test_tilt_not_padded(tilt_type):
+    # the tilt of each bin is given on the spectrum of the signal itself (16144 samples is not a fast length)
+    x = ComplexTone(complex_tone_duration=[1009], complex_tone_tilt_type=[tilt_type])()[0]
+    t = np.arange(0, 16144) / 16000
+    y = sum(np.sin(2 * np.pi * 440 * (i + 1) * t) for i in range(10))
+    Y = np.fft.rfft(y, norm="forward")
+    gain = np.arange(1, Y.shape[0] + 1)
+    expected = np.fft.irfft(Y * gain if tilt_type == "up" else Y / gain, n=16144, norm="forward")
+    expected /= max(1.0, np.max(np.abs(expected)))
+    np.testing.assert_allclose(x, expected, atol=1e-10)
@@ -1,4 +1,5 @@
 import argparse
+import os
 
 import numpy as np
 import pytest
@@ -206,3 +207,19 @@ def test_bandpass_power(
     )()
     tonef = stopfreq_amplitude(tone[0], btype[0], filter_freq[0])
     np.testing.assert_allclose(tonef, np.zeros_like(tonef), atol=1e-3)
+
+
+def test_noise_bank(tmp_path):
+    kwargs = dict(filtered_noise_duration=[1000], noise_bank_dir=str(tmp_path), noise_bank_duration=10000)
+    np.random.seed(0)
+    x = FilteredNoise(**kwargs)()[0]
+    assert x.shape == (16000,) and np.max(np.abs(x)) <= 1.0
+    np.random.seed(0)
+    np.testing.assert_array_equal(FilteredNoise(**kwargs)()[0], x)
+    assert len(os.listdir(str(tmp_path))) == 1
+    # the noise of the bank has the same level as the noise filtered for every call
+    np.random.seed(0)
+    expected = FilteredNoise(filtered_noise_duration=[1000])()[0]
+    np.testing.assert_allclose(np.std(x), np.std(expected), rtol=0.2)
+    xf = stopfreq_amplitude(x, "bandpass", "800_1200")
+    np.testing.assert_allclose(xf, np.zeros_like(xf), atol=1e-3)
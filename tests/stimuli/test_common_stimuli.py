@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from aspen.stimuli.auditory_streaming import AuditoryStreaming
+from aspen.stimuli.continuity import Continuity
+from aspen.stimuli.identity import Identity
+from aspen.stimuli.iterated_rippled_noise import IteratedRippledNoise
+from aspen.stimuli.locally_time_reversed_speech import LocallyTimeReversedSpeech
+from aspen.stimuli.modulation_filtered_speech import ModulationFilteredSpeech
+from aspen.stimuli.noise_vocoded_speech import NoiseVocodedSpeech
+from aspen.stimuli.verbal_transformation import VerbalTransformation
+
+# stimulus and the number of inputs
+STIMULI = [
+    (AuditoryStreaming, 2),
+    (Continuity, 2),
+    (Identity, 1),
+    (IteratedRippledNoise, 1),
+    (LocallyTimeReversedSpeech, 1),
+    (ModulationFilteredSpeech, 1),
+    (NoiseVocodedSpeech, 2),
+    (VerbalTransformation, 1),
+]
+
+
+@pytest.mark.parametrize("cls, num_inputs", STIMULI)
+def test_readonly_inputs(cls, num_inputs):
+    # the inputs are never modified (e.g. memory-mapped read-only cache)
+    t = np.arange(0, 16000) / 16000
+    x = [np.sin(2 * np.pi * 440 * (i + 1) * t, dtype=np.float64) for i in range(num_inputs)]
+    expected = [each_x.copy() for each_x in x]
+    for each_x in x:
+        each_x.flags.writeable = False
+    np.random.seed(0)
+    cls()(x)
+    for each_x, each_expected in zip(x, expected):
+        np.testing.assert_array_equal(each_x, each_expected)
@@ -143,3 +143,37 @@ def test_arguments(
     assert clsobj.gap_method == gap_method
     assert clsobj.gap_ramp_duration == gap_ramp_duration
     assert clsobj.target_snr == target_snr
+
+
+@pytest.mark.parametrize(
+    "samp_freq, target_duration, gap_duration, gap_method, gap_ramp_duration, target_snr",
+    PARAMS,
+)
+@pytest.mark.parametrize("block_size", [1000, 7777, 64000])
+def test_block(
+    indata,
+    samp_freq,
+    target_duration,
+    gap_duration,
+    gap_method,
+    gap_ramp_duration,
+    target_snr,
+    block_size,
+):
+    clsobj = Continuity(
+        samp_freq,
+        target_duration,
+        gap_duration,
+        gap_method,
+        gap_ramp_duration,
+        target_snr,
+    )
+    clsobj.reset(indata[0].shape[0], indata[1:])
+    tone = []
+    for pass_index in range(clsobj.num_passes):
+        for i in range(0, indata[0].shape[0], block_size):
+            last = i + block_size >= indata[0].shape[0]
+            tone.append(
+                clsobj.process_block([x[i : i + block_size] for x in indata], pass_index, last)
+            )
+    np.testing.assert_allclose(np.concatenate(tone), clsobj(indata), atol=1e-12)
@@ -67,3 +67,14 @@ def test_arguments(samp_freq, reverse_duration, randomize):
     assert clsobj.samp_freq == samp_freq
     assert clsobj.reverse_duration == reverse_duration
     assert clsobj.randomize == randomize
+
+
+@pytest.mark.parametrize("block_size", [1000, 3333, 16000])
+def test_block(indata, block_size):
+    clsobj = LocallyTimeReversedSpeech(reverse_duration=30)
+    clsobj.reset(indata.shape[0])
+    tone = []
+    for i in range(0, indata.shape[0], block_size):
+        last = i + block_size >= indata.shape[0]
+        tone.append(clsobj.process_block([indata[i : i + block_size]], 0, last))
+    np.testing.assert_array_equal(np.concatenate(tone), clsobj([indata]))
@@ -222,3 +222,71 @@ def test_arguments(
     assert clsobj.ext_env_filter_order == ext_env_filter_order
     assert clsobj.ext_env_fir_window == ext_env_fir_window
     assert clsobj.ext_env_freq == ext_env_freq
+
+
+@pytest.mark.parametrize("filter_impulse_response_method, filter_order", [("fir", 512), ("iir", 2)])
+def test_vocoder_threads(indata, filter_impulse_response_method, filter_order):
+    kwargs = dict(
+        num_freqband=8,
+        freqband_scale_method="erb",
+        filter_impulse_response_method=filter_impulse_response_method,
+        filter_order=filter_order,
+    )
+    serial = NoiseVocodedSpeech(**kwargs)(indata)
+    # the output of the threads is exactly the same as the serial one
+    np.testing.assert_array_equal(NoiseVocodedSpeech(vocoder_threads=4, **kwargs)(indata), serial)
+    with pytest.raises(ValueError):
+        NoiseVocodedSpeech(vocoder_threads=0)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(filter_impulse_response_method="fir", filter_order=512),
+        dict(filter_impulse_response_method="iir", filter_order=2),
+        dict(ext_env_impulse_response_method="iir", ext_env_filter_order=2),
+    ],
+)
+def test_ext_env_multirate(indata, kwargs):
+    expected = NoiseVocodedSpeech(**kwargs)(indata)
+    out = NoiseVocodedSpeech(ext_env_multirate=True, **kwargs)(indata)
+    assert np.sqrt(np.mean((out - expected) ** 2)) < 1e-2 * np.sqrt(np.mean(expected**2))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(num_freqband=16, freqband_scale_method="erb"),
+        dict(ext_env_impulse_response_method="iir", ext_env_filter_order=2),
+    ],
+)
+def test_vocoder_multirate(kwargs):
+    # the broadband noise modulated at 4 Hz
+    rng = np.random.RandomState(0)
+    t = np.arange(0, 16000) / 16000
+    target = rng.uniform(-0.5, 0.5, 16000) * (1 - np.cos(2 * np.pi * 4 * t))
+    indata = [target, rng.normal(loc=0, scale=1, size=[16000])]
+    expected = NoiseVocodedSpeech(**kwargs)(indata)
+    vocoder = NoiseVocodedSpeech(vocoder_multirate=True, **kwargs)
+    out = vocoder(indata)
+    # the low bands are processed at the decimated rates
+    assert len(vocoder._filterbanks()) > 1
+    assert out.shape == expected.shape
+    assert np.sqrt(np.mean((out - expected) ** 2)) < 1e-2 * np.sqrt(np.mean(expected**2))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(filter_spec="1_40_0.25"),
+        dict(filter_spec="1_40_0.25", vocoder_multirate=True),
+        dict(filter_impulse_response_method="iir", filter_spec="1_40_0.25"),
+        dict(ext_env_filter_spec="1_40_8"),
+    ],
+)
+def test_filter_spec(indata, kwargs):
+    kwargs = dict(dict(num_freqband=8, freqband_scale_method="erb"), **kwargs)
+    out = NoiseVocodedSpeech(**kwargs)(indata)
+    assert out.shape == indata[0].shape
+    assert np.all(np.isfinite(out)) and np.any(out != 0)
@@ -52,3 +52,15 @@ def test_arguments(num_iteration):
     )
     clsobj = VerbalTransformation(num_iteration=args.num_iteration)
     assert clsobj.num_iteration == num_iteration
+
+
+def test_block(indata):
+    clsobj = VerbalTransformation(num_iteration=3)
+    clsobj.reset(indata.shape[0])
+    assert clsobj.block_output_length(indata.shape[0]) == indata.shape[0] * 3
+    tone = []
+    for pass_index in range(clsobj.num_passes):
+        for i in range(0, indata.shape[0], 3000):
+            last = i + 3000 >= indata.shape[0]
+            tone.append(clsobj.process_block([indata[i : i + 3000]], pass_index, last))
+    np.testing.assert_array_equal(np.concatenate(tone), clsobj([indata]))
@@ -1,3 +1,5 @@
+import pytest
+
 from aspen.utils.cli_utils import strtobool
 
 
@@ -7,3 +9,8 @@ def test_strtobool():
 
     for s in ["FALSE", "false", "F", "no", "0"]:
         assert strtobool(s) is False
+
+
+def test_strtobool_invalid():
+    with pytest.raises(ValueError):
+        strtobool("unknown")
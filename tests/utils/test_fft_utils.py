@@ -0,0 +1,101 @@
+import importlib.util
+
+import numpy as np
+import pytest
+from scipy import signal
+
+from aspen.utils.fft_utils import (
+    add_fft_stats,
+    fast_length,
+    fft2,
+    fft_backend,
+    fft_stats,
+    fft_stats_summary,
+    fft_workers,
+    hilbert,
+    ifft2,
+    irfft,
+    pop_fft_stats,
+    rfft,
+    set_fft_backend,
+)
+
+
+@pytest.mark.parametrize("length, expected", [(16000, 16000), (16001, 16200), (15991, 16000), (1, 1)])
+def test_fast_length(length, expected):
+    assert fast_length(length) == expected
+
+
+@pytest.mark.parametrize("length", [15991, 16000, 16001])
+@pytest.mark.parametrize("norm", [None, "forward"])
+def test_rfft_irfft(length, norm):
+    rng = np.random.RandomState(0)
+    x = rng.normal(size=[length, 2])
+    X = rfft(x, axis=0, norm=norm)
+    assert X.shape == (fast_length(length) // 2 + 1, 2)
+    y = irfft(X, length, axis=0, norm=norm)
+    # the odd length is also restored
+    assert y.shape == x.shape
+    np.testing.assert_allclose(y, x, atol=1e-10)
+    with pytest.raises(ValueError):
+        irfft(X, length + 1000, axis=0)
+
+
+@pytest.mark.parametrize("length", [15991, 16000])
+def test_hilbert(length):
+    t = np.arange(length) / 16000
+    x = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+    y = hilbert(x)
+    assert y.shape == x.shape
+    # the same envelope as the one without padding except the edges
+    inner = slice(length // 10, -length // 10)
+    np.testing.assert_allclose(np.abs(y[inner]), np.abs(signal.hilbert(x))[inner], atol=1e-2)
+    np.testing.assert_allclose(np.abs(y[inner]), 1, atol=1e-2)
+
+
+def test_fft2_ifft2():
+    rng = np.random.RandomState(0)
+    x = rng.normal(size=[15, 31])
+    X = fft2(x)
+    assert X.shape == x.shape
+    np.testing.assert_allclose(X, np.fft.fft2(x), atol=1e-10)
+    np.testing.assert_allclose(ifft2(X).real, x, atol=1e-10)
+
+
+def test_fft_stats():
+    pop_fft_stats()
+    x = np.ones(1000)
+    for _ in range(3):
+        rfft(x)
+    with fft_backend():
+        # the FFTs inside the third-party functions are also counted
+        signal.hilbert(x)
+    stats = fft_stats()
+    assert stats[("rfft", (1000,))][0] == 3
+    assert ("fft", (1000,)) in stats and ("ifft", (1000,)) in stats
+    assert "rfft" in fft_stats_summary()
+    assert pop_fft_stats() == stats
+    assert fft_stats() == {}
+    add_fft_stats(stats)
+    add_fft_stats(stats)
+    assert fft_stats()[("rfft", (1000,))][0] == 6
+
+
+def test_set_fft_backend():
+    rng = np.random.RandomState(0)
+    x = rng.normal(size=[16001])
+    expected = rfft(x)
+    try:
+        set_fft_backend(workers=2)
+        assert fft_workers() == 2
+        np.testing.assert_allclose(rfft(x), expected)
+        with pytest.raises(ValueError):
+            set_fft_backend(workers=0)
+        if importlib.util.find_spec("pyfftw") is None:
+            with pytest.raises(ImportError):
+                set_fft_backend(plan_cache=True)
+        else:
+            set_fft_backend(plan_cache=True)
+            np.testing.assert_allclose(rfft(x), expected)
+    finally:
+        set_fft_backend()
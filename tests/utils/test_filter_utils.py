@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from aspen.processings.filter_signal import filter_signal
+from aspen.utils.filter_utils import (
+    choose_convolution_method,
+    clear_filter_cache,
+    convolve,
+    design_filter,
+    filter_cache_info,
+    filter_cost,
+    fir_filter,
+    minimum_filter_order,
+    overlap_save,
+    parse_filter_spec,
+)
+
+
+def test_design_filter_cache():
+    clear_filter_cache()
+    b = design_filter("bandpass", np.array([800.0, 1200.0]), "fir", 512, "hann", 16000)
+    np.testing.assert_array_equal(
+        b, signal.firwin(513, np.array([800.0, 1200.0]), window="hann", pass_zero="bandpass", fs=16000)
+    )
+    # the same filter is returned regardless of the type of cutoff frequencies
+    assert design_filter("bandpass", [800, 1200], "fir", 512, "hann", 16000) is b
+    assert not b.flags.writeable
+    info = filter_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    sos = design_filter("lowpass", 16.0, "iir", 2, samp_freq=16000)
+    np.testing.assert_array_equal(sos, signal.butter(2, 16.0, btype="lowpass", fs=16000, output="sos"))
+    # the window is ignored for IIR filter
+    assert design_filter("lowpass", 16.0, "iir", 2, "hamming", 16000) is sos
+    info = filter_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+
+    clear_filter_cache()
+    assert filter_cache_info().currsize == 0
+
+
+def test_filter_signal_cache():
+    clear_filter_cache()
+    x = np.random.RandomState(0).randn(16000)
+    y = [filter_signal(x, "bandpass", "800_1200", impulse_response=ir) for ir in ["fir", "iir", "fir", "iir"]]
+    np.testing.assert_array_equal(y[0], y[2])
+    np.testing.assert_array_equal(y[1], y[3])
+    info = filter_cache_info()
+    assert (info.hits, info.misses) == (2, 2)
+
+
+def test_raise_design_filter_valueerror():
+    with pytest.raises(ValueError):
+        design_filter("lowpass", 16.0, "invalid", 2)
+
+
+def test_choose_convolution_method():
+    assert choose_convolution_method(16000, 17) == "direct"
+    assert choose_convolution_method(1000, 513) == "direct"
+    assert choose_convolution_method(160000, 513) == "fft"
+
+
+@pytest.mark.parametrize("method", ["direct", "fft", "auto"])
+@pytest.mark.parametrize("shape", [(16000,), (16000, 2)])
+def test_fir_filter(method, shape):
+    x = np.random.RandomState(0).randn(*shape)
+    b = signal.firwin(513, 1000, fs=16000)
+    # filtering the input followed by zeros of the delay, and removing the first samples of the delay
+    padded = np.concatenate([x, np.zeros((256,) + shape[1:])])
+    expected = signal.lfilter(b, 1, padded, axis=0)[256:]
+    np.testing.assert_allclose(fir_filter(x, b, method=method), expected, atol=1e-12)
+    out = x.copy()
+    assert fir_filter(out, b, out=out, method=method) is out
+    np.testing.assert_allclose(out, expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("length, nfft", [(1000, 64), (1000, 100), (10, 64), (5000, None)])
+def test_overlap_save(length, nfft):
+    x = np.random.RandomState(0).randn(length)
+    b = signal.firwin(33, 1000, fs=16000)
+    expected = convolve(x, b)[16 : length + 16]
+    np.testing.assert_allclose(overlap_save(x, b, nfft=nfft), expected, atol=1e-12)
+    # in-place
+    np.testing.assert_allclose(overlap_save(x, b, out=x, nfft=nfft), expected, atol=1e-12)
+
+
+def test_raise_overlap_save_valueerror():
+    with pytest.raises(ValueError):
+        overlap_save(np.zeros(100), np.ones(33), nfft=32)
+    with pytest.raises(ValueError):
+        fir_filter(np.zeros(100), np.ones(3), method="invalid")
+
+
+def test_parse_filter_spec():
+    assert parse_filter_spec("1_60_100") == (1.0, 60.0, 100.0)
+    assert parse_filter_spec([1, 60, 100]) == (1.0, 60.0, 100.0)
+    assert parse_filter_spec(None) is None
+    for spec in ["1_60", "1_0_100", "-1_60_100"]:
+        with pytest.raises(ValueError):
+            parse_filter_spec(spec)
+
+
+@pytest.mark.parametrize(
+    "btype, filter_freq",
+    [("lowpass", 1000.0), ("highpass", 1000.0), ("bandpass", np.array([800.0, 1600.0])), ("bandstop", [800, 1600])],
+)
+@pytest.mark.parametrize("impulse_response", ["fir", "iir"])
+def test_minimum_filter_order(btype, filter_freq, impulse_response):
+    ripple, attenuation, width = 1.0, 40.0, 200.0
+    order, freq, window = minimum_filter_order(btype, filter_freq, impulse_response, ripple, attenuation, width)
+    coef = design_filter(btype, freq, impulse_response, order, window, 16000)
+    cutoff = np.atleast_1d(filter_freq).astype(np.float64)
+    f = np.linspace(0, 8000, 8001)
+    if impulse_response == "fir":
+        assert order % 2 == 0 and window[0] == "kaiser"
+        # the order of Kaiser window is estimated by the empirical formula
+        tol = 2.0
+        gain = np.abs(signal.freqz(coef, worN=f, fs=16000)[1])
+    else:
+        assert window is None
+        tol = 1e-6
+        # the filter is applied forward and backward
+        gain = np.abs(signal.sosfreqz(coef, worN=f, fs=16000)[1]) ** 2
+    distance = np.min(np.abs(f[:, None] - cutoff[None, :]), axis=1)
+    if btype == "lowpass":
+        inside = f < cutoff[0]
+    elif btype == "highpass":
+        inside = f > cutoff[0]
+    elif btype == "bandpass":
+        inside = (f > cutoff[0]) & (f < cutoff[1])
+    else:
+        inside = (f < cutoff[0]) | (f > cutoff[1])
+    gain_db = 20 * np.log10(np.maximum(gain, 1e-12))
+    outside = distance >= width / 2
+    assert np.all(np.abs(gain_db[inside & outside]) <= ripple + tol)
+    assert np.all(gain_db[~inside & outside] <= -attenuation + tol)
+
+
+def test_raise_minimum_filter_order_valueerror():
+    with pytest.raises(ValueError):
+        minimum_filter_order("lowpass", 100.0, "fir", 1, 40, 400)
+    with pytest.raises(ValueError):
+        minimum_filter_order("bandpass", [800.0, 900.0], "fir", 1, 40, 200)
+    with pytest.raises(ValueError):
+        minimum_filter_order("invalid", 1000.0, "fir", 1, 40, 200)
+    with pytest.raises(ValueError):
+        minimum_filter_order("lowpass", 1000.0, "invalid", 1, 40, 200)
+
+
+def test_filter_cost():
+    assert filter_cost(design_filter("lowpass", 1000.0, "fir", 64, "hann", 16000), "fir") == 65
+    assert filter_cost(design_filter("bandpass", [800, 1200], "iir", 2, samp_freq=16000), "iir") == 20
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from aspen.processings.filter_signal import filter_signal
+from aspen.utils.filterbank import FIRFilterbank, band_filter, design_filterbank
+
+BANDS = [[0, 500], [500, 1000], [1000, 2000], [2000, 8000]]
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_filterbank(dtype):
+    x = np.random.RandomState(0).randn(16000).astype(dtype)
+    filterbank = design_filterbank(BANDS, 512, "hann", 16000)
+    y = filterbank(x)
+    assert y.shape == (4, 16000) and y.dtype == dtype
+    atol = 1e-4 if dtype == np.float32 else 1e-12
+    for band, y_band in zip(BANDS, y):
+        btype, freq = band_filter(band, 16000)
+        np.testing.assert_allclose(y_band, filter_signal(x, btype, freq, "fir", 512, "hann", 16000), atol=atol)
+
+    weights = np.random.RandomState(1).rand(4, 16000).astype(dtype)
+    np.testing.assert_allclose(filterbank.mix(x, weights), (y * weights).sum(axis=0), rtol=1e-4, atol=1e-4)
+
+
+def test_filterbank_allpass():
+    x = np.random.RandomState(0).randn(4000)
+    filterbank = design_filterbank([[0, 8000]], 16, samp_freq=16000)
+    np.testing.assert_allclose(filterbank(x)[0], x, atol=1e-12)
+
+
+def test_raise_filterbank_valueerror():
+    with pytest.raises(ValueError):
+        design_filterbank([[8000, 9000]], samp_freq=16000)
+    with pytest.raises(ValueError):
+        FIRFilterbank(np.ones((2, 3)))(np.zeros((10, 2)))
+
+
+def test_filterbank_filter_specs():
+    specs = [(1.0, 40.0, 200.0), (1.0, 40.0, 200.0), (1.0, 40.0, 400.0), (1.0, 40.0, 800.0)]
+    filterbank = design_filterbank(BANDS, samp_freq=16000, filter_specs=specs)
+    num_taps = [np.count_nonzero(coef) for coef in filterbank.coefs]
+    # the wider transition band is given by the shorter filter
+    assert num_taps[3] < num_taps[2] < num_taps[1]
+    # the shorter filters are centered in the longest one (the same delay)
+    for coef in filterbank.coefs:
+        np.testing.assert_allclose(coef, coef[::-1], atol=1e-15)
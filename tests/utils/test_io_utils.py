@@ -1,9 +1,20 @@
+import json
 import os
+import shutil
+import threading
+import time
 
 import numpy as np
 import pytest
 
-from aspen.utils.io_utils import NumpyPlayer, WavReader, WavWriter, add_prefix_suffix
+from aspen.utils.io_utils import (
+    BackgroundWriter,
+    NumpyPlayer,
+    PrefetchReader,
+    WavReader,
+    WavWriter,
+    add_prefix_suffix,
+)
 
 WAVPATH = "./tests/helpers/pure_tone_440hz_1000ms_sf16000.wav\n./tests/helpers/pure_tone_1000hz_1000ms_sf16000.wav"
 
@@ -41,6 +52,116 @@ def test_wavreader(tmp_path, sin440, sin1000):
                 pass
     with pytest.raises(ValueError):
         WavReader(str(wavlist.resolve()), segments="dummy")
+    with WavReader(str(wavlist.resolve()), dtype="float32") as reader:
+        for key, (sr, orgmat) in reader:
+            assert orgmat.dtype == np.float32
+
+
+def test_wavreader_cache(tmp_path, sin440):
+    wavpath = tmp_path / "sin440.wav"
+    shutil.copy("./tests/helpers/pure_tone_440hz_1000ms_sf16000.wav", str(wavpath))
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(str(wavpath))
+    cache_dir = tmp_path / "cache"
+
+    # 1st pass: decode and store
+    with WavReader(str(wavlist), cache_dir=str(cache_dir)) as reader:
+        decoded = [(key, sr, np.array(orgmat)) for key, (sr, orgmat) in reader]
+    with open(str(cache_dir / WavReader.INDEX_NAME)) as f:
+        index = json.load(f)
+    assert len(index) == 1
+    entry = index[str(wavpath.resolve())]
+    assert (cache_dir / entry["file"]).exists()
+
+    # 2nd pass: memory-mapped read-only signal
+    with WavReader(str(wavlist), cache_dir=str(cache_dir)) as reader:
+        cached = [(key, sr, orgmat) for key, (sr, orgmat) in reader]
+    assert cached[0][0] == decoded[0][0] == "sin440"
+    assert cached[0][1] == decoded[0][1] == 16000
+    np.testing.assert_array_equal(cached[0][2], decoded[0][2])
+    np.testing.assert_allclose(cached[0][2], sin440, atol=1e-4)
+    assert not cached[0][2].flags.writeable
+
+    # converted from the cached signal when the data type is different
+    with WavReader(str(wavlist), cache_dir=str(cache_dir), dtype="float32") as reader:
+        for key, (sr, orgmat) in reader:
+            assert orgmat.dtype == np.float32
+            np.testing.assert_array_equal(orgmat, decoded[0][2].astype(np.float32))
+
+    # invalidated when the source file is changed
+    (cache_dir / entry["file"]).write_bytes(b"broken")
+    os.utime(str(wavpath), ns=(entry["mtime_ns"] + 10**9, entry["mtime_ns"] + 10**9))
+    with WavReader(str(wavlist), cache_dir=str(cache_dir)) as reader:
+        for key, (sr, orgmat) in reader:
+            assert orgmat.flags.writeable
+            np.testing.assert_array_equal(orgmat, decoded[0][2])
+
+
+def test_wavreader_prefetch(tmp_path):
+    wavlist = tmp_path / "wav.list"
+    wavlist.write_text(WAVPATH + "\n" + WAVPATH.split("\n")[0])
+    with WavReader(str(wavlist)) as reader:
+        expected = [(key, sr, orgmat) for key, (sr, orgmat) in reader]
+    for num_prefetch in [1, 2, 8]:
+        with WavReader(str(wavlist), num_prefetch=num_prefetch) as reader:
+            prefetched = [(key, sr, orgmat) for key, (sr, orgmat) in reader]
+        assert [k for k, _, _ in prefetched] == [k for k, _, _ in expected]
+        for (_, sr1, x1), (_, sr2, x2) in zip(prefetched, expected):
+            assert sr1 == sr2
+            np.testing.assert_array_equal(x1, x2)
+
+    # the error is raised with the key of the broken file
+    (tmp_path / "broken.wav").write_bytes(b"broken")
+    wavlist.write_text(WAVPATH + "\n" + str(tmp_path / "broken.wav"))
+    with WavReader(str(wavlist), num_prefetch=2) as reader:
+        with pytest.raises(RuntimeError, match="broken"):
+            for _ in reader:
+                pass
+
+
+def test_prefetchreader():
+    items = [("key{}".format(i), (16000, np.full(10, i))) for i in range(5)]
+    assert [k for k, _ in PrefetchReader(items, 2)] == [k for k, _ in items]
+
+    def broken():
+        yield items[0]
+        raise OSError("dummy")
+
+    with pytest.raises(RuntimeError, match="key0"):
+        for _ in PrefetchReader(broken(), 2):
+            pass
+    with pytest.raises(ValueError):
+        PrefetchReader(items, 0)
+
+
+def test_backgroundwriter():
+    written = []
+    event = threading.Event()
+
+    def writer(key, value):
+        event.wait()
+        written.append(key)
+
+    # the call blocks while the outputs waiting to be written exceed max_bytes
+    bg_writer = BackgroundWriter(writer, 200)
+    bg_writer("key0", (16000, np.zeros(10)))
+    bg_writer("key1", (16000, np.zeros(10)))
+    thread = threading.Thread(target=bg_writer, args=("key2", (16000, np.zeros(10))))
+    thread.start()
+    time.sleep(0.1)
+    assert thread.is_alive()
+    assert bg_writer.inflight_bytes == 160
+    event.set()
+    thread.join()
+    bg_writer.close()
+    assert written == ["key0", "key1", "key2"]
+
+    def broken(key, value):
+        raise OSError("dummy")
+
+    with pytest.raises(RuntimeError, match="key0"):
+        with BackgroundWriter(broken, 200) as bg_writer:
+            bg_writer("key0", (16000, np.zeros(10)))
 
 
 def test_wavwriter(sin440, sin1000):
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from aspen.utils.multirate import (
+    decimate,
+    decimation_factors,
+    interpolate,
+    multirate_margin,
+)
+
+
+@pytest.mark.parametrize(
+    "samp_freq, band_edge, expected",
+    [(16000, 141, [8, 2]), (16000, 500, [8]), (48000, 141, [8, 8]), (16000, 3000, []), (44100, 360, [8, 2])],
+)
+def test_decimation_factors(samp_freq, band_edge, expected):
+    assert decimation_factors(samp_freq, band_edge) == expected
+
+
+@pytest.mark.parametrize("samp_freq, freq, band_edge", [(16000, 20, 141), (16000, 300, 500), (44100, 50, 360)])
+@pytest.mark.parametrize("channels", [(), (2,)])
+def test_decimate_interpolate(samp_freq, freq, band_edge, channels):
+    t = np.arange(samp_freq) / samp_freq
+    x = np.sin(2 * np.pi * freq * t)
+    x = np.broadcast_to(x.reshape((-1,) + (1,) * len(channels)), x.shape + channels).copy()
+    factors = decimation_factors(samp_freq, band_edge)
+    y = decimate(x, factors, samp_freq, band_edge)
+    low_t = np.arange(y.shape[0]) * np.prod(factors) / samp_freq
+    # the decimated signal covers the whole signal
+    assert low_t[-1] * samp_freq >= samp_freq - 1
+    # the edges are excluded since the filters see the zeros outside the signal
+    inner = slice(y.shape[0] // 10, -y.shape[0] // 10)
+    expected = np.sin(2 * np.pi * freq * low_t).reshape((-1,) + (1,) * len(channels))
+    np.testing.assert_allclose(y[inner], np.broadcast_to(expected, y.shape)[inner], atol=1e-3)
+    z = interpolate(y, factors, samp_freq, band_edge, samp_freq)
+    assert z.shape == x.shape
+    inner = slice(samp_freq // 10, -samp_freq // 10)
+    np.testing.assert_allclose(z[inner], x[inner], atol=1e-2)
+
+
+@pytest.mark.parametrize("samp_freq, band_edge", [(16000, 141), (16000, 500), (44100, 360)])
+def test_multirate_margin(samp_freq, band_edge):
+    factors = decimation_factors(samp_freq, band_edge)
+    margin = multirate_margin(factors, samp_freq, band_edge)
+    assert margin > 0
+    assert margin % np.prod(factors) == 0
+    # the signal starts and ends with the steps from the zeros outside it
+    t = np.arange(samp_freq) / samp_freq
+    x = 1 + np.cos(2 * np.pi * 20 * t)
+
+    def padded(m):
+        y = decimate(np.pad(x, (m, m)), factors, samp_freq, band_edge)
+        return interpolate(y, factors, samp_freq, band_edge, samp_freq + 2 * m)[m : m + samp_freq]
+
+    # the transients of the filters at the edges are within the margin
+    expected = padded(4 * margin)
+    np.testing.assert_allclose(padded(margin), expected, atol=1e-9)
+    assert np.abs(padded(0) - expected).max() > 1e-2
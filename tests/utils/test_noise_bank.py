@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pytest
+
+from aspen.utils.noise_bank import draw_from_bank, load_noise_bank, noise_bank_name
+
+
+def test_load_noise_bank(tmp_path):
+    calls = []
+
+    def generate(rng, n):
+        calls.append(n)
+        return rng.normal(size=[n])
+
+    name = noise_bank_name("white", 16000, 1000)
+    assert name == "white_16000_1000.npy"
+    bank = load_noise_bank(str(tmp_path), name, 1000, generate)
+    assert bank.shape == (1000,) and not bank.flags.writeable
+    # the bank is generated only at the first time
+    np.testing.assert_array_equal(load_noise_bank(str(tmp_path), name, 1000, generate), bank)
+    assert calls == [1000]
+    assert os.listdir(str(tmp_path)) == [name]
+    with pytest.raises(ValueError):
+        load_noise_bank(str(tmp_path), name, 2000, generate)
+
+
+def test_draw_from_bank():
+    bank = np.arange(1000.0)
+    np.random.seed(0)
+    x = draw_from_bank(bank, 100)
+    assert x.shape == (100,) and np.shares_memory(x, bank)
+    np.testing.assert_array_equal(np.diff(x), np.ones(99))
+    # the offset is reproducible by the seed
+    np.random.seed(0)
+    np.testing.assert_array_equal(draw_from_bank(bank, 100), x)
+    np.testing.assert_array_equal(draw_from_bank(bank, 1000), bank)
+    with pytest.raises(ValueError):
+        draw_from_bank(bank, 1001)
+
+
+def test_draw_from_bank_aligned():
+    bank = np.arange(1000.0)
+    np.random.seed(0)
+    offsets = {draw_from_bank(bank, 300, aligned=True)[0] for _ in range(100)}
+    # the last incomplete segment is never drawn
+    assert offsets == {0.0, 300.0, 600.0}
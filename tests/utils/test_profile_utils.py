@@ -0,0 +1,100 @@
+import json
+import tracemalloc
+
+import numpy as np
+
+from aspen.utils.profile_utils import (
+    UTTERANCE_STAGE,
+    disable_profiler,
+    enable_profiler,
+    get_profiler,
+    profile_call,
+    profile_iter,
+    profile_stage,
+    set_profile_key,
+)
+
+
+def test_profile_stage(tmp_path):
+    # nothing is measured while disabled
+    with profile_stage("dummy") as record:
+        record["audio_sec"] = 1.0
+    assert get_profiler() is None
+
+    path = tmp_path / "profile.jsonl"
+    profiler = enable_profiler(str(path))
+    try:
+        set_profile_key("key1")
+        with profile_stage(UTTERANCE_STAGE) as record:
+            with profile_stage("stimulus"):
+                sum(range(1000))
+            record["audio_sec"] = 2.0
+        with profile_stage("write", "key2"):
+            pass
+        records = profiler.records
+        assert [(r["key"], r["stage"]) for r in records] == [
+            ("key1", "stimulus"),
+            ("key1", UTTERANCE_STAGE),
+            ("key2", "write"),
+        ]
+        assert records[1]["audio_sec"] == 2.0
+        assert records[1]["wall"] >= records[0]["wall"] >= 0
+
+        summary = profiler.summary()
+        for stage in ["stimulus", UTTERANCE_STAGE, "write"]:
+            assert stage in summary
+        assert "real-time factor" in summary
+    finally:
+        disable_profiler()
+    assert get_profiler() is None
+    with open(str(path)) as f:
+        assert [json.loads(line) for line in f] == records
+
+
+def test_profile_iter_call():
+    profiler = enable_profiler()
+    try:
+        items = [("key{}".format(i), i) for i in range(3)]
+        assert list(profile_iter(items, "read")) == items
+        written = []
+        profile_call(lambda k, v: written.append(k), "write")("key0", 0)
+        assert written == ["key0"]
+        assert [(r["key"], r["stage"]) for r in profiler.pop_records()] == [
+            ("key0", "read"),
+            ("key1", "read"),
+            ("key2", "read"),
+            ("key0", "write"),
+        ]
+        assert profiler.records == []
+    finally:
+        disable_profiler()
+
+
+def test_memory_profile():
+    profiler = enable_profiler(memory=True)
+    try:
+        with profile_stage("outer"):
+            with profile_stage("inner"):
+                x = np.ones(2**20)
+                del x
+            y = np.ones(2**17)
+        records = {r["stage"]: r for r in profiler.records}
+        # the peak of the inner stage is also the peak of the outer stage
+        assert records["inner"]["alloc_peak"] >= 8 * 2**20
+        assert records["outer"]["alloc_peak"] >= records["inner"]["alloc_peak"]
+        assert abs(records["inner"]["alloc_delta"]) < 2**20
+        assert records["outer"]["alloc_delta"] >= 8 * 2**17
+        assert "top allocating stage" in profiler.summary()
+        del y
+    finally:
+        disable_profiler()
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_stage_disabled():
+    disable_profiler()
+    with profile_stage(UTTERANCE_STAGE) as record:
+        record["audio_sec"] = 1.0
+    # the record of the disabled profiler is not shared by the following calls
+    with profile_stage(UTTERANCE_STAGE) as record:
+        assert record == {}
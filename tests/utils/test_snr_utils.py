@@ -15,3 +15,10 @@ def test_get_snr_noise():
     np.testing.assert_array_equal(
         get_snr_noise(np.ones(10), np.ones(10), 20), np.array([0.1] * 10)
     )
+
+
+def test_get_snr_noise_length():
+    noise = np.arange(1, 21, dtype=np.float64)
+    expected = get_snr_noise(np.ones(10), noise, 20)[:10]
+    np.testing.assert_array_equal(get_snr_noise(np.ones(10), noise, 20, length=10), expected)
+    np.testing.assert_array_equal(get_snr_noise(np.ones(10), noise, length=10), noise[:10])
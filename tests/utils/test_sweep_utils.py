@@ -0,0 +1,38 @@
+import pytest
+
+from aspen.utils.sweep_utils import (
+    expand_sweep,
+    parse_sweep,
+    sweep_cmd_args,
+    sweep_suffix,
+)
+
+
+def test_parse_sweep():
+    # YAML flow mapping (command-line) and str(dict) (configargparse) are both accepted
+    expected = {"gap-method": ["replace", "silent"], "target-snr": [0, -10]}
+    assert parse_sweep("{gap-method: [replace, silent], target-snr: [0, -10]}") == expected
+    assert parse_sweep(str(expected)) == expected
+    assert parse_sweep("{--num-iteration: 4}") == {"num-iteration": [4]}
+
+
+@pytest.mark.parametrize("sweep", ["dummy", "[1, 2]", "{}", "{target-snr: []}"])
+def test_raise_parse_sweep_valueerror(sweep):
+    with pytest.raises(ValueError):
+        parse_sweep(sweep)
+
+
+def test_expand_sweep():
+    conditions = expand_sweep({"gap-method": ["replace", "silent"], "target-snr": [0, -10]})
+    assert conditions == [
+        [("gap-method", "replace"), ("target-snr", 0)],
+        [("gap-method", "replace"), ("target-snr", -10)],
+        [("gap-method", "silent"), ("target-snr", 0)],
+        [("gap-method", "silent"), ("target-snr", -10)],
+    ]
+
+
+def test_sweep_cmd_args_suffix():
+    condition = [("target-snr", -10), ("pure-tone-freq", [315, 400])]
+    assert sweep_cmd_args(condition) == ["--target-snr=-10", "--pure-tone-freq", "315", "400"]
+    assert sweep_suffix(condition) == "target-snr--10_pure-tone-freq-315-400"